@@ -0,0 +1,119 @@
+# accounts/authentication.py
+"""
+Autenticación por token con caché y expiración.
+
+``CachedTokenAuthentication`` resuelve token -> usuario desde la caché de
+Django; solo consulta ``authtoken_token``/``auth_user`` cuando el token no
+está cacheado. Los tokens vencen ``TOKEN_TTL`` segundos después de creados
+(``None`` para no vencer nunca) y se pueden rotar con ``rotate_token``.
+
+La entrada cacheada se elimina al cerrar sesión, al rotar el token y cuando
+se guarda el usuario (p. ej. si se desactiva o cambia su contraseña).
+"""
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache as django_cache
+from django.utils import timezone
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+DEFAULT_TOKEN_AUTH_SETTINGS = {
+    'KEY_PREFIX': 'platzi:token',
+    'CACHE_TTL': 5 * 60,
+    'TOKEN_TTL': 7 * 24 * 60 * 60,
+    'ROTATE_ON_LOGIN': False,
+}
+
+
+def get_token_auth_settings():
+    config = dict(DEFAULT_TOKEN_AUTH_SETTINGS)
+    config.update(getattr(settings, 'PLATZI_TOKEN_AUTH', {}))
+    return config
+
+
+def _cache_key(key):
+    # Se guarda un hash para no dejar el token en claro en los nombres de la caché
+    digest = hashlib.sha256(key.encode()).hexdigest()
+    return f"{get_token_auth_settings()['KEY_PREFIX']}:{digest}"
+
+
+def expires_at(token):
+    """Fecha de vencimiento del token, o None si no vence."""
+    ttl = get_token_auth_settings()['TOKEN_TTL']
+    return token.created + timedelta(seconds=ttl) if ttl is not None else None
+
+
+def is_expired(token):
+    expiry = expires_at(token)
+    return expiry is not None and expiry <= timezone.now()
+
+
+def invalidate_cached_token(key):
+    django_cache.delete(_cache_key(key))
+
+
+def issue_token(user):
+    """
+    Devuelve el token del usuario para el login o el registro: reutiliza el
+    existente o crea uno nuevo si no tiene, si venció o si ROTATE_ON_LOGIN.
+    """
+    token = Token.objects.filter(user=user).first()
+    if token is None:
+        return Token.objects.create(user=user)
+    if is_expired(token) or get_token_auth_settings()['ROTATE_ON_LOGIN']:
+        return rotate_token(token)
+    return token
+
+
+def rotate_token(token):
+    """Reemplaza el token por uno nuevo; el anterior deja de servir al instante."""
+    user = token.user
+    revoke_token(token)
+    return Token.objects.create(user=user)
+
+
+def revoke_token(token):
+    invalidate_cached_token(token.key)
+    token.delete()
+
+
+def revoke_user_tokens(user):
+    for token in Token.objects.filter(user=user):
+        revoke_token(token)
+
+
+def invalidate_user_tokens(user):
+    """Descarta de la caché los tokens del usuario (el token sigue siendo válido)."""
+    for key in Token.objects.filter(user=user).values_list('key', flat=True):
+        invalidate_cached_token(key)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """``TokenAuthentication`` que cachea el token con su usuario y rechaza tokens vencidos."""
+
+    def authenticate_credentials(self, key):
+        cache_key = _cache_key(key)
+        token = django_cache.get(cache_key)
+        if token is None:
+            try:
+                token = Token.objects.select_related('user').get(key=key)
+            except Token.DoesNotExist:
+                raise exceptions.AuthenticationFailed('Token inválido.')
+
+            timeout = get_token_auth_settings()['CACHE_TTL']
+            expiry = expires_at(token)
+            if expiry is not None:
+                # La entrada no debe sobrevivir al token
+                timeout = min(timeout, int((expiry - timezone.now()).total_seconds()))
+            if timeout > 0:
+                django_cache.set(cache_key, token, timeout)
+
+        if is_expired(token):
+            revoke_token(token)
+            raise exceptions.AuthenticationFailed('El token expiró. Inicia sesión de nuevo.')
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed('Usuario inactivo o eliminado.')
+        return token.user, token
@@ -0,0 +1,203 @@
+# accounts/availability.py
+"""
+Comprobación rápida de nombres de usuario y emails ya registrados.
+
+Cada proceso mantiene dos filtros de Bloom (usuarios y emails). Si un valor
+no está en el filtro, seguro que no existe y se responde sin consultar la
+base de datos; si puede estar, se confirma con una consulta. Los filtros se
+cargan la primera vez que se usan y se mantienen al día con la señal
+``post_save`` de ``User``.
+
+Para enterarse de usuarios creados en otros workers se cargan solo los
+usuarios con id mayor al último visto: al momento si cambió el contador en la
+caché de Django y, como mínimo, cada ``RELOAD_INTERVAL`` segundos, porque con
+una caché por proceso (LocMemCache) el contador no se comparte. Un usuario
+renombrado en otro proceso no tiene id nuevo y se ve recién cuando el índice
+se reconstruye; hasta entonces la restricción única de la base de datos sigue
+evitando duplicados de nombre de usuario al registrarse.
+"""
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache as django_cache
+from products.singleflight import SingleFlight
+
+DEFAULT_AVAILABILITY_SETTINGS = {
+    'KEY_PREFIX': 'platzi:identity',
+    'CAPACITY': 100_000,
+    'ERROR_RATE': 0.01,
+    'RESULT_TTL': 30,
+    'RELOAD_INTERVAL': 30,
+}
+
+
+def get_availability_settings():
+    config = dict(DEFAULT_AVAILABILITY_SETTINGS)
+    config.update(getattr(settings, 'PLATZI_IDENTITY_INDEX', {}))
+    return config
+
+
+def _key(*parts):
+    return ':'.join([get_availability_settings()['KEY_PREFIX'], *map(str, parts)])
+
+
+def normalize(value):
+    # Se indexa en minúsculas: cubre tanto la búsqueda exacta como la que ignora mayúsculas
+    return (value or '').strip().casefold()
+
+
+class BloomFilter:
+    """Filtro de Bloom con ``k`` posiciones derivadas de un único hash (doble hashing)."""
+
+    def __init__(self, capacity, error_rate=0.01):
+        self.capacity = max(capacity, 1)
+        self.size = max(int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)), 8)
+        self.hashes = max(int(round(self.size / self.capacity * math.log(2))), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class IdentityIndex:
+    """Filtros de Bloom de nombres de usuario y emails del proceso actual."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.usernames = None
+        self.emails = None
+        self.last_id = 0
+        self.version = None
+        self.loaded_at = 0
+        self.db_checks = 0
+        self.fast_misses = 0
+
+    def _load(self, queryset):
+        for pk, username, email in queryset.values_list('pk', 'username', 'email').iterator():
+            self._add(username, email)
+            self.last_id = max(self.last_id, pk)
+
+    def _add(self, username, email):
+        if username:
+            self.usernames.add(normalize(username))
+        if email:
+            self.emails.add(normalize(email))
+
+    def _ensure_ready(self):
+        config = get_availability_settings()
+        version = django_cache.get(_key('version'))
+        expired = time.monotonic() - self.loaded_at >= config['RELOAD_INTERVAL']
+        if self.usernames is not None and version == self.version and not expired:
+            return
+        with self._lock:
+            if self.usernames is None or self.usernames.count > self.usernames.capacity:
+                capacity = max(config['CAPACITY'], User.objects.count() * 2)
+                self.usernames = BloomFilter(capacity, config['ERROR_RATE'])
+                self.emails = BloomFilter(capacity, config['ERROR_RATE'])
+                self.last_id = 0
+                self._load(User.objects.all())
+            elif version != self.version or time.monotonic() - self.loaded_at >= config['RELOAD_INTERVAL']:
+                # Usuarios creados en otros procesos desde la última carga
+                self._load(User.objects.filter(pk__gt=self.last_id))
+            self.version = version
+            self.loaded_at = time.monotonic()
+
+    def add_user(self, user):
+        """Agrega un usuario recién creado o modificado (se llama desde la señal post_save)."""
+        if self.usernames is None:
+            return
+        with self._lock:
+            self._add(user.username, user.email)
+            self.last_id = max(self.last_id, user.pk or 0)
+
+    def might_contain(self, field, value):
+        self._ensure_ready()
+        bloom = self.usernames if field == 'username' else self.emails
+        found = normalize(value) in bloom
+        if found:
+            self.db_checks += 1
+        else:
+            self.fast_misses += 1
+        return found
+
+    def get_stats(self):
+        return {
+            'users_indexed': self.usernames.count if self.usernames is not None else 0,
+            'fast_misses': self.fast_misses,
+            'db_checks': self.db_checks,
+        }
+
+
+index = IdentityIndex()
+
+
+def username_exists(username):
+    """
+    Igual que ``User.objects.filter(username__iexact=...).exists()`` pero sin
+    consulta si seguro no existe. No distingue mayúsculas, como el índice
+    único de la migración ``0001_user_case_insensitive_indexes``.
+    """
+    return index.might_contain('username', username) and User.objects.filter(username__iexact=username).exists()
+
+
+def email_exists(email):
+    return index.might_contain('email', email) and User.objects.filter(email__iexact=email).exists()
+
+
+def _result_key(username):
+    # Misma normalización que los filtros: "Ana" y "ana" comparten resultado y
+    # guardar el usuario invalida todas las variantes
+    return _key('username', hashlib.sha1(normalize(username).encode()).hexdigest())
+
+
+def user_saved(user, previous_username=None):
+    """
+    Mantiene el índice al día y avisa al resto de los procesos. Si el usuario
+    se renombró, también se descarta el resultado cacheado del nombre anterior.
+    """
+    index.add_user(user)
+    try:
+        version = django_cache.incr(_key('version'))
+    except ValueError:
+        version = 1
+        django_cache.set(_key('version'), version, None)
+    if index.version == version - 1:
+        # El índice local ya incluye este cambio: no hace falta recargar
+        index.version = version
+    keys = {_result_key(user.username)}
+    if previous_username:
+        keys.add(_result_key(previous_username))
+    django_cache.delete_many(keys)
+
+
+_checks = SingleFlight()
+
+
+def check_username(username):
+    """
+    Resultado de ``check_username_api``. Las comprobaciones simultáneas del
+    mismo nombre se agrupan en una sola y el resultado se comparte unos
+    segundos entre clientes (se invalida al crear el usuario).
+    """
+    cache_key = _result_key(username)
+    exists = django_cache.get(cache_key)
+    if exists is None:
+        exists = _checks.do(cache_key, lambda: username_exists(username))
+        django_cache.set(cache_key, exists, get_availability_settings()['RESULT_TTL'])
+    return exists
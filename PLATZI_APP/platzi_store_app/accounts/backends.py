@@ -0,0 +1,59 @@
+# accounts/backends.py
+"""
+Backend de autenticación que verifica la contraseña en el pool de hashing.
+
+Igual que ``ModelBackend`` salvo que el cálculo del hash (la parte costosa)
+se hace en ``accounts.hashing_pool``; las consultas y el guardado del hash
+actualizado siguen en el hilo de la petición. Si el pool está lleno se lanza
+``HashingPoolSaturated``, que las vistas de login convierten en un 429.
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import make_password, verify_password
+
+from .hashing_pool import get_pool
+
+UserModel = get_user_model()
+
+
+class PooledModelBackend(ModelBackend):
+    def _username(self, username, kwargs):
+        return username if username is not None else kwargs.get(UserModel.USERNAME_FIELD)
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        username = self._username(username, kwargs)
+        if username is None or password is None:
+            return
+        pool = get_pool()
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            # Se calcula un hash igualmente para no revelar qué usuarios existen (#20760)
+            pool.run(make_password, password)
+            return
+
+        is_correct, must_update = pool.run(verify_password, password, user.password)
+        if is_correct and must_update:
+            # Cambiaron el algoritmo o sus parámetros (ver accounts/hashers.py): se guarda un hash nuevo
+            user.password = pool.run(make_password, password)
+            user.save(update_fields=['password'])
+        if is_correct and self.user_can_authenticate(user):
+            return user
+
+    async def aauthenticate(self, request, username=None, password=None, **kwargs):
+        username = self._username(username, kwargs)
+        if username is None or password is None:
+            return
+        pool = get_pool()
+        try:
+            user = await UserModel._default_manager.aget_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            await pool.arun(make_password, password)
+            return
+
+        is_correct, must_update = await pool.arun(verify_password, password, user.password)
+        if is_correct and must_update:
+            user.password = await pool.arun(make_password, password)
+            await user.asave(update_fields=['password'])
+        if is_correct and self.user_can_authenticate(user):
+            return user
@@ -1,6 +1,6 @@
 # accounts/forms.py
 from django import forms
-from django.contrib.auth.models import User
+from .availability import email_exists, username_exists
 
 class UserRegistrationForm(forms.Form):
     username = forms.CharField(
@@ -59,13 +59,13 @@ class UserRegistrationForm(forms.Form):
         username = self.cleaned_data.get("username")
         if len(username) < 3:
             raise forms.ValidationError("El nombre de usuario debe tener al menos 3 caracteres.")
-        if User.objects.filter(username=username).exists():
+        if username_exists(username):
             raise forms.ValidationError("Este nombre de usuario ya existe.")
         return username
 
     def clean_email(self):
         email = self.cleaned_data.get("email")
-        if User.objects.filter(email=email).exists():
+        if email_exists(email):
             raise forms.ValidationError("Ya existe un usuario con este email.")
         return email
 
@@ -0,0 +1,70 @@
+# accounts/hashers.py
+"""
+Hashers de contraseñas con parámetros configurables.
+
+Mantienen el nombre de algoritmo de Django (``argon2``, ``scrypt``,
+``pbkdf2_sha256``), así que verifican los hashes ya guardados. Los parámetros
+se leen de ``settings.PLATZI_PASSWORD_HASHING``; si cambian, ``must_update``
+lo detecta y Django vuelve a generar el hash con los nuevos parámetros la
+próxima vez que el usuario inicia sesión (``User.check_password``). Lo mismo
+ocurre cuando se cambia el algoritmo preferido (primero de
+``PASSWORD_HASHERS``, que ``settings.py`` arma a partir de ``ALGORITHM``).
+"""
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    PBKDF2PasswordHasher,
+    ScryptPasswordHasher,
+)
+
+DEFAULT_HASHING_SETTINGS = {
+    'ALGORITHM': 'argon2',
+    # Argon2id: memoria en KiB
+    'ARGON2_TIME_COST': 2,
+    'ARGON2_MEMORY_COST': 19 * 1024,
+    'ARGON2_PARALLELISM': 1,
+    # scrypt: memoria usada = 128 * WORK_FACTOR * BLOCK_SIZE bytes
+    'SCRYPT_WORK_FACTOR': 2 ** 14,
+    'SCRYPT_BLOCK_SIZE': 8,
+    'SCRYPT_PARALLELISM': 1,
+    'PBKDF2_ITERATIONS': PBKDF2PasswordHasher.iterations,
+}
+
+def get_hashing_settings():
+    config = dict(DEFAULT_HASHING_SETTINGS)
+    config.update(getattr(settings, 'PLATZI_PASSWORD_HASHING', {}))
+    return config
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    @property
+    def time_cost(self):
+        return get_hashing_settings()['ARGON2_TIME_COST']
+
+    @property
+    def memory_cost(self):
+        return get_hashing_settings()['ARGON2_MEMORY_COST']
+
+    @property
+    def parallelism(self):
+        return get_hashing_settings()['ARGON2_PARALLELISM']
+
+
+class TunedScryptPasswordHasher(ScryptPasswordHasher):
+    @property
+    def work_factor(self):
+        return get_hashing_settings()['SCRYPT_WORK_FACTOR']
+
+    @property
+    def block_size(self):
+        return get_hashing_settings()['SCRYPT_BLOCK_SIZE']
+
+    @property
+    def parallelism(self):
+        return get_hashing_settings()['SCRYPT_PARALLELISM']
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    @property
+    def iterations(self):
+        return get_hashing_settings()['PBKDF2_ITERATIONS']
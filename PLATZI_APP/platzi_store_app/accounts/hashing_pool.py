@@ -0,0 +1,120 @@
+# accounts/hashing_pool.py
+"""
+Pool acotado de hilos para calcular y verificar hashes de contraseñas.
+
+Argon2, scrypt y PBKDF2 liberan el GIL mientras calculan, así que unos pocos
+hilos aprovechan varios núcleos sin bloquear el hilo de la petición ni el
+event loop (con ``asubmit``). El pool admite como máximo ``MAX_WORKERS``
+hashes en curso más ``MAX_QUEUE`` en espera; cuando está lleno se rechaza la
+tarea al instante con ``HashingPoolSaturated`` y las vistas de login
+responden 429 en lugar de acumular peticiones.
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+DEFAULT_POOL_SETTINGS = {
+    'MAX_WORKERS': os.cpu_count() or 2,
+    'MAX_QUEUE': 32,
+    'RETRY_AFTER': 1,
+}
+
+
+def get_pool_settings():
+    config = dict(DEFAULT_POOL_SETTINGS)
+    config.update(getattr(settings, 'PLATZI_HASHING_POOL', {}))
+    return config
+
+
+class HashingPoolSaturated(Exception):
+    """Hay demasiados hashes en curso o en espera; reintentar en ``retry_after`` segundos."""
+
+    def __init__(self, retry_after):
+        super().__init__('Demasiados inicios de sesión simultáneos')
+        self.retry_after = retry_after
+
+
+class HashingPool:
+    def __init__(self, max_workers, max_queue, retry_after=1):
+        self.max_workers = max_workers
+        self.capacity = max_workers + max_queue
+        self.retry_after = retry_after
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='password-hashing')
+        self._slots = threading.BoundedSemaphore(self.capacity)
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def submit(self, fn, *args):
+        """Encola ``fn(*args)`` y devuelve el ``Future``; lanza ``HashingPoolSaturated`` si está lleno."""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise HashingPoolSaturated(self.retry_after)
+        with self._lock:
+            self.pending += 1
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release())
+        return future
+
+    def _release(self):
+        with self._lock:
+            self.pending -= 1
+            self.completed += 1
+        self._slots.release()
+
+    def run(self, fn, *args):
+        """Ejecuta ``fn(*args)`` en el pool y espera el resultado."""
+        return self.submit(fn, *args).result()
+
+    async def arun(self, fn, *args):
+        """Como ``run`` pero sin bloquear el event loop."""
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'capacity': self.capacity,
+                'pending': self.pending,
+                'completed': self.completed,
+                'rejected': self.rejected,
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Devuelve el pool del proceso actual (se crea de nuevo tras un fork)."""
+    global _pool, _pool_pid
+    pid = os.getpid()
+    if _pool is None or _pool_pid != pid:
+        with _pool_lock:
+            if _pool is None or _pool_pid != pid:
+                config = get_pool_settings()
+                _pool = HashingPool(config['MAX_WORKERS'], config['MAX_QUEUE'], config['RETRY_AFTER'])
+                _pool_pid = pid
+    return _pool
+
+
+def reset_pool():
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+        _pool = None
+        _pool_pid = None
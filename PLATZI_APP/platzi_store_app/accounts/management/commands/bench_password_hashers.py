@@ -0,0 +1,140 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    PBKDF2PasswordHasher,
+    ScryptPasswordHasher,
+)
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.hashers import get_hashing_settings
+
+# Clase base de Django y parámetros de PLATZI_PASSWORD_HASHING de cada algoritmo
+ALGORITHMS = {
+    'argon2': (Argon2PasswordHasher, {
+        'time_cost': 'ARGON2_TIME_COST',
+        'memory_cost': 'ARGON2_MEMORY_COST',
+        'parallelism': 'ARGON2_PARALLELISM',
+    }),
+    'scrypt': (ScryptPasswordHasher, {
+        'work_factor': 'SCRYPT_WORK_FACTOR',
+        'block_size': 'SCRYPT_BLOCK_SIZE',
+        'parallelism': 'SCRYPT_PARALLELISM',
+    }),
+    'pbkdf2': (PBKDF2PasswordHasher, {
+        'iterations': 'PBKDF2_ITERATIONS',
+    }),
+}
+
+PASSWORD = 'contraseña-de-prueba-123'
+
+
+def _make_hasher(algorithm, params):
+    hasher_class, _ = ALGORITHMS[algorithm]
+    hasher = hasher_class()
+    for attribute, value in params.items():
+        setattr(hasher, attribute, value)
+    return hasher
+
+
+def _verify_loop(algorithm, params, encoded, iterations):
+    """Verifica la contraseña ``iterations`` veces; se ejecuta en un proceso aparte."""
+    hasher = _make_hasher(algorithm, params)
+    for _ in range(iterations):
+        hasher.verify(PASSWORD, encoded)
+    return iterations
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide el costo de cada hasher de contraseñas con los parámetros de '
+        'PLATZI_PASSWORD_HASHING: tiempo de registro (hash), de login '
+        '(verificación) y logins por segundo por núcleo.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'algorithms',
+            nargs='*',
+            help=f"Algoritmos a medir: {', '.join(ALGORITHMS)} (por defecto todos).",
+        )
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=10,
+            help='Verificaciones por algoritmo y proceso (por defecto 10).',
+        )
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=1,
+            help='Procesos en paralelo para medir el rendimiento total de varios núcleos.',
+        )
+        parser.add_argument(
+            '--set',
+            action='append',
+            default=[],
+            metavar='CLAVE=VALOR',
+            help='Sobrescribe un parámetro, p. ej. --set ARGON2_MEMORY_COST=65536 (se puede repetir).',
+        )
+
+    def _config(self, overrides):
+        config = get_hashing_settings()
+        for item in overrides:
+            key, _, value = item.partition('=')
+            if key not in config or key == 'ALGORITHM':
+                raise CommandError(f'Parámetro desconocido: {key}')
+            try:
+                config[key] = int(value)
+            except ValueError:
+                raise CommandError(f'Valor inválido para {key}: {value}')
+        return config
+
+    def handle(self, *args, **options):
+        unknown = [algorithm for algorithm in options['algorithms'] if algorithm not in ALGORITHMS]
+        if unknown:
+            raise CommandError(f"Algoritmos desconocidos: {', '.join(unknown)}")
+        config = self._config(options['set'])
+        iterations = max(options['iterations'], 1)
+        processes = max(options['processes'], 1)
+
+        self.stdout.write(
+            f"{'algoritmo':<10} {'parámetros':<45} {'hash (ms)':>10} {'login (ms)':>11} "
+            f"{'logins/s/núcleo':>16} {'logins/s total':>15}"
+        )
+        for algorithm in options['algorithms'] or ALGORITHMS:
+            _, keys = ALGORITHMS[algorithm]
+            params = {attribute: config[key] for attribute, key in keys.items()}
+            hasher = _make_hasher(algorithm, params)
+
+            start = time.perf_counter()
+            encoded = hasher.encode(PASSWORD, hasher.salt())
+            hash_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            _verify_loop(algorithm, params, encoded, iterations)
+            verify_time = (time.perf_counter() - start) / iterations
+
+            total = 1 / verify_time
+            if processes > 1:
+                with ProcessPoolExecutor(max_workers=processes) as executor:
+                    start = time.perf_counter()
+                    done = sum(executor.map(
+                        _verify_loop,
+                        [algorithm] * processes,
+                        [params] * processes,
+                        [encoded] * processes,
+                        [iterations] * processes,
+                    ))
+                    total = done / (time.perf_counter() - start)
+
+            description = ', '.join(f'{key}={value}' for key, value in params.items())
+            self.stdout.write(
+                f"{algorithm:<10} {description:<45} {hash_time * 1000:>10.1f} {verify_time * 1000:>11.1f} "
+                f"{1 / verify_time:>16.1f} {total:>15.1f}"
+            )
+
+        if processes > 1:
+            self.stdout.write(f'Total medido con {processes} procesos (núcleos disponibles: {os.cpu_count()}).')
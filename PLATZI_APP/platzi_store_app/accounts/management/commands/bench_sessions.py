@@ -0,0 +1,164 @@
+import os
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection, connections
+from django.test import Client, override_settings
+from django.test.utils import (
+    CaptureQueriesContext,
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+from rest_framework.throttling import SimpleRateThrottle
+
+# Motor de Django sin minimización de escrituras como referencia ("antes")
+ENGINES = {
+    'django-db': 'django.contrib.sessions.backends.db',
+    'db': 'accounts.session_engines.db',
+    'cached_db': 'accounts.session_engines.cached_db',
+    'cache': 'accounts.session_engines.cache',
+    'signed_cookies': 'accounts.session_engines.signed_cookies',
+}
+
+MIDDLEWARE = {
+    'django-db': 'django.contrib.sessions.middleware.SessionMiddleware',
+    'default': 'accounts.middleware.SessionMiddleware',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide peticiones por segundo de una página autenticada con cada motor '
+        'de sesión, junto con las escrituras de sesión, consultas por petición y '
+        'respuestas con error. Usa una base de datos de prueba temporal.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'engines',
+            nargs='*',
+            help=f"Motores a medir: {', '.join(ENGINES)} (por defecto todos).",
+        )
+        parser.add_argument(
+            '--url',
+            default='/api/profile/',
+            help='Página autenticada a pedir (por defecto /api/profile/).',
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=200,
+            help='Peticiones por motor (por defecto 200).',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=4,
+            help='Hilos que hacen peticiones a la vez (por defecto 4).',
+        )
+
+    def _middleware(self, settings_middleware, engine_name):
+        replacement = MIDDLEWARE['django-db' if engine_name == 'django-db' else 'default']
+        return [
+            replacement if path.endswith('SessionMiddleware') else path
+            for path in settings_middleware
+        ]
+
+    def _run(self, user, url, total, concurrency):
+        """Devuelve ``(peticiones/s, errores)``; cada hilo usa su propio cliente."""
+        # Sesiones iniciadas antes de medir: el inicio de sesión escribe siempre
+        clients = []
+        for _ in range(concurrency):
+            client = Client()
+            client.force_login(user)
+            clients.append(client)
+
+        def worker(client, count):
+            errors = 0
+            try:
+                for _ in range(count):
+                    errors += client.get(url).status_code != 200
+            finally:
+                close_old_connections()
+            return errors
+
+        per_worker = [total // concurrency + (1 if i < total % concurrency else 0) for i in range(concurrency)]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            errors = sum(executor.map(worker, clients, per_worker))
+        rps = total / (time.perf_counter() - start)
+        for client in clients:
+            client.logout()
+        return rps, errors
+
+    def handle(self, *args, **options):
+        names = options['engines'] or list(ENGINES)
+        total = max(options['requests'], 1)
+        concurrency = max(options['concurrency'], 1)
+
+        # Base de datos de prueba temporal, como bench_site: el bench no crea
+        # usuarios ni sesiones en la base real
+        setup_test_environment()
+        tmpdir = tempfile.TemporaryDirectory(prefix='bench-sessions-')
+        for alias in connections:
+            if connections[alias].vendor == 'sqlite':
+                connections[alias].settings_dict['TEST']['NAME'] = os.path.join(tmpdir.name, f'{alias}.sqlite3')
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            with (
+                override_settings(
+                    # Sin límites de peticiones: el bench hace en segundos lo que un
+                    # cliente en horas y las respuestas 429 falsearían la medida
+                    PLATZI_RATE_LIMIT=dict(settings.PLATZI_RATE_LIMIT, ENABLED=False),
+                ),
+                mock.patch.dict(SimpleRateThrottle.THROTTLE_RATES, dict.fromkeys(SimpleRateThrottle.THROTTLE_RATES)),
+            ):
+                user = User.objects.create_user(f'bench-{uuid.uuid4().hex[:12]}', password=uuid.uuid4().hex)
+                self._bench(names, user, options['url'], total, concurrency)
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+            tmpdir.cleanup()
+
+    def _bench(self, names, user, url, total, concurrency):
+        self.stdout.write(
+            f"{'motor':<16} {'peticiones/s':>13} {'escrituras/pet.':>16} {'consultas/pet.':>15} {'errores':>8}"
+        )
+        for name in names:
+            if name not in ENGINES:
+                self.stderr.write(f'Motor desconocido: {name}')
+                continue
+            with override_settings(
+                SESSION_ENGINE=ENGINES[name],
+                MIDDLEWARE=self._middleware(settings.MIDDLEWARE, name),
+            ):
+                client = Client()
+                client.force_login(user)
+                client.get(url)
+
+                # Escrituras de sesión (el middleware reenvía la cookie cada vez que
+                # guarda) y consultas a la base de datos en una muestra de peticiones.
+                # Las respuestas distintas de 200 cuentan como errores.
+                sample = 20
+                writes = 0
+                errors = 0
+                with CaptureQueriesContext(connection) as queries:
+                    for _ in range(sample):
+                        response = client.get(url)
+                        writes += settings.SESSION_COOKIE_NAME in response.cookies
+                        errors += response.status_code != 200
+                client.logout()
+                rps, run_errors = self._run(user, url, total, concurrency)
+                errors += run_errors
+
+            self.stdout.write(
+                f"{name:<16} {rps:>13.1f} {writes / sample:>16.2f} {len(queries) / sample:>15.2f} {errors:>8}"
+            )
@@ -0,0 +1,16 @@
+# accounts/middleware.py
+from django.contrib.sessions.middleware import SessionMiddleware as DjangoSessionMiddleware
+
+
+class SessionMiddleware(DjangoSessionMiddleware):
+    """
+    ``SessionMiddleware`` que no guarda la sesión si sus datos no cambiaron
+    durante la petición (ver ``accounts.session_engines``).
+    """
+
+    def process_response(self, request, response):
+        session = getattr(request, 'session', None)
+        has_changed = getattr(session, 'has_changed', None)
+        if session is not None and session.modified and has_changed is not None and not has_changed():
+            session.modified = False
+        return super().process_response(request, response)
@@ -0,0 +1,59 @@
+# Índices únicos sin distinguir mayúsculas para auth_user.username y auth_user.email.
+#
+# El modelo User pertenece a django.contrib.auth, así que no se puede usar
+# AddConstraint desde esta app: los índices se crean con el schema editor, que
+# genera el SQL de cada motor (UPPER(...) en SQLite/PostgreSQL, índice
+# funcional en MySQL 8). Respaldan las búsquedas ``__iexact`` de
+# accounts/availability.py y evitan duplicados como "Ana" y "ana" aunque dos
+# registros lleguen a la vez.
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+from django.db.models.functions import Upper
+
+CONSTRAINTS = [
+    models.UniqueConstraint(Upper('username'), name='accounts_user_username_ci_uniq'),
+    # Django permite usuarios sin email (p. ej. createsuperuser): se excluyen del índice
+    models.UniqueConstraint(Upper('email'), condition=~Q(email=''), name='accounts_user_email_ci_uniq'),
+]
+
+
+def _check_duplicates(User):
+    for field in ('username', 'email'):
+        duplicates = list(
+            User.objects.exclude(**{field: ''})
+            .annotate(normalized=Upper(field))
+            .values('normalized')
+            .annotate(total=Count('pk'))
+            .filter(total__gt=1)
+            .values_list('normalized', flat=True)[:10]
+        )
+        if duplicates:
+            raise RuntimeError(
+                f'Hay valores de {field} repetidos sin distinguir mayúsculas '
+                f'({", ".join(duplicates)}). Corrígelos antes de aplicar esta migración.'
+            )
+
+
+def add_indexes(apps, schema_editor):
+    User = apps.get_model('auth', 'User')
+    _check_duplicates(User)
+    for constraint in CONSTRAINTS:
+        schema_editor.add_constraint(User, constraint)
+
+
+def remove_indexes(apps, schema_editor):
+    User = apps.get_model('auth', 'User')
+    for constraint in CONSTRAINTS:
+        schema_editor.remove_constraint(User, constraint)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_indexes, remove_indexes),
+    ]
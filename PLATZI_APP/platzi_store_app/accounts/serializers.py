@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate
+from .availability import email_exists, username_exists
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -43,11 +44,22 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         
         return attrs
     
+    def validate_username(self, value):
+        """
+        Valida que el nombre de usuario no exista, sin distinguir mayúsculas
+        (el validador de unicidad del modelo sí las distingue).
+        """
+        if username_exists(value):
+            raise serializers.ValidationError(
+                'Ya existe un usuario con este nombre de usuario'
+            )
+        return value
+    
     def validate_email(self, value):
         """
         Valida que el email no esté ya registrado en el sistema.
         """
-        if User.objects.filter(email=value).exists():
+        if email_exists(value):
             raise serializers.ValidationError(
                 'Ya existe un usuario con este correo electrónico'
             )
@@ -0,0 +1,45 @@
+# accounts/session_engines/__init__.py
+"""
+Motores de sesión de Django con escritura mínima.
+
+Cada módulo (``db``, ``cache``, ``cached_db``, ``signed_cookies``) expone un
+``SessionStore`` igual al de Django más ``has_changed()``: compara los datos
+actuales con los que se cargaron al inicio de la petición. El
+``SessionMiddleware`` de ``accounts.middleware`` solo guarda la sesión si
+cambió de verdad, aunque se haya marcado como modificada (p. ej. al volver a
+asignar el mismo valor).
+
+Se elige con ``PLATZI_SESSION_ENGINE`` en settings.
+"""
+import hashlib
+
+
+class WriteMinimizingSessionMixin:
+    def _digest(self, data):
+        return hashlib.sha1(self.serializer().dumps(data)).hexdigest()
+
+    def _get_session(self, no_load=False):
+        first_load = not hasattr(self, '_session_cache')
+        session = super()._get_session(no_load)
+        if first_load and not no_load:
+            self._initial_key = self.session_key
+            self._initial_digest = self._digest(session)
+        return session
+
+    # SessionBase define la propiedad con su propio _get_session
+    _session = property(_get_session)
+
+    def cycle_key(self):
+        super().cycle_key()
+        # Con signed_cookies la clave puede no cambiar, pero la cookie debe reenviarse
+        self._key_cycled = True
+
+    def has_changed(self):
+        """True si hay que guardar: datos distintos de los cargados, clave nueva o sesión nueva."""
+        if (
+            not hasattr(self, '_initial_digest')
+            or getattr(self, '_key_cycled', False)
+            or self.session_key != self._initial_key
+        ):
+            return True
+        return self._digest(self._session) != self._initial_digest
@@ -0,0 +1,7 @@
+from django.contrib.sessions.backends.db import SessionStore as BaseSessionStore
+
+from . import WriteMinimizingSessionMixin
+
+
+class SessionStore(WriteMinimizingSessionMixin, BaseSessionStore):
+    pass
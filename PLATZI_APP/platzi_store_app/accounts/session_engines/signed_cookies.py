@@ -0,0 +1,7 @@
+from django.contrib.sessions.backends.signed_cookies import SessionStore as BaseSessionStore
+
+from . import WriteMinimizingSessionMixin
+
+
+class SessionStore(WriteMinimizingSessionMixin, BaseSessionStore):
+    pass
@@ -0,0 +1,49 @@
+# accounts/signals.py
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from . import availability, signed_tokens
+from .authentication import invalidate_cached_token, invalidate_user_tokens
+
+
+@receiver(pre_save, sender=User)
+def remember_previous_state(sender, instance, update_fields=None, **kwargs):
+    # set_password deja la contraseña en claro en _password hasta que se guarda
+    instance._signed_tokens_stale = getattr(instance, '_password', None) is not None
+    instance._previous_username = None
+    renaming = update_fields is None or 'username' in update_fields
+    if instance.pk is not None and not instance._state.adding and renaming:
+        # Nombre guardado, para invalidar el resultado cacheado si se renombra
+        instance._previous_username = User.objects.filter(pk=instance.pk).values_list('username', flat=True).first()
+
+
+@receiver(post_save, sender=User)
+def invalidate_cached_tokens_on_user_change(sender, instance, update_fields=None, **kwargs):
+    """El token cacheado guarda una copia del usuario: se descarta cuando el usuario cambia."""
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        # Cada login actualiza last_login; no afecta a la autenticación
+        return
+    availability.user_saved(instance, previous_username=getattr(instance, '_previous_username', None))
+    invalidate_user_tokens(instance)
+    if not instance.is_active or getattr(instance, '_signed_tokens_stale', False):
+        # Los tokens firmados no consultan la base de datos: se revocan
+        # explícitamente al desactivar al usuario o cambiar su contraseña (los de
+        # refresco además comprueban la huella de la contraseña al canjearse)
+        signed_tokens.revoke_user(instance.pk)
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_cached_token_on_delete(sender, instance, **kwargs):
+    """
+    Un token borrado (desde el admin o al borrar su usuario, en cascada) deja
+    de autenticar al instante en lugar de seguir en la caché hasta CACHE_TTL.
+    """
+    invalidate_cached_token(instance.key)
+
+
+@receiver(post_delete, sender=User)
+def revoke_signed_tokens_on_user_delete(sender, instance, **kwargs):
+    # El token de acceso lleva los datos del usuario y no consulta la base de datos
+    signed_tokens.revoke_user(instance.pk)
@@ -0,0 +1,197 @@
+# accounts/signed_tokens.py
+"""
+Tokens firmados (estilo JWT) como modo de autenticación opcional de la API.
+
+Con ``PLATZI_SIGNED_TOKENS['ENABLED']`` el login y el registro entregan un
+token de acceso de vida corta y un token de refresco. El token de acceso
+lleva los datos del usuario y se verifica solo con la firma (HMAC con
+``SECRET_KEY`` mediante ``django.core.signing``): autenticar una petición no
+consulta la base de datos, así que cualquier nodo con la misma clave puede
+verificarlo.
+
+La revocación usa una lista de denegación compacta en la caché: el ``jti`` de
+cada token revocado se guarda solo hasta que el token vence por sí mismo, y
+``revoke_user`` invalida todos los tokens emitidos antes de un instante.
+El token de refresco lleva además una huella del hash de la contraseña: al
+cambiarla o restablecerla deja de servir aunque la denylist no se comparta
+entre procesos (caché local).
+
+El modo de token de DRF (``CachedTokenAuthentication``) sigue disponible.
+"""
+import secrets
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import signing
+from django.core.cache import cache as django_cache
+from django.utils.crypto import constant_time_compare, salted_hmac
+from django.utils.dateparse import parse_datetime
+from rest_framework import exceptions
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
+
+ACCESS = 'access'
+REFRESH = 'refresh'
+
+DEFAULT_SIGNED_TOKEN_SETTINGS = {
+    'ENABLED': False,
+    'ACCESS_TTL': 5 * 60,
+    'REFRESH_TTL': 7 * 24 * 60 * 60,
+    'SALT': 'accounts.signed_tokens',
+    'KEY_PREFIX': 'platzi:denylist',
+    'AUTH_HEADER_KEYWORD': 'Bearer',
+}
+
+# Datos del usuario que viajan en el token de acceso
+USER_CLAIMS = ('username', 'email', 'first_name', 'last_name', 'is_active')
+
+
+class InvalidToken(Exception):
+    pass
+
+
+def get_signed_token_settings():
+    config = dict(DEFAULT_SIGNED_TOKEN_SETTINGS)
+    config.update(getattr(settings, 'PLATZI_SIGNED_TOKENS', {}))
+    return config
+
+
+def is_enabled():
+    return get_signed_token_settings()['ENABLED']
+
+
+def _salt(token_type):
+    return f"{get_signed_token_settings()['SALT']}.{token_type}"
+
+
+def _denylist_key(*parts):
+    return ':'.join([get_signed_token_settings()['KEY_PREFIX'], *map(str, parts)])
+
+
+def _password_fingerprint(user):
+    """Huella del hash de la contraseña actual (cambia con set_password)."""
+    return salted_hmac(f"{get_signed_token_settings()['SALT']}.password", user.password).hexdigest()[:16]
+
+
+def _encode(user, token_type, ttl):
+    now = time.time()
+    claims = {
+        'typ': token_type,
+        'jti': secrets.token_urlsafe(12),
+        'sub': user.pk,
+        'iat': now,
+        'exp': now + ttl,
+    }
+    if token_type == ACCESS:
+        claims['usr'] = {field: getattr(user, field) for field in USER_CLAIMS}
+        claims['usr']['date_joined'] = user.date_joined.isoformat() if user.date_joined else None
+    else:
+        claims['pwd'] = _password_fingerprint(user)
+    return signing.dumps(claims, salt=_salt(token_type), compress=True), claims
+
+
+def _expiry(claims):
+    return datetime.fromtimestamp(claims['exp'], tz=timezone.utc)
+
+
+def issue_tokens(user):
+    """Devuelve un par nuevo de tokens de acceso y de refresco para ``user``."""
+    config = get_signed_token_settings()
+    access, access_claims = _encode(user, ACCESS, config['ACCESS_TTL'])
+    refresh, refresh_claims = _encode(user, REFRESH, config['REFRESH_TTL'])
+    return {
+        'access': access,
+        'refresh': refresh,
+        'access_expires_at': _expiry(access_claims),
+        'refresh_expires_at': _expiry(refresh_claims),
+    }
+
+
+def decode(token, token_type):
+    """Verifica firma, tipo, vencimiento y denylist; devuelve los claims o lanza ``InvalidToken``."""
+    try:
+        claims = signing.loads(token, salt=_salt(token_type))
+    except signing.BadSignature:
+        raise InvalidToken('Token inválido.')
+    if claims.get('typ') != token_type:
+        raise InvalidToken('Tipo de token incorrecto.')
+    if claims['exp'] <= time.time():
+        raise InvalidToken('El token expiró.')
+
+    # Una sola consulta a la caché para las dos listas
+    jti_key = _denylist_key('jti', claims['jti'])
+    user_key = _denylist_key('user', claims['sub'])
+    denied = django_cache.get_many([jti_key, user_key])
+    if jti_key in denied or claims['iat'] <= denied.get(user_key, 0):
+        raise InvalidToken('El token fue revocado.')
+    return claims
+
+
+def revoke(claims):
+    """Agrega el token a la denylist hasta el momento en que vencería."""
+    remaining = int(claims['exp'] - time.time()) + 1
+    if remaining > 0:
+        django_cache.set(_denylist_key('jti', claims['jti']), 1, remaining)
+
+
+def revoke_user(user_id):
+    """Invalida todos los tokens firmados emitidos hasta ahora para el usuario."""
+    django_cache.set(
+        _denylist_key('user', user_id),
+        time.time(),
+        get_signed_token_settings()['REFRESH_TTL'],
+    )
+
+
+def refresh_tokens(refresh_token):
+    """
+    Canjea un token de refresco por un par nuevo (el de refresco anterior se
+    revoca). Aquí sí se consulta la base de datos para comprobar que el
+    usuario sigue activo y que su contraseña no cambió.
+    """
+    claims = decode(refresh_token, REFRESH)
+    user = User.objects.filter(pk=claims['sub'], is_active=True).first()
+    if user is None:
+        raise InvalidToken('Usuario inactivo o eliminado.')
+    if not constant_time_compare(claims.get('pwd', ''), _password_fingerprint(user)):
+        raise InvalidToken('La contraseña cambió. Inicia sesión de nuevo.')
+    revoke(claims)
+    return user, issue_tokens(user)
+
+
+def token_user(claims):
+    """Usuario construido a partir del token de acceso, sin consultar la base de datos."""
+    data = dict(claims['usr'])
+    date_joined = data.pop('date_joined', None)
+    user = User(pk=claims['sub'], date_joined=parse_datetime(date_joined) if date_joined else None, **data)
+    # Se comporta como un objeto cargado desde la base de datos
+    user._state.adding = False
+    return user
+
+
+class SignedTokenAuthentication(BaseAuthentication):
+    """
+    Autentica ``Authorization: Bearer <token de acceso>`` verificando solo la
+    firma. ``request.auth`` queda con los claims del token.
+    """
+
+    def authenticate(self, request):
+        config = get_signed_token_settings()
+        auth = get_authorization_header(request).split()
+        if not config['ENABLED'] or not auth or auth[0].lower() != config['AUTH_HEADER_KEYWORD'].lower().encode():
+            return None
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed('Encabezado de autorización inválido.')
+
+        try:
+            claims = decode(auth[1].decode(), ACCESS)
+        except (InvalidToken, UnicodeError) as e:
+            raise exceptions.AuthenticationFailed(str(e))
+        user = token_user(claims)
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed('Usuario inactivo o eliminado.')
+        return user, claims
+
+    def authenticate_header(self, request):
+        return get_signed_token_settings()['AUTH_HEADER_KEYWORD']
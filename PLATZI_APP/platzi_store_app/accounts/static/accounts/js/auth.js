@@ -10,7 +10,8 @@ const API_ENDPOINTS = {
     register: '/api/register/',
     logout: '/api/logout/',
     checkUsername: '/api/check-username/',
-    profile: '/api/profile/'
+    profile: '/api/profile/',
+    refresh: '/api/token/refresh/'
 };
 
 // Utilidades para manejo de tokens
@@ -29,11 +30,54 @@ const TokenManager = {
         return localStorage.getItem('authToken');
     },
     
+    /**
+     * Guarda las credenciales de la respuesta de login/registro:
+     * token de DRF o, en modo de tokens firmados, acceso + refresco
+     */
+    setCredentials: function(data) {
+        if (data.access) {
+            localStorage.setItem('authToken', data.access);
+            localStorage.setItem('authTokenType', 'Bearer');
+            localStorage.setItem('refreshToken', data.refresh);
+        } else {
+            this.setToken(data.token);
+            localStorage.setItem('authTokenType', 'Token');
+            localStorage.removeItem('refreshToken');
+        }
+    },
+    
+    /**
+     * Encabezado Authorization para las peticiones a la API
+     */
+    getAuthHeader: function() {
+        const type = localStorage.getItem('authTokenType') || 'Token';
+        return `${type} ${this.getToken()}`;
+    },
+    
+    /**
+     * Canjea el token de refresco por uno de acceso nuevo; devuelve true si lo logró
+     */
+    refresh: async function() {
+        const refreshToken = localStorage.getItem('refreshToken');
+        if (!refreshToken) return false;
+        
+        const response = await fetch(API_BASE_URL + API_ENDPOINTS.refresh, {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify({refresh: refreshToken})
+        });
+        if (!response.ok) return false;
+        this.setCredentials(await response.json());
+        return true;
+    },
+    
     /**
      * Elimina el token de localStorage
      */
     removeToken: function() {
         localStorage.removeItem('authToken');
+        localStorage.removeItem('authTokenType');
+        localStorage.removeItem('refreshToken');
     },
     
     /**
@@ -165,7 +209,7 @@ const LoginHandler = {
             
             if (response.ok && data.success) {
                 // Login exitoso
-                TokenManager.setToken(data.token);
+                TokenManager.setCredentials(data);
                 
                 // Guardar información del usuario
                 if (data.user) {
@@ -216,11 +260,17 @@ const LoginHandler = {
         if (!token) return;
         
         try {
-            const response = await fetch(API_BASE_URL + API_ENDPOINTS.profile, {
+            const fetchProfile = () => fetch(API_BASE_URL + API_ENDPOINTS.profile, {
                 headers: {
-                    'Authorization': `Token ${token}`
+                    'Authorization': TokenManager.getAuthHeader()
                 }
             });
+            let response = await fetchProfile();
+            
+            // El token de acceso firmado vence pronto: se intenta renovar una vez
+            if (response.status === 401 && await TokenManager.refresh()) {
+                response = await fetchProfile();
+            }
             
             if (!response.ok) {
                 // Token inválido, limpiar
@@ -247,8 +297,15 @@ const LoginHandler = {
     }
 };
 
+// Milisegundos sin teclear antes de consultar la disponibilidad del username
+const USERNAME_CHECK_DELAY = 300;
+
 // Manejador de Registro
 const RegisterHandler = {
+    usernameTimer: null,
+    usernameRequest: null,
+    usernameResults: {},
+    
     /**
      * Inicializa los event listeners del formulario de registro
      */
@@ -265,9 +322,13 @@ const RegisterHandler = {
             checkUsernameBtn.addEventListener('click', this.checkUsernameAvailability.bind(this));
         }
         
-        // Validación en tiempo real de username
+        // Validación en tiempo real de username (espera a que se deje de escribir)
         const usernameInput = document.getElementById('username');
         if (usernameInput) {
+            usernameInput.addEventListener('input', () => {
+                clearTimeout(this.usernameTimer);
+                this.usernameTimer = setTimeout(() => this.checkUsernameAvailability(), USERNAME_CHECK_DELAY);
+            });
             usernameInput.addEventListener('blur', this.checkUsernameAvailability.bind(this));
         }
         
@@ -295,6 +356,45 @@ const RegisterHandler = {
         }
     },
     
+    /**
+     * Consulta si el username está disponible. Los resultados se recuerdan por
+     * username y la consulta anterior se cancela si todavía no respondió.
+     */
+    checkUsernameAvailability: async function() {
+        clearTimeout(this.usernameTimer);
+        const input = document.getElementById('username');
+        if (!input) return;
+        const username = input.value.trim();
+        if (username.length < 3) {
+            input.classList.remove('is-valid', 'is-invalid');
+            return;
+        }
+        
+        let available = this.usernameResults[username];
+        if (available === undefined) {
+            if (this.usernameRequest) this.usernameRequest.abort();
+            const controller = new AbortController();
+            this.usernameRequest = controller;
+            try {
+                const url = `${API_BASE_URL}${API_ENDPOINTS.checkUsername}?username=${encodeURIComponent(username)}`;
+                const response = await fetch(url, {signal: controller.signal});
+                if (!response.ok) return;
+                available = (await response.json()).available;
+                this.usernameResults[username] = available;
+            } catch (error) {
+                // Cancelada por una consulta más reciente o error de red
+                return;
+            } finally {
+                if (this.usernameRequest === controller) this.usernameRequest = null;
+            }
+        }
+        
+        // El usuario pudo seguir escribiendo mientras se esperaba la respuesta
+        if (input.value.trim() !== username) return;
+        input.classList.toggle('is-valid', available);
+        input.classList.toggle('is-invalid', !available);
+    },
+    
     /**
      * Maneja el submit del formulario de registro
      */
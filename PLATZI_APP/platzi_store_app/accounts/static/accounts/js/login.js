@@ -0,0 +1,34 @@
+// Página de inicio de sesión
+
+document.addEventListener('DOMContentLoaded', function() {
+  // Toggle password visibility
+  const togglePassword = document.getElementById('togglePassword');
+  const passwordField = togglePassword && document.getElementById(togglePassword.dataset.target);
+  const eyeIcon = document.getElementById('eyeIcon');
+  
+  if (togglePassword && passwordField) {
+    togglePassword.addEventListener('click', function() {
+      const type = passwordField.getAttribute('type') === 'password' ? 'text' : 'password';
+      passwordField.setAttribute('type', type);
+      
+      eyeIcon.className = type === 'password' ? 'fas fa-eye' : 'fas fa-eye-slash';
+    });
+  }
+  
+  // Auto-focus first empty field
+  const firstEmptyField = document.querySelector('.form-control:not([value]):not(:disabled)');
+  if (firstEmptyField) {
+    firstEmptyField.focus();
+  }
+
+  // Animación de entrada
+  const loginCard = document.querySelector('.login-card');
+  loginCard.style.opacity = '0';
+  loginCard.style.transform = 'translateY(30px)';
+  
+  setTimeout(() => {
+    loginCard.style.transition = 'all 0.6s ease';
+    loginCard.style.opacity = '1';
+    loginCard.style.transform = 'translateY(0)';
+  }, 100);
+});
@@ -0,0 +1,132 @@
+// Página de registro: fuerza y coincidencia de contraseñas
+
+document.addEventListener('DOMContentLoaded', function() {
+  // Referencias a elementos
+  const togglePassword1 = document.getElementById('togglePassword1');
+  const togglePassword2 = document.getElementById('togglePassword2');
+  const password1 = togglePassword1 && document.getElementById(togglePassword1.dataset.target);
+  const password2 = togglePassword2 && document.getElementById(togglePassword2.dataset.target);
+  const passwordStrength = document.getElementById('passwordStrength');
+  const passwordHelp = document.getElementById('passwordHelp');
+  const passwordMatch = document.getElementById('passwordMatch');
+  const acceptTerms = document.getElementById('acceptTerms');
+  const submitBtn = document.getElementById('submitBtn');
+  const submitSpinner = document.getElementById('submitSpinner');
+  const submitIcon = document.getElementById('submitIcon');
+  const form = document.getElementById('registerForm');
+
+  // Toggle password visibility
+  function setupPasswordToggle(buttonId, iconId) {
+    const toggleBtn = document.getElementById(buttonId);
+    const field = toggleBtn && document.getElementById(toggleBtn.dataset.target);
+    const icon = document.getElementById(iconId);
+    
+    if (toggleBtn && field && icon) {
+      toggleBtn.addEventListener('click', function() {
+        const type = field.getAttribute('type') === 'password' ? 'text' : 'password';
+        field.setAttribute('type', type);
+        icon.className = type === 'password' ? 'fas fa-eye' : 'fas fa-eye-slash';
+      });
+    }
+  }
+
+  setupPasswordToggle('togglePassword1', 'eyeIcon1');
+  setupPasswordToggle('togglePassword2', 'eyeIcon2');
+
+  // Password strength checker
+  if (password1 && passwordStrength && passwordHelp) {
+    password1.addEventListener('input', function() {
+      const password = this.value;
+      const strength = calculatePasswordStrength(password);
+      
+      passwordStrength.style.width = strength.percentage + '%';
+      passwordStrength.className = 'progress-bar ' + strength.class;
+      passwordHelp.textContent = strength.message;
+      passwordHelp.className = 'form-text ' + strength.textClass;
+    });
+  }
+
+  // Password match checker
+  if (password2 && passwordMatch) {
+    function checkPasswordMatch() {
+      const pass1 = password1 ? password1.value : '';
+      const pass2 = password2.value;
+      
+      if (pass2.length > 0) {
+        if (pass1 === pass2) {
+          passwordMatch.innerHTML = '<i class="fas fa-check-circle" style="color: #00ff88;"></i> Contraseñas coinciden';
+          passwordMatch.className = 'form-text';
+          passwordMatch.style.color = '#00ff88';
+        } else {
+          passwordMatch.innerHTML = '<i class="fas fa-times-circle" style="color: #ff4757;"></i> Contraseñas no coinciden';
+          passwordMatch.className = 'form-text';
+          passwordMatch.style.color = '#ff4757';
+        }
+      } else {
+        passwordMatch.innerHTML = '';
+      }
+    }
+
+    password2.addEventListener('input', checkPasswordMatch);
+    if (password1) password1.addEventListener('input', checkPasswordMatch);
+  }
+
+  // Form submission handling
+  if (form && submitBtn) {
+    form.addEventListener('submit', function(e) {
+      // Check if terms are accepted
+      if (acceptTerms && !acceptTerms.checked) {
+        e.preventDefault();
+        alert('Debes aceptar los términos del sistema para continuar.');
+        return false;
+      }
+
+      // Show loading state
+      submitBtn.disabled = true;
+      submitSpinner.classList.remove('d-none');
+      submitIcon.classList.add('d-none');
+      submitBtn.innerHTML = '<span class="spinner-border spinner-border-sm me-2"></span>Procesando...';
+    });
+  }
+
+  // Helper function to calculate password strength
+  function calculatePasswordStrength(password) {
+    let score = 0;
+    let message = 'Muy débil';
+    let className = 'bg-danger';
+    let textClass = 'text-danger';
+
+    if (password.length >= 8) score += 25;
+    if (password.match(/[a-z]/)) score += 25;
+    if (password.match(/[A-Z]/)) score += 25;
+    if (password.match(/[0-9]/)) score += 12.5;
+    if (password.match(/[^a-zA-Z0-9]/)) score += 12.5;
+
+    if (score >= 75) {
+      message = 'Muy fuerte';
+      className = 'bg-success';
+      textClass = '';
+    } else if (score >= 50) {
+      message = 'Fuerte';
+      className = 'bg-info';
+      textClass = '';
+    } else if (score >= 25) {
+      message = 'Débil';
+      className = 'bg-warning';
+      textClass = '';
+    }
+
+    return {
+      percentage: Math.min(100, score),
+      message: message,
+      class: className,
+      textClass: textClass
+    };
+  }
+
+  // Auto-focus first field
+  const firstField = document.querySelector('.form-control');
+  if (firstField) {
+    firstField.focus();
+  }
+});
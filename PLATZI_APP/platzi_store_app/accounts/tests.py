@@ -1,3 +1,236 @@
-from django.test import TestCase
+import time
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from . import availability, signed_tokens
+from .authentication import invalidate_cached_token, issue_token, rotate_token
+from .availability import BloomFilter, IdentityIndex
+
+
+class BloomFilterTests(SimpleTestCase):
+    def test_no_false_negatives(self):
+        bloom = BloomFilter(1000, error_rate=0.01)
+        items = [f'usuario{i}' for i in range(1000)]
+        for item in items:
+            bloom.add(item)
+        self.assertTrue(all(item in bloom for item in items))
+        self.assertEqual(bloom.count, 1000)
+
+    def test_false_positive_rate_near_configured(self):
+        bloom = BloomFilter(1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f'usuario{i}')
+        false_positives = sum(f'otro{i}' in bloom for i in range(10_000))
+        # 1% esperado; margen amplio para no depender de la distribución del hash
+        self.assertLess(false_positives / 10_000, 0.03)
+
+
+class AvailabilityTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        # Índice vacío por test: el del proceso puede venir cargado de otros tests
+        patcher = mock.patch.object(availability, 'index', IdentityIndex())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_username_exists_ignores_case(self):
+        User.objects.create_user('Ana', 'ana@example.com', 'x')
+        self.assertTrue(availability.username_exists('ana'))
+        self.assertTrue(availability.username_exists('ANA'))
+        self.assertFalse(availability.username_exists('anabel'))
+
+    def test_email_exists_ignores_case(self):
+        User.objects.create_user('ana', 'Ana@Example.com', 'x')
+        self.assertTrue(availability.email_exists('ana@example.com'))
+        self.assertFalse(availability.email_exists('otra@example.com'))
+
+    def test_unknown_username_skips_database(self):
+        User.objects.create_user('ana', 'ana@example.com', 'x')
+        availability.username_exists('ana')
+        with self.assertNumQueries(0):
+            self.assertFalse(availability.username_exists('nadie-con-este-nombre'))
+
+    def test_new_user_indexed_without_reload(self):
+        availability.username_exists('ana')
+        User.objects.create_user('Bea', 'bea@example.com', 'x')
+        self.assertTrue(availability.username_exists('bea'))
+
+    def test_check_username_result_shared_across_case(self):
+        self.assertFalse(availability.check_username('Maria'))
+        with self.assertNumQueries(0):
+            self.assertFalse(availability.check_username('MARIA'))
+
+    def test_saving_user_invalidates_cached_result_for_any_case(self):
+        self.assertFalse(availability.check_username('Maria'))
+        User.objects.create_user('maria', 'maria@example.com', 'x')
+        self.assertTrue(availability.check_username('Maria'))
+        self.assertTrue(availability.check_username('MARIA'))
+
+    def test_renaming_user_invalidates_cached_result_for_old_name(self):
+        user = User.objects.create_user('maria', 'maria@example.com', 'x')
+        self.assertTrue(availability.check_username('maria'))
+        user.username = 'mariana'
+        user.save()
+        self.assertFalse(availability.check_username('maria'))
+
+    @override_settings(PLATZI_IDENTITY_INDEX={'RELOAD_INTERVAL': 30})
+    def test_users_from_other_processes_loaded_after_interval(self):
+        availability.username_exists('ana')
+        # bulk_create no envía post_save: simula un registro en otro worker sin caché compartida
+        User.objects.bulk_create([User(username='carla', email='carla@example.com')])
+        self.assertFalse(availability.username_exists('carla'))
+        with mock.patch('accounts.availability.time.monotonic', return_value=time.monotonic() + 31):
+            self.assertTrue(availability.username_exists('carla'))
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    url = '/api/profile/'
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('ana', 'ana@example.com', 'secreta-123')
+        self.token = issue_token(self.user)
+
+    def get(self, key=None):
+        return self.client.get(self.url, HTTP_AUTHORIZATION=f'Token {key or self.token.key}')
+
+    def test_token_authenticates_from_cache(self):
+        self.assertEqual(self.get().status_code, 200)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get().status_code, 200)
+
+    def test_expired_token_rejected_and_revoked(self):
+        self.get()
+        Token.objects.filter(pk=self.token.pk).update(created=timezone.now() - timedelta(days=30))
+        # La copia cacheada también guarda la fecha de creación
+        invalidate_cached_token(self.token.key)
+        self.assertEqual(self.get().status_code, 401)
+        self.assertFalse(Token.objects.filter(pk=self.token.pk).exists())
+
+    @override_settings(PLATZI_TOKEN_AUTH={'TOKEN_TTL': 60})
+    def test_expiry_caps_cache_entry(self):
+        self.token.created = timezone.now() - timedelta(seconds=30)
+        self.token.save()
+        with mock.patch('accounts.authentication.django_cache.set') as cache_set:
+            self.get()
+        timeouts = [call.args[2] for call in cache_set.call_args_list if call.args[0].startswith('platzi:token')]
+        # La entrada cacheada no sobrevive al token
+        self.assertTrue(timeouts)
+        self.assertTrue(all(timeout <= 30 for timeout in timeouts))
+
+    def test_rotation_invalidates_old_token(self):
+        self.get()
+        new_token = rotate_token(self.token)
+        self.assertEqual(self.get().status_code, 401)
+        self.assertEqual(self.get(new_token.key).status_code, 200)
+
+    def test_logout_revokes_token(self):
+        self.get()
+        response = self.client.post('/api/logout/', HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.get().status_code, 401)
+
+    def test_deactivating_user_invalidates_cached_token(self):
+        self.get()
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.get().status_code, 401)
+
+    def test_last_login_update_keeps_cache(self):
+        self.get()
+        self.user.last_login = timezone.now()
+        self.user.save(update_fields=['last_login'])
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get().status_code, 200)
+
+    def test_deleting_token_invalidates_cache(self):
+        self.get()
+        Token.objects.filter(pk=self.token.pk).delete()
+        self.assertEqual(self.get().status_code, 401)
+
+    def test_deleting_user_invalidates_cache(self):
+        self.get()
+        self.user.delete()
+        self.assertEqual(self.get().status_code, 401)
+
+
+@override_settings(PLATZI_SIGNED_TOKENS={'ENABLED': True})
+class SignedTokenTests(TestCase):
+    url = '/api/profile/'
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('ana', 'ana@example.com', 'secreta-123')
+        self.tokens = signed_tokens.issue_tokens(self.user)
+
+    def get(self, access=None):
+        return self.client.get(self.url, HTTP_AUTHORIZATION=f"Bearer {access or self.tokens['access']}")
+
+    def refresh(self, refresh=None):
+        return self.client.post(
+            '/api/token/refresh/', {'refresh': refresh or self.tokens['refresh']}, content_type='application/json'
+        )
+
+    def test_access_token_authenticates_without_database(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get().status_code, 200)
+
+    def test_tampered_token_rejected(self):
+        self.assertEqual(self.get(self.tokens['access'][:-2] + 'xx').status_code, 401)
+
+    def test_refresh_token_not_accepted_as_access(self):
+        self.assertEqual(self.get(self.tokens['refresh']).status_code, 401)
+        with self.assertRaises(signed_tokens.InvalidToken):
+            signed_tokens.decode(self.tokens['access'], signed_tokens.REFRESH)
+
+    def test_expired_token_rejected(self):
+        expired_at = self.tokens['access_expires_at'].timestamp() + 1
+        with mock.patch('accounts.signed_tokens.time.time', return_value=expired_at):
+            self.assertEqual(self.get().status_code, 401)
+
+    def test_revoked_jti_rejected(self):
+        signed_tokens.revoke(signed_tokens.decode(self.tokens['access'], signed_tokens.ACCESS))
+        self.assertEqual(self.get().status_code, 401)
+
+    def test_refresh_rotates_tokens(self):
+        response = self.refresh()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.get(response.data['access']).status_code, 200)
+        # El token de refresco canjeado no sirve una segunda vez
+        self.assertEqual(self.refresh().status_code, 401)
+        self.assertEqual(self.refresh(response.data['refresh']).status_code, 200)
+
+    def test_logout_revokes_access_and_refresh(self):
+        response = self.client.post(
+            '/api/logout/', {'refresh': self.tokens['refresh']},
+            content_type='application/json', HTTP_AUTHORIZATION=f"Bearer {self.tokens['access']}",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.get().status_code, 401)
+        self.assertEqual(self.refresh().status_code, 401)
+
+    def test_password_change_revokes_tokens(self):
+        self.user.set_password('otra-secreta-456')
+        self.user.save()
+        self.assertEqual(self.get().status_code, 401)
+        self.assertEqual(self.refresh().status_code, 401)
+
+    def test_password_change_rejects_refresh_without_denylist(self):
+        # Otro proceso con caché local no ve la denylist: la huella basta
+        User.objects.filter(pk=self.user.pk).update(password='otro-hash')
+        self.assertEqual(self.refresh().status_code, 401)
+
+    def test_profile_change_keeps_refresh_token(self):
+        self.user.first_name = 'Ana María'
+        self.user.save()
+        self.assertEqual(self.refresh().status_code, 200)
+
+    def test_deleting_user_revokes_access_token(self):
+        self.user.delete()
+        self.assertEqual(self.get().status_code, 401)
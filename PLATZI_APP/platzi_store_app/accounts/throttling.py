@@ -0,0 +1,15 @@
+# accounts/throttling.py
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class UsernameCheckRateThrottle(SimpleRateThrottle):
+    """
+    Límite propio para ``check_username_api`` por cliente (usuario o IP). El
+    formulario de registro lo consulta mientras se escribe, así que el límite
+    general para anónimos (por hora) se agotaría enseguida.
+    """
+    scope = 'username_check'
+
+    def get_cache_key(self, request, view):
+        ident = request.user.pk if request.user and request.user.is_authenticated else self.get_ident(request)
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
@@ -9,6 +9,8 @@ urlpatterns = [
     path('api/register/', views.register_api, name='api_register'),
     path('api/login/', views.login_api, name='api_login'),
     path('api/logout/', views.logout_api, name='api_logout'),
+    path('api/token/rotate/', views.rotate_token_api, name='api_token_rotate'),
+    path('api/token/refresh/', views.refresh_token_api, name='api_token_refresh'),
     path('api/profile/', views.user_profile_api, name='api_profile'),
     path('api/check-username/', views.check_username_api, name='api_check_username'),
     path('login/', views.login_view, name='login'),
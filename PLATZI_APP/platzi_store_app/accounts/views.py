@@ -9,10 +9,16 @@ from django.urls import reverse
 from django.views.decorators.cache import never_cache
 from django.views.decorators.csrf import csrf_protect
 from django.conf import settings
+from django.db import IntegrityError
+from .authentication import expires_at, issue_token, revoke_token, revoke_user_tokens, rotate_token
+from . import signed_tokens
+from .availability import check_username
 from .forms import UserRegistrationForm, UserLoginForm
+from .hashing_pool import HashingPoolSaturated
+from .throttling import UsernameCheckRateThrottle
 
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.authtoken.models import Token
@@ -27,6 +33,17 @@ from .serializers import (
 # URL base de tu API (configurable desde settings)
 API_BASE_URL = "http://127.0.0.1:8000/api/"
 
+def _issue_credentials(user):
+    """Tokens firmados de acceso y refresco si ese modo está activo; si no, el token de DRF."""
+    if signed_tokens.is_enabled():
+        return signed_tokens.issue_tokens(user)
+    # Reutiliza el token vigente; crea uno nuevo si venció (ver accounts/authentication.py)
+    token = issue_token(user)
+    return {
+        'token': token.key,
+        'token_expires_at': expires_at(token)
+    }
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def register_api(request):
@@ -35,15 +52,22 @@ def register_api(request):
         serializer = UserRegistrationSerializer(data=request.data)
         
         if serializer.is_valid():
-            user = serializer.save()
-            token, created = Token.objects.get_or_create(user=user)
+            try:
+                user = serializer.save()
+            except IntegrityError:
+                # Otro registro con el mismo usuario o email llegó a la vez (índices únicos)
+                return Response({
+                    'success': False,
+                    'message': 'Error en el registro',
+                    'errors': {'username': ['El nombre de usuario o el email ya están registrados']}
+                }, status=status.HTTP_400_BAD_REQUEST)
             
             response_data = {
                 'success': True,
                 'message': 'Usuario registrado satisfactoriamente',
                 'user': UserSerializer(user).data,
-                'token': token.key
             }
+            response_data.update(_issue_credentials(user))
             
             return Response(response_data, status=status.HTTP_201_CREATED)
         
@@ -63,17 +87,25 @@ def login_api(request):
             context={'request': request}
         )
         
-        if serializer.is_valid():
+        try:
+            is_valid = serializer.is_valid()
+        except HashingPoolSaturated as e:
+            # Demasiados logins a la vez: se responde al instante en lugar de encolar
+            return Response({
+                'success': False,
+                'message': 'Demasiados intentos de inicio de sesión simultáneos. Intenta de nuevo en unos segundos.'
+            }, status=status.HTTP_429_TOO_MANY_REQUESTS, headers={'Retry-After': str(e.retry_after)})
+
+        if is_valid:
             user = serializer.validated_data['user']
             login(request, user)
-            token, created = Token.objects.get_or_create(user=user)
             
             response_data = {
                 'success': True,
                 'message': 'Autenticación satisfactoria',
                 'user': UserSerializer(user).data,
-                'token': token.key
             }
+            response_data.update(_issue_credentials(user))
             
             return Response(response_data, status=status.HTTP_200_OK)
         
@@ -89,7 +121,20 @@ def logout_api(request):
     """Vista API para cerrar sesión."""
     if request.method == 'POST':
         try:
-            request.user.auth_token.delete()
+            # Borra el token y su entrada en la caché de autenticación
+            if isinstance(request.auth, Token):
+                revoke_token(request.auth)
+            elif isinstance(request.auth, dict):
+                # Token firmado: se revocan el de acceso y, si se envía, el de refresco
+                signed_tokens.revoke(request.auth)
+                refresh = request.data.get('refresh')
+                if refresh:
+                    try:
+                        signed_tokens.revoke(signed_tokens.decode(refresh, signed_tokens.REFRESH))
+                    except signed_tokens.InvalidToken:
+                        pass
+            else:
+                revoke_user_tokens(request.user)
             logout(request)
             
             return Response({
@@ -104,6 +149,50 @@ def logout_api(request):
                 'error': str(e)
             }, status=status.HTTP_400_BAD_REQUEST)
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def rotate_token_api(request):
+    """Vista API para reemplazar el token actual por uno nuevo."""
+    if request.method == 'POST':
+        if isinstance(request.auth, Token):
+            token = rotate_token(request.auth)
+        else:
+            # Autenticado por sesión: se rota (o se crea) el token del usuario
+            revoke_user_tokens(request.user)
+            token = issue_token(request.user)
+
+        return Response({
+            'success': True,
+            'message': 'Token renovado exitosamente',
+            'token': token.key,
+            'token_expires_at': expires_at(token)
+        }, status=status.HTTP_200_OK)
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def refresh_token_api(request):
+    """Vista API para canjear un token de refresco por un par nuevo de tokens firmados."""
+    if request.method == 'POST':
+        if not signed_tokens.is_enabled():
+            return Response({
+                'success': False,
+                'message': 'Los tokens firmados no están habilitados'
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            user, tokens = signed_tokens.refresh_tokens(request.data.get('refresh', ''))
+        except signed_tokens.InvalidToken as e:
+            return Response({
+                'success': False,
+                'message': str(e)
+            }, status=status.HTTP_401_UNAUTHORIZED)
+
+        return Response({
+            'success': True,
+            'message': 'Tokens renovados exitosamente',
+            **tokens
+        }, status=status.HTTP_200_OK)
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def user_profile_api(request):
@@ -118,6 +207,7 @@ def user_profile_api(request):
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@throttle_classes([UsernameCheckRateThrottle])
 def check_username_api(request):
     """Vista API para verificar disponibilidad de nombre de usuario."""
     username = request.GET.get('username', '')
@@ -128,7 +218,8 @@ def check_username_api(request):
             'message': 'Debe proporcionar un nombre de usuario'
         }, status=status.HTTP_400_BAD_REQUEST)
     
-    exists = User.objects.filter(username=username).exists()
+    # Filtro de Bloom + caché: los nombres libres se responden sin consultar la base de datos
+    exists = check_username(username)
     
     return Response({
         'success': True,
@@ -190,8 +281,14 @@ def login_view(request):
             username = form.cleaned_data['username']
             password = form.cleaned_data['password']
             
-            # Autenticar directamente con Django
-            user = authenticate(request, username=username, password=password)
+            # Autenticar directamente con Django (el hash se verifica en el pool de hashing)
+            try:
+                user = authenticate(request, username=username, password=password)
+            except HashingPoolSaturated as e:
+                form.add_error(None, 'Hay demasiados inicios de sesión en este momento. Intenta de nuevo en unos segundos.')
+                response = render(request, 'login.html', {'form': form}, status=429)
+                response['Retry-After'] = str(e.retry_after)
+                return response
             
             if user and user.is_active:
                 login(request, user)
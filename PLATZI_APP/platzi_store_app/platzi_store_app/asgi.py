@@ -9,8 +9,40 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 
 import os
 
+from asgiref.wsgi import WsgiToAsgi
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'platzi_store_app.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from django.conf import settings  # noqa: E402  (tras configurar Django)
+from whitenoise import WhiteNoise  # noqa: E402
+
+
+def _not_found(environ, start_response):
+    start_response('404 Not Found', [('Content-Type', 'text/plain; charset=utf-8')])
+    return [b'Not Found']
+
+
+# Con PRODUCTS_ASYNC_VIEWS, WhiteNoiseMiddleware no está en MIDDLEWARE (es solo
+# síncrono). Las peticiones a STATIC_URL se resuelven aquí con la aplicación WSGI
+# de WhiteNoise, sin pasar por los middlewares de Django; el resto siguen la
+# cadena asíncrona. Los nombres con el hash del manifiesto (base.3f2a1b9c4d5e.css)
+# se sirven como "immutable", igual que con el middleware.
+static_files = WhiteNoise(
+    _not_found,
+    root=settings.STATIC_ROOT,
+    prefix=settings.STATIC_URL,
+    max_age=0 if settings.DEBUG else 60,
+    immutable_file_test=r'\.[0-9a-f]{12}\.\w+$',
+)
+static_application = WsgiToAsgi(static_files)
+static_prefix = '/' + settings.STATIC_URL.strip('/') + '/'
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'http' and scope['path'].startswith(static_prefix):
+        await static_application(scope, receive, send)
+    else:
+        await django_application(scope, receive, send)
@@ -12,6 +12,8 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 
+from decouple import config
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -45,22 +47,218 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Primero, para que Server-Timing y las métricas incluyan al resto de los middlewares
+    'products.middleware.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    # (WhiteNoise se añade tras SecurityMiddleware más abajo, según PRODUCTS_ASYNC_VIEWS)
+    # Solo guarda la sesión si cambió (ver accounts/session_engines)
+    'accounts.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # Límites por usuario/IP compartidos entre workers (PLATZI_RATE_LIMIT)
+    'products.middleware.RateLimitMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'products.middleware.UpstreamStatusMiddleware',
 ]
 
-PLATZI_API_BASE_URL = 'https://api.escuelajs.co/api/v1/'
+# URL base de la API de Platzi; puede apuntar a un mirror cercano o a un proxy con caché
+PLATZI_API_BASE_URL = config('PLATZI_API_BASE_URL', default='https://api.escuelajs.co/api/v1/')
+
+# Origen de los datos del catálogo (products/catalog.py)
+# - products.catalog.RemoteCatalog: siempre la API en PLATZI_API_BASE_URL
+# - products.catalog.MirrorCatalog: la réplica local si está sincronizada, si no la API
+# - products.catalog.InMemoryCatalog: catálogo en memoria (pruebas y benchmarks);
+#   OPTIONS: FIXTURE (ruta a un JSON) o CATALOG_SIZE y CATEGORIES
+PLATZI_CATALOG_BACKEND = {
+    'BACKEND': config('PLATZI_CATALOG_BACKEND', default='products.catalog.MirrorCatalog'),
+    'OPTIONS': {},
+}
+
+# Cliente HTTP compartido para la API de Platzi (products/api_client.py)
+# Conexiones keep-alive por worker, timeouts (conexión, lectura) en segundos
+# y reintentos con backoff exponencial para métodos idempotentes.
+PLATZI_API_CLIENT = {
+    'POOL_CONNECTIONS': 10,   # Número de hosts distintos con pool propio
+    'POOL_MAXSIZE': 20,       # Conexiones persistentes por host
+    'POOL_BLOCK': False,      # Si es True, espera a que se libere una conexión
+    'CONNECT_TIMEOUT': 3.05,
+    'READ_TIMEOUT': 10,
+    'MAX_RETRIES': 2,
+    'BACKOFF_FACTOR': 0.3,
+    'RETRY_STATUS_FORCELIST': [502, 503, 504],
+    # Coalescencia de GETs idénticos simultáneos (products/singleflight.py).
+    # DISTRIBUTED coordina también entre workers usando la caché compartida.
+    'SINGLE_FLIGHT': True,
+    'SINGLE_FLIGHT_DISTRIBUTED': False,
+    'SINGLE_FLIGHT_LOCK_TIMEOUT': 10,
+    'SINGLE_FLIGHT_RESULT_TTL': 2,
+    # Circuit breaker (products/circuit_breaker.py): tras N fallos seguidos se deja
+    # de llamar a la API durante RECOVERY_TIMEOUT segundos y se sirven los últimos
+    # datos buenos guardados (STALE_FALLBACK_TTL segundos) con un aviso.
+    'CIRCUIT_FAILURE_THRESHOLD': 5,
+    'CIRCUIT_RECOVERY_TIMEOUT': 30,
+    'CIRCUIT_HALF_OPEN_MAX_CALLS': 1,
+    'STALE_FALLBACK_TTL': 60 * 60 * 24,
+    # Cupo de llamadas a la API por host, compartido entre workers mediante la
+    # caché OUTBOUND_CACHE (products/ratelimit.py). Sin cupo se espera hasta
+    # OUTBOUND_MAX_WAIT segundos; después se sirven los últimos datos buenos o
+    # se responde con error. None desactiva el cupo.
+    'OUTBOUND_RATE': config('PLATZI_API_OUTBOUND_RATE', default='20/second'),
+    'OUTBOUND_MAX_WAIT': 2,
+    'OUTBOUND_CACHE': 'default',
+}
+
+# Límites de peticiones de los clientes (products/ratelimit.py), aplicados por
+# RateLimitMiddleware a las vistas HTML y a la API. Los contadores viven en la
+# caché CACHE: con una caché compartida (REDIS_URL) el límite es global y no
+# por worker. Se aplican todas las reglas que coinciden con la ruta y el método.
+# Las reglas 'user_or_ip' cuentan por usuario con sesión o con token de la API.
+# Detrás de un proxy o balanceador hay que indicar cuántos hay en NUM_PROXIES:
+# con 0 todos los clientes anónimos comparten la IP del proxy (REMOTE_ADDR) y
+# agotan juntos el límite; con un valor mayor que los proxies reales el cliente
+# podría elegir su IP falseando X-Forwarded-For.
+PLATZI_RATE_LIMIT = {
+    'ENABLED': True,
+    'CACHE': 'default',
+    'NUM_PROXIES': config('NUM_PROXIES', default=0, cast=int),
+    'EXEMPT_PATHS': ['/static/', '/metrics'],
+    'RULES': [
+        {'NAME': 'login', 'PATH': r'^/(api/)?login/$', 'METHODS': ['POST'], 'RATE': '10/minute', 'KEY': 'ip'},
+        {'NAME': 'register', 'PATH': r'^/(api/)?register/$', 'METHODS': ['POST'], 'RATE': '10/hour', 'KEY': 'ip'},
+        {'NAME': 'api', 'PATH': r'^/api/', 'RATE': '300/minute'},
+        {'NAME': 'products', 'PATH': r'^/products/', 'RATE': '120/minute'},
+    ],
+}
+
+# Tiempos por petición y métricas (products/instrumentation.py)
+# Encabezado Server-Timing (upstream, tpl, db, app) y histogramas por vista y
+# por endpoint de la API expuestos en /metrics (formato Prometheus).
+PLATZI_INSTRUMENTATION = {
+    'ENABLED': True,
+    'SERVER_TIMING': True,
+    'BUCKETS': (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+    'QUANTILES': (0.5, 0.95, 0.99),
+    # IPs que pueden leer /metrics y recibir Server-Timing además de los usuarios
+    # staff. La IP sale de REMOTE_ADDR/X-Forwarded-For según NUM_PROXIES: detrás
+    # de un proxy en el mismo host sin NUM_PROXIES todo llega desde 127.0.0.1
+    'METRICS_ALLOWED_IPS': [],
+}
+
+# Caché de datos del catálogo (products/cache.py)
+# Nivel local LRU por proceso + caché de Django compartido entre workers.
+# TTL y ventana de stale-while-revalidate en segundos.
+PLATZI_CATALOG_CACHE = {
+    'KEY_PREFIX': 'platzi',
+    'LOCAL_MAXSIZE': 256,
+    'LOCAL_TTL': 30,
+    'CATEGORIES_TTL': 60 * 60,
+    'CATEGORIES_STALE_TTL': 60 * 60 * 24,
+    # Detalle de producto: se llena desde los listados y se revalida con ETag/Last-Modified
+    'PRODUCT_TTL': 5 * 60,
+    'PRODUCT_STALE_TTL': 60 * 60,
+}
+
+# Réplica local del catálogo (products/mirror.py)
+# Se llena con: python manage.py sync_catalog [--every SEGUNDOS]
+# Las vistas la consultan cuando ENABLED es True y hubo al menos una sincronización.
+PLATZI_CATALOG_MIRROR = {
+    'ENABLED': True,
+    'PAGE_SIZE': 100,      # limit usado al paginar la API
+    'SYNC_INTERVAL': 300,  # Segundos entre sincronizaciones con --every
+    # Segundos entre recorridos completos (cambios y bajas en la API); entre
+    # uno y otro solo se piden las últimas páginas para traer productos nuevos
+    'FULL_SYNC_INTERVAL': 60 * 60,
+}
+
+# Paginación del listado de productos (?page=N&limit=M)
+PRODUCTS_PER_PAGE = 20
+PRODUCTS_MAX_PER_PAGE = 100
+
+# Operaciones en lote (products/batch.py): tamaño máximo del lote y
+# peticiones simultáneas a la API (no debería superar POOL_MAXSIZE del cliente)
+PRODUCTS_BATCH_MAX_OPERATIONS = 100
+PRODUCTS_BATCH_MAX_WORKERS = 8
+
+# Exportación del catálogo en streaming (products/exporter.py)
+PLATZI_CATALOG_EXPORT = {
+    'PAGE_SIZE': 100,
+}
+
+# Importación masiva desde CSV/JSONL (products/importer.py)
+PLATZI_PRODUCT_IMPORT = {
+    'CHUNK_SIZE': 50,     # Filas por bloque entre puntos de control
+    'MAX_WORKERS': 8,     # Creaciones simultáneas en la API
+    'MAX_ERRORS': 100,    # Errores por fila que se guardan en el informe
+    # Tamaño máximo de los archivos subidos desde la web: se importan dentro de
+    # la petición. Los más grandes, con python manage.py import_products
+    'MAX_UPLOAD_SIZE': 5 * 1024 * 1024,
+}
+
+# Vistas asíncronas del listado y detalle (products/async_views.py).
+# Pensado para despliegues ASGI (p. ej. uvicorn platzi_store_app.asgi:application).
+PRODUCTS_ASYNC_VIEWS = False
+
+# Archivos estáticos con hash, comprimidos y con caché de larga duración (STORAGES).
+# WhiteNoiseMiddleware solo es síncrono: bajo ASGI obligaría a pasar cada
+# petición por un hilo, así que con las vistas asíncronas no se añade y los
+# estáticos los sirve asgi.py antes de llegar a Django (o el servidor web).
+# Con DEBUG no hace falta: runserver los sirve desde las carpetas static/ y
+# no existe STATIC_ROOT hasta correr collectstatic.
+if not DEBUG and not PRODUCTS_ASYNC_VIEWS:
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index('django.middleware.security.SecurityMiddleware') + 1,
+        'whitenoise.middleware.WhiteNoiseMiddleware',
+    )
+
+# Índice de búsqueda en memoria (products/search.py)
+PLATZI_SEARCH = {
+    'TITLE_WEIGHT': 3.0,
+    'DESCRIPTION_WEIGHT': 1.0,
+    'PREFIX_PENALTY': 0.5,
+    'MIN_PREFIX_LENGTH': 2,
+    'REFRESH_INTERVAL': 300,
+    'STATE_CHECK_INTERVAL': 30,
+    'PER_PAGE': 20,
+}
+
+# Caché de páginas renderizadas para visitantes anónimos y de fragmentos de
+# tarjetas de producto (products/page_cache.py). Tiempos en segundos.
+PLATZI_PAGE_CACHE = {
+    'ENABLED': True,
+    'LIST_TIMEOUT': 60,
+    'DETAIL_TIMEOUT': 5 * 60,
+    'CARD_TIMEOUT': 60 * 60,
+}
+
+# Caché de Django. En producción conviene un backend compartido entre workers:
+# con REDIS_URL (p. ej. redis://localhost:6379/0) se usa Redis, y los límites de
+# peticiones, el cupo de salida y los throttles de DRF valen para todo el sitio.
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'platzi-store',
+        }
+    }
 
 # Configuración de Django REST Framework
 REST_FRAMEWORK = {
     # Configuración de autenticación por defecto
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        # Tokens firmados "Bearer" (solo si PLATZI_SIGNED_TOKENS['ENABLED'])
+        'accounts.signed_tokens.SignedTokenAuthentication',
+        # TokenAuthentication con caché y expiración (ver PLATZI_TOKEN_AUTH)
+        'accounts.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     
@@ -93,7 +291,8 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_THROTTLE_RATES': {
         'anon': '100/hour',  # Para usuarios anónimos
-        'user': '1000/hour'   # Para usuarios autenticados
+        'user': '1000/hour',  # Para usuarios autenticados
+        'username_check': '60/minute',  # check_username_api (se llama mientras se escribe)
     }
 }
 
@@ -129,7 +328,8 @@ ROOT_URLCONF = 'platzi_store_app.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates que mide el tiempo de renderizado (products/instrumentation.py)
+        'BACKEND': 'products.instrumentation.InstrumentedDjangoTemplates',
         'DIRS': [],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -137,6 +337,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'products.context_processors.upstream_status',
             ],
         },
     },
@@ -148,12 +349,66 @@ WSGI_APPLICATION = 'platzi_store_app.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+#
+# Se configura con variables de entorno (o un archivo .env junto a manage.py,
+# leído por python-decouple):
+#   DB_ENGINE          sqlite (por defecto), postgresql o mysql
+#   DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, DB_PORT
+#   DB_CONN_MAX_AGE    segundos que se reutiliza una conexión (0 = una por petición)
+#   DB_POOL            pool de conexiones de psycopg 3 (solo PostgreSQL)
+#   DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE, DB_POOL_TIMEOUT
+# Ejemplo local: DB_ENGINE=postgresql DB_NAME=platzi DB_USER=postgres DB_POOL=True
+
+DB_ENGINE = config('DB_ENGINE', default='sqlite')
+
+if DB_ENGINE == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': config('DB_NAME', default=str(BASE_DIR / 'db.sqlite3')),
+            'OPTIONS': {
+                # WAL: las lecturas no esperan a las escrituras (login, sesiones, registro)
+                'init_command': (
+                    'PRAGMA journal_mode=WAL;'
+                    'PRAGMA synchronous=NORMAL;'
+                    'PRAGMA temp_store=MEMORY;'
+                    'PRAGMA cache_size=-20000;'
+                    'PRAGMA mmap_size=134217728;'
+                ),
+                # Toma el bloqueo de escritura al empezar la transacción en vez de
+                # fallar con "database is locked" a mitad de ella
+                'transaction_mode': 'IMMEDIATE',
+                'timeout': config('DB_TIMEOUT', default=20, cast=int),
+            },
+        }
     }
-}
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': {
+                'postgresql': 'django.db.backends.postgresql',
+                'mysql': 'django.db.backends.mysql',
+            }[DB_ENGINE],
+            'NAME': config('DB_NAME', default='platzi_store'),
+            'USER': config('DB_USER', default=''),
+            'PASSWORD': config('DB_PASSWORD', default=''),
+            'HOST': config('DB_HOST', default='localhost'),
+            'PORT': config('DB_PORT', default=''),
+            'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {},
+        }
+    }
+    if DB_ENGINE == 'postgresql' and config('DB_POOL', default=False, cast=bool):
+        # El pool ya reutiliza las conexiones: Django no admite CONN_MAX_AGE con pool
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+            'max_size': config('DB_POOL_MAX_SIZE', default=20, cast=int),
+            'timeout': config('DB_POOL_TIMEOUT', default=10, cast=int),
+        }
+    elif DB_ENGINE == 'mysql':
+        DATABASES['default']['OPTIONS']['charset'] = 'utf8mb4'
 
 
 # Password validation
@@ -175,6 +430,91 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Hash de contraseñas (accounts/hashers.py)
+# ALGORITHM elige el hasher preferido (argon2 | scrypt | pbkdf2); los demás
+# siguen verificando las contraseñas existentes. Al cambiar el algoritmo o sus
+# parámetros, cada contraseña se vuelve a hashear en el siguiente login.
+# Para medir logins/s por núcleo con cada configuración:
+#   python manage.py bench_password_hashers
+PLATZI_PASSWORD_HASHING = {
+    'ALGORITHM': 'argon2',
+    'ARGON2_TIME_COST': 2,
+    'ARGON2_MEMORY_COST': 19 * 1024,   # KiB
+    'ARGON2_PARALLELISM': 1,
+    'SCRYPT_WORK_FACTOR': 2 ** 14,
+    'SCRYPT_BLOCK_SIZE': 8,
+    'SCRYPT_PARALLELISM': 1,
+    'PBKDF2_ITERATIONS': 1_000_000,
+}
+
+# Hasher de cada valor posible de ALGORITHM (única lista de los hashers de accounts/hashers.py)
+_PASSWORD_HASHERS = {
+    'argon2': 'accounts.hashers.TunedArgon2PasswordHasher',
+    'scrypt': 'accounts.hashers.TunedScryptPasswordHasher',
+    'pbkdf2': 'accounts.hashers.TunedPBKDF2PasswordHasher',
+}
+# El primero es el preferido (el que se usa para hashear)
+PASSWORD_HASHERS = sorted(
+    _PASSWORD_HASHERS.values(),
+    key=lambda path: path != _PASSWORD_HASHERS[PLATZI_PASSWORD_HASHING['ALGORITHM']],
+)
+
+
+# Autenticación: la verificación de contraseñas se hace en un pool acotado de
+# hilos (accounts/hashing_pool.py). Con MAX_WORKERS hashes en curso y MAX_QUEUE
+# en espera, los logins adicionales reciben un 429 con Retry-After.
+AUTHENTICATION_BACKENDS = [
+    'accounts.backends.PooledModelBackend',
+]
+
+PLATZI_HASHING_POOL = {
+    'MAX_WORKERS': 4,
+    'MAX_QUEUE': 32,
+    'RETRY_AFTER': 1,   # Segundos sugeridos al cliente en el 429
+}
+
+
+# Tokens de la API (accounts/authentication.py): token -> usuario se resuelve
+# desde la caché durante CACHE_TTL segundos; los tokens vencen a los TOKEN_TTL
+# segundos de creados (None = nunca) y el login crea uno nuevo si venció.
+PLATZI_TOKEN_AUTH = {
+    'CACHE_TTL': 5 * 60,
+    'TOKEN_TTL': 7 * 24 * 60 * 60,
+    'ROTATE_ON_LOGIN': False,
+}
+
+
+# Modo opcional de tokens firmados (accounts/signed_tokens.py): el login
+# entrega un token de acceso corto y uno de refresco; el de acceso se verifica
+# solo con la firma, sin consultar la base de datos. Revocación por denylist
+# en la caché (debe ser compartida entre nodos, p. ej. Redis o Memcached).
+PLATZI_SIGNED_TOKENS = {
+    'ENABLED': False,
+    'ACCESS_TTL': 5 * 60,
+    'REFRESH_TTL': 7 * 24 * 60 * 60,
+}
+
+
+# Sesiones (accounts/session_engines): 'db' | 'cache' | 'cached_db' | 'signed_cookies'.
+# - cached_db: lecturas desde la caché y escrituras en la base de datos.
+# - cache: sin base de datos; requiere una caché compartida entre workers
+#   (p. ej. Redis o Memcached), con LocMemCache cada proceso tiene sus sesiones.
+# - signed_cookies: los datos viajan firmados en la cookie (sin almacenamiento).
+# Para comparar los motores: python manage.py bench_sessions
+PLATZI_SESSION_ENGINE = 'cached_db'
+SESSION_ENGINE = f'accounts.session_engines.{PLATZI_SESSION_ENGINE}'
+
+
+# Índice de nombres de usuario y emails (accounts/availability.py): filtros de
+# Bloom por proceso para responder "disponible" sin consultar la base de datos.
+PLATZI_IDENTITY_INDEX = {
+    'CAPACITY': 100_000,   # Usuarios previstos (se amplía si hay más)
+    'ERROR_RATE': 0.01,    # Falsos positivos: solo cuestan una consulta
+    'RESULT_TTL': 30,      # Segundos que se comparte el resultado de check_username_api
+    'RELOAD_INTERVAL': 30, # Segundos entre cargas de usuarios nuevos de otros procesos
+}
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
@@ -191,6 +531,26 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
 STATIC_URL = 'static/'
+# Destino de collectstatic; en producción WhiteNoise sirve los archivos desde aquí
+# (WhiteNoiseMiddleware con WSGI, la ruta /static/ de asgi.py con ASGI)
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# collectstatic guarda cada archivo con el hash de su contenido en el nombre
+# (base.3f2a1b9c.css), un manifiesto para {% static %} y variantes .gz y .br.
+# WhiteNoise elige la variante según Accept-Encoding y sirve los archivos con
+# hash con Cache-Control "immutable" de larga duración: en visitas repetidas el
+# navegador no vuelve a pedirlos, y un cambio en el archivo cambia su URL.
+# Con DEBUG se sirven sin hash desde las carpetas static/ de cada app, y sin
+# collectstatic (tests, benchmarks) las URLs quedan sin hash en lugar de fallar
+# (platzi_store_app/storage.py).
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'platzi_store_app.storage.StaticFilesStorage',
+    },
+}
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
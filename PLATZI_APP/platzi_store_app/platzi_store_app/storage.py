@@ -0,0 +1,22 @@
+# platzi_store_app/storage.py
+"""
+Almacenamiento de los archivos estáticos (``STORAGES['staticfiles']``).
+
+``CompressedManifestStaticFilesStorage`` de WhiteNoise falla en cada
+``{% static %}`` si no se corrió ``collectstatic`` (tests, benchmarks, un
+entorno local con ``DEBUG=False``). Esta versión no es estricta: si el archivo
+no está en el manifiesto ni en ``STATIC_ROOT`` se usa la URL sin hash. Con
+``collectstatic`` se comporta igual que la original.
+"""
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+
+class StaticFilesStorage(CompressedManifestStaticFilesStorage):
+    manifest_strict = False
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            # Tampoco está en STATIC_ROOT para calcular el hash
+            return name
@@ -16,11 +16,12 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
-from products.views import home_view
+from products.views import home_view, metrics_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', home_view, name='home'),  # Página de inicio
+    path('metrics', metrics_view, name='metrics'),  # Métricas para Prometheus
     path('products/', include('products.urls')),
     path('', include('accounts.urls')),
 ]
@@ -1,3 +1,31 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import CatalogSyncState, Category, Product, ProductImport
+
+
+@admin.register(Category)
+class CategoryAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name', 'synced_at')
+    search_fields = ('name',)
+
+
+@admin.register(Product)
+class ProductAdmin(admin.ModelAdmin):
+    list_display = ('id', 'title', 'price', 'category', 'synced_at')
+    list_filter = ('category',)
+    search_fields = ('title',)
+
+
+@admin.register(CatalogSyncState)
+class CatalogSyncStateAdmin(admin.ModelAdmin):
+    list_display = (
+        'name', 'last_completed_at', 'last_full_sync_at',
+        'products_seen', 'products_changed', 'products_deleted', 'categories_deleted',
+    )
+
+
+@admin.register(ProductImport)
+class ProductImportAdmin(admin.ModelAdmin):
+    list_display = ('filename', 'status', 'rows_done', 'created', 'failed', 'updated_at')
+    list_filter = ('status',)
+    readonly_fields = ('source', 'done_after', 'errors')
@@ -0,0 +1,557 @@
+# products/api_client.py
+"""
+Cliente HTTP compartido para la API de productos de Platzi.
+
+Todas las vistas y formularios pasan por aquí en lugar de llamar a
+``requests.get/post/put/delete`` directamente. Cada proceso (worker) mantiene
+una única ``requests.Session`` con un pool de conexiones keep-alive, timeouts
+y una política de reintentos configurables desde ``settings.PLATZI_API_CLIENT``.
+
+Las vistas asíncronas usan ``AsyncPlatziAPIClient`` (httpx), con la misma
+configuración y un cliente por event loop.
+
+Antes de cada llamada se toma un turno del cupo de salida compartido entre
+workers (``OUTBOUND_RATE``, ver ``products/ratelimit.py``). Ambos clientes
+pasan por un circuit breaker compartido. Los GET con ``stale_fallback=True``
+(los que sirven páginas: listado, detalle y categorías) guardan su respuesta
+correcta como "última respuesta buena"; si el circuito está abierto, el cupo
+está agotado o la llamada falla (error de conexión o 5xx), se devuelve esa
+copia (con ``response.stale = True``) en lugar de bloquear o fallar. Los
+recorridos completos (exportación, sincronización, índice) no la usan: no
+llenan la caché ni trabajan con datos viejos.
+"""
+import asyncio
+import hashlib
+import os
+import threading
+import time
+import weakref
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from django.core.cache import cache as django_cache
+
+from . import instrumentation
+from .circuit_breaker import AsyncCircuitOpenError, CircuitBreaker, CircuitOpenError, mark_stale
+from .ratelimit import AsyncOutboundBudgetExceeded, OutboundBudget, OutboundBudgetExceeded
+from .singleflight import AsyncSingleFlight, DistributedSingleFlight, SingleFlight, make_key
+
+DEFAULT_CLIENT_SETTINGS = {
+    'POOL_CONNECTIONS': 10,
+    'POOL_MAXSIZE': 20,
+    'POOL_BLOCK': False,
+    'CONNECT_TIMEOUT': 3.05,
+    'READ_TIMEOUT': 10,
+    'MAX_RETRIES': 2,
+    'BACKOFF_FACTOR': 0.3,
+    'RETRY_STATUS_FORCELIST': [502, 503, 504],
+    'SINGLE_FLIGHT': True,
+    'SINGLE_FLIGHT_DISTRIBUTED': False,
+    'SINGLE_FLIGHT_LOCK_TIMEOUT': 10,
+    'SINGLE_FLIGHT_RESULT_TTL': 2,
+    'CIRCUIT_FAILURE_THRESHOLD': 5,
+    'CIRCUIT_RECOVERY_TIMEOUT': 30,
+    'CIRCUIT_HALF_OPEN_MAX_CALLS': 1,
+    'STALE_FALLBACK_TTL': 60 * 60 * 24,
+    'OUTBOUND_RATE': None,
+    'OUTBOUND_MAX_WAIT': 2,
+    'OUTBOUND_CACHE': 'default',
+}
+
+
+def get_client_settings():
+    """Devuelve la configuración del cliente combinando los valores por defecto con settings."""
+    config = dict(DEFAULT_CLIENT_SETTINGS)
+    config.update(getattr(settings, 'PLATZI_API_CLIENT', {}))
+    return config
+
+
+_breaker = None
+_breaker_lock = threading.Lock()
+
+
+def get_breaker():
+    """Circuit breaker del proceso, compartido por el cliente síncrono y los asíncronos."""
+    global _breaker
+    if _breaker is None:
+        with _breaker_lock:
+            if _breaker is None:
+                config = get_client_settings()
+                _breaker = CircuitBreaker(
+                    failure_threshold=config['CIRCUIT_FAILURE_THRESHOLD'],
+                    recovery_timeout=config['CIRCUIT_RECOVERY_TIMEOUT'],
+                    half_open_max_calls=config['CIRCUIT_HALF_OPEN_MAX_CALLS'],
+                )
+    return _breaker
+
+
+_budget = None
+_budget_lock = threading.Lock()
+
+
+def get_budget():
+    """Cupo de llamadas a la API, compartido por el cliente síncrono y los asíncronos."""
+    global _budget
+    if _budget is None:
+        with _budget_lock:
+            if _budget is None:
+                config = get_client_settings()
+                _budget = OutboundBudget(
+                    config['OUTBOUND_RATE'],
+                    max_wait=config['OUTBOUND_MAX_WAIT'],
+                    cache_alias=config['OUTBOUND_CACHE'],
+                )
+    return _budget
+
+
+def _last_good_key(url, params):
+    digest = hashlib.sha1(make_key('GET', url, params).encode()).hexdigest()
+    return f"platzi:lastgood:{digest}"
+
+
+def _single_flight_key(url, stale_fallback, kwargs):
+    """
+    Las peticiones condicionales (ETag/Last-Modified) no se agrupan con las
+    normales, ni las que aceptan la copia guardada con las que no.
+    """
+    key = make_key('GET', url, kwargs.get('params'))
+    if stale_fallback:
+        key += ' stale-ok'
+    headers = kwargs.get('headers') or {}
+    conditional = [f"{name}={headers[name]}" for name in ('If-None-Match', 'If-Modified-Since') if headers.get(name)]
+    return f"{key} {' '.join(conditional)}" if conditional else key
+
+
+class LatencyStatsMixin:
+    """Contadores de llamadas, errores y latencia por método y host."""
+
+    def _init_stats(self):
+        self._stats_lock = threading.Lock()
+        self._stats = {}
+
+    def _record(self, method, url, elapsed, failed):
+        instrumentation.record_upstream(method, url, elapsed, failed)
+        key = f"{method} {urlsplit(str(url)).netloc}"
+        with self._stats_lock:
+            entry = self._stats.setdefault(key, {
+                'calls': 0,
+                'errors': 0,
+                'total_seconds': 0.0,
+                'max_seconds': 0.0,
+            })
+            entry['calls'] += 1
+            entry['errors'] += int(failed)
+            entry['total_seconds'] += elapsed
+            entry['max_seconds'] = max(entry['max_seconds'], elapsed)
+
+    def get_call_stats(self):
+        with self._stats_lock:
+            return {
+                key: dict(entry, avg_seconds=entry['total_seconds'] / entry['calls'])
+                for key, entry in self._stats.items()
+            }
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self._stats.clear()
+
+
+class PlatziAPIClient(LatencyStatsMixin):
+    """
+    Envoltorio sobre ``requests.Session`` con pool de conexiones y métricas.
+
+    Expone la misma interfaz que el módulo ``requests`` (``get``, ``post``,
+    ``put``, ``delete``) para que las vistas no tengan que cambiar su manejo
+    de respuestas ni de ``RequestException``.
+    """
+
+    def __init__(self, config=None):
+        self.config = config or get_client_settings()
+        self.timeout = (self.config['CONNECT_TIMEOUT'], self.config['READ_TIMEOUT'])
+        self.session = self._build_session()
+        self.single_flight = self._build_single_flight()
+        self.breaker = get_breaker()
+        self.budget = get_budget()
+        self._init_stats()
+
+    def _build_single_flight(self):
+        if not self.config['SINGLE_FLIGHT']:
+            return None
+        if self.config['SINGLE_FLIGHT_DISTRIBUTED']:
+            return DistributedSingleFlight(
+                lock_timeout=self.config['SINGLE_FLIGHT_LOCK_TIMEOUT'],
+                result_ttl=self.config['SINGLE_FLIGHT_RESULT_TTL'],
+            )
+        return SingleFlight()
+
+    def _build_session(self):
+        retry = Retry(
+            total=self.config['MAX_RETRIES'],
+            connect=self.config['MAX_RETRIES'],
+            read=self.config['MAX_RETRIES'],
+            backoff_factor=self.config['BACKOFF_FACTOR'],
+            status_forcelist=self.config['RETRY_STATUS_FORCELIST'],
+            # Solo se reintentan métodos idempotentes (POST queda fuera)
+            allowed_methods=frozenset(['GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS']),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=self.config['POOL_CONNECTIONS'],
+            pool_maxsize=self.config['POOL_MAXSIZE'],
+            pool_block=self.config['POOL_BLOCK'],
+            max_retries=retry,
+        )
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def request(self, method, url, stale_fallback=False, **kwargs):
+        """
+        Realiza una petición usando el pool compartido y registra su latencia.
+
+        Con el circuito abierto o sin cupo de salida no se intenta la conexión:
+        un GET con ``stale_fallback`` devuelve la última respuesta buena
+        guardada y el resto lanza ``CircuitOpenError`` u ``OutboundBudgetExceeded``.
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        stale_fallback = stale_fallback and method == 'GET'
+        if not self.budget.acquire(urlsplit(url).netloc):
+            stale = self._stale_response(stale_fallback, url, kwargs.get('params'))
+            if stale is not None:
+                return stale
+            raise OutboundBudgetExceeded(f'Se alcanzó el límite de llamadas a la API: {url}')
+        if not self.breaker.allow_request():
+            stale = self._stale_response(stale_fallback, url, kwargs.get('params'))
+            if stale is not None:
+                return stale
+            raise CircuitOpenError(f'La API no está disponible en este momento: {url}')
+
+        start = time.perf_counter()
+        failed = False
+        try:
+            response = self.session.request(method, url, **kwargs)
+            failed = response.status_code >= 500
+        except requests.exceptions.RequestException:
+            failed = True
+            self.breaker.record_failure()
+            stale = self._stale_response(stale_fallback, url, kwargs.get('params'))
+            if stale is not None:
+                return stale
+            raise
+        except BaseException:
+            # Cualquier otro error (o una cancelación) también cuenta como fallo:
+            # si era la llamada de prueba del circuito semiabierto, libera su turno
+            failed = True
+            self.breaker.record_failure()
+            raise
+        finally:
+            self._record(method, url, time.perf_counter() - start, failed)
+
+        if failed:
+            self.breaker.record_failure()
+            stale = self._stale_response(stale_fallback, url, kwargs.get('params'))
+            if stale is not None:
+                return stale
+        else:
+            self.breaker.record_success()
+            if stale_fallback and response.status_code == 200:
+                django_cache.set(
+                    _last_good_key(url, kwargs.get('params')),
+                    response.content,
+                    self.config['STALE_FALLBACK_TTL'],
+                )
+        return response
+
+    def _stale_response(self, stale_fallback, url, params):
+        if not stale_fallback:
+            return None
+        content = django_cache.get(_last_good_key(url, params))
+        if content is None:
+            return None
+        response = requests.Response()
+        response.status_code = 200
+        response._content = content
+        response.url = url
+        response.headers['Content-Type'] = 'application/json'
+        response.stale = True
+        mark_stale()
+        return response
+
+    def get(self, url, stale_fallback=False, **kwargs):
+        """GET con coalescencia: peticiones idénticas simultáneas comparten una sola llamada."""
+        if self.single_flight is None:
+            return self.request('GET', url, stale_fallback=stale_fallback, **kwargs)
+        key = _single_flight_key(url, stale_fallback, kwargs)
+        response = self.single_flight.do(
+            key, lambda: self.request('GET', url, stale_fallback=stale_fallback, **kwargs)
+        )
+        if getattr(response, 'stale', False):
+            # mark_stale() solo corrió en el contexto de quien hizo la llamada;
+            # las peticiones que esperaban también deben avisar al usuario
+            mark_stale()
+        return response
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request('PUT', url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request('DELETE', url, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+    def get_stats(self):
+        """
+        Devuelve contadores de latencia por método/host y el uso del pool de conexiones.
+        """
+        calls = self.get_call_stats()
+
+        pools = {}
+        for adapter in self.session.adapters.values():
+            for pool_key in list(adapter.poolmanager.pools.keys()):
+                pool = adapter.poolmanager.pools.get(pool_key)
+                if pool is None:
+                    continue
+                pools[f"{pool.scheme}://{pool.host}:{pool.port}"] = {
+                    'connections_opened': pool.num_connections,
+                    'requests': pool.num_requests,
+                    'idle_connections': pool.pool.qsize() if pool.pool else 0,
+                    'maxsize': self.config['POOL_MAXSIZE'],
+                }
+
+        return {
+            'calls': calls,
+            'pools': pools,
+            'coalesced': self.single_flight.coalesced if self.single_flight else 0,
+            'circuit': self.breaker.get_stats(),
+            'budget': self.budget.get_stats(),
+        }
+
+
+class AsyncPlatziAPIClient(LatencyStatsMixin):
+    """
+    Cliente asíncrono (httpx) con la misma configuración que ``PlatziAPIClient``.
+
+    Lanza ``httpx.HTTPError`` en lugar de ``requests.exceptions.RequestException``.
+    """
+
+    def __init__(self, config=None):
+        self.config = config or get_client_settings()
+        limits = httpx.Limits(
+            max_connections=self.config['POOL_MAXSIZE'] * self.config['POOL_CONNECTIONS'],
+            max_keepalive_connections=self.config['POOL_MAXSIZE'],
+        )
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(self.config['READ_TIMEOUT'], connect=self.config['CONNECT_TIMEOUT']),
+            # httpx solo reintenta errores de conexión
+            transport=httpx.AsyncHTTPTransport(limits=limits, retries=self.config['MAX_RETRIES']),
+        )
+        self.single_flight = AsyncSingleFlight() if self.config['SINGLE_FLIGHT'] else None
+        self.breaker = get_breaker()
+        self.budget = get_budget()
+        self._init_stats()
+
+    async def request(self, method, url, stale_fallback=False, **kwargs):
+        stale_fallback = stale_fallback and method == 'GET'
+        if not await self.budget.aacquire(urlsplit(str(url)).netloc):
+            stale = await self._stale_response(stale_fallback, url, kwargs.get('params'))
+            if stale is not None:
+                return stale
+            raise AsyncOutboundBudgetExceeded(f'Se alcanzó el límite de llamadas a la API: {url}')
+        if not self.breaker.allow_request():
+            stale = await self._stale_response(stale_fallback, url, kwargs.get('params'))
+            if stale is not None:
+                return stale
+            raise AsyncCircuitOpenError(f'La API no está disponible en este momento: {url}')
+
+        start = time.perf_counter()
+        failed = False
+        try:
+            response = await self.client.request(method, url, **kwargs)
+            failed = response.status_code >= 500
+        except httpx.HTTPError:
+            failed = True
+            self.breaker.record_failure()
+            stale = await self._stale_response(stale_fallback, url, kwargs.get('params'))
+            if stale is not None:
+                return stale
+            raise
+        except BaseException:
+            # Incluye CancelledError: la llamada de prueba no debe quedarse con el turno
+            failed = True
+            self.breaker.record_failure()
+            raise
+        finally:
+            self._record(method, url, time.perf_counter() - start, failed)
+
+        if failed:
+            self.breaker.record_failure()
+            stale = await self._stale_response(stale_fallback, url, kwargs.get('params'))
+            if stale is not None:
+                return stale
+        else:
+            self.breaker.record_success()
+            if stale_fallback and response.status_code == 200:
+                await django_cache.aset(
+                    _last_good_key(url, kwargs.get('params')),
+                    response.content,
+                    self.config['STALE_FALLBACK_TTL'],
+                )
+        return response
+
+    async def _stale_response(self, stale_fallback, url, params):
+        if not stale_fallback:
+            return None
+        content = await django_cache.aget(_last_good_key(url, params))
+        if content is None:
+            return None
+        response = httpx.Response(
+            200,
+            content=content,
+            headers={'Content-Type': 'application/json'},
+            request=httpx.Request('GET', url, params=params),
+        )
+        response.stale = True
+        mark_stale()
+        return response
+
+    async def get(self, url, stale_fallback=False, **kwargs):
+        if self.single_flight is None:
+            return await self.request('GET', url, stale_fallback=stale_fallback, **kwargs)
+        key = _single_flight_key(url, stale_fallback, kwargs)
+        response = await self.single_flight.do(
+            key, lambda: self.request('GET', url, stale_fallback=stale_fallback, **kwargs)
+        )
+        if getattr(response, 'stale', False):
+            mark_stale()
+        return response
+
+    async def post(self, url, **kwargs):
+        return await self.request('POST', url, **kwargs)
+
+    async def put(self, url, **kwargs):
+        return await self.request('PUT', url, **kwargs)
+
+    async def delete(self, url, **kwargs):
+        return await self.request('DELETE', url, **kwargs)
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    def get_stats(self):
+        return {
+            'calls': self.get_call_stats(),
+            'coalesced': self.single_flight.coalesced if self.single_flight else 0,
+            'circuit': self.breaker.get_stats(),
+            'budget': self.budget.get_stats(),
+        }
+
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """
+    Devuelve el cliente del proceso actual, creándolo la primera vez.
+
+    Si el proceso fue bifurcado (p. ej. workers de gunicorn con preload) se crea
+    un cliente nuevo para no compartir sockets con el proceso padre.
+    """
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is None or _client_pid != pid:
+        with _client_lock:
+            if _client is None or _client_pid != pid:
+                _client = PlatziAPIClient()
+                _client_pid = pid
+    return _client
+
+
+_async_clients = weakref.WeakKeyDictionary()
+
+
+async def _close_with_loop(client):
+    # Generador asíncrono que queda suspendido mientras viva el loop:
+    # asyncio.run() (uvicorn, y asgiref con las vistas asíncronas bajo WSGI)
+    # cierra los generadores pendientes con shutdown_asyncgens() antes de
+    # cerrar el loop, y así se cierran también las conexiones del cliente
+    try:
+        yield
+    finally:
+        _async_clients.pop(asyncio.get_running_loop(), None)
+        await client.aclose()
+
+
+def get_async_client():
+    """
+    Devuelve el cliente asíncrono del event loop actual.
+
+    Las conexiones de httpx quedan ligadas al loop donde se abrieron, por eso
+    hay un cliente por loop (bajo ASGI, uno por worker). El cliente se cierra
+    cuando termina su loop o con ``aclose_async_client()``.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = _async_clients[loop] = AsyncPlatziAPIClient()
+        # Se avanza hasta el yield sin await: el loop lo registra al iniciarlo
+        client.loop_closer = _close_with_loop(client)
+        try:
+            client.loop_closer.asend(None).send(None)
+        except StopIteration:
+            pass
+    return client
+
+
+async def aclose_async_client():
+    """Cierra el cliente asíncrono del loop actual (p. ej. al apagar el servidor ASGI)."""
+    client = _async_clients.get(asyncio.get_running_loop())
+    if client is not None:
+        await client.loop_closer.aclose()
+
+
+def reset_client():
+    """Cierra y descarta el cliente actual (útil en pruebas o al cambiar settings)."""
+    global _client, _client_pid, _budget
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = None
+        _client_pid = None
+        # El cupo de salida también depende de settings
+        _budget = None
+
+
+def get(url, **kwargs):
+    return get_client().get(url, **kwargs)
+
+
+def post(url, **kwargs):
+    return get_client().post(url, **kwargs)
+
+
+def put(url, **kwargs):
+    return get_client().put(url, **kwargs)
+
+
+def delete(url, **kwargs):
+    return get_client().delete(url, **kwargs)
+
+
+def get_stats():
+    stats = get_client().get_stats()
+    for client in list(_async_clients.values()):
+        for key, entry in client.get_call_stats().items():
+            stats['calls'][f"async {key}"] = entry
+    return stats
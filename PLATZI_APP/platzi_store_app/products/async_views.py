@@ -0,0 +1,115 @@
+# products/async_views.py
+"""
+Versiones asíncronas (ASGI) de las vistas de productos.
+
+Las peticiones independientes a la API (categorías + productos) se hacen en
+paralelo con ``asyncio.gather`` usando el cliente httpx compartido, de modo
+que la latencia del listado es la de la llamada más lenta y no la suma.
+Se activan con ``settings.PRODUCTS_ASYNC_VIEWS``.
+
+Los datos salen del backend de ``products.catalog``; la búsqueda en el índice
+y el modo streaming se delegan en la vista síncrona equivalente.
+"""
+import asyncio
+
+import httpx
+from asgiref.sync import sync_to_async
+from django.contrib import messages
+from django.shortcuts import render
+
+from . import views
+from .catalog import get_catalog
+from .page_cache import adetail_page_key, alist_page_key, cache_anonymous_page
+
+
+@cache_anonymous_page(alist_page_key, 'LIST_TIMEOUT')
+async def products_list_view(request):
+    """Listado de productos con las categorías y la página pedidas en paralelo."""
+    product_title = request.GET.get('product_title')
+    streaming = request.GET.get('stream') == '1'
+    if product_title or streaming:
+        # Sin el decorador de la vista síncrona: la caché de páginas ya se revisó aquí
+        return await sync_to_async(views.products_list_view.__wrapped__)(request)
+
+    category_id = request.GET.get('category_id')
+    page = views._get_page(request)
+    limit = views._get_limit(request)
+    offset = (page - 1) * limit
+
+    category_id_int = None
+    if category_id:
+        try:
+            category_id_int = int(category_id)
+        except ValueError:
+            messages.error(request, "ID de categoría inválido")
+            category_id = None
+
+    catalog = get_catalog()
+    # Se pide un producto extra para saber si hay página siguiente
+    categories_result, products_result = await asyncio.gather(
+        catalog.alist_categories(),
+        catalog.alist_products(offset, limit + 1, category_id_int),
+        return_exceptions=True,
+    )
+
+    categories = []
+    if isinstance(categories_result, httpx.HTTPError):
+        messages.error(request, f'Error al cargar categorías: {str(categories_result)}')
+    elif isinstance(categories_result, BaseException):
+        raise categories_result
+    else:
+        categories = categories_result
+
+    products = []
+    has_next = False
+    if isinstance(products_result, httpx.HTTPError):
+        messages.error(request, f'Error de conexión con la API: {str(products_result)}')
+    elif isinstance(products_result, BaseException):
+        raise products_result
+    else:
+        data, status_code = products_result
+        if status_code == 200:
+            products = data[:limit]
+            has_next = len(data) > limit
+            if category_id_int is not None:
+                # Encontrar el nombre de la categoría seleccionada
+                selected_category = next((cat for cat in categories if cat['id'] == category_id_int), None)
+                category_name = selected_category['name'] if selected_category else 'Desconocida'
+                messages.success(request, f"Mostrando {len(products)} productos de la categoría: '{category_name}'")
+        elif category_id_int is not None:
+            messages.error(request, f"Error al buscar productos por categoría. Código de estado: {status_code}")
+        else:
+            messages.error(request, f"Error al cargar la lista de productos. Código de estado: {status_code}")
+
+    context = {
+        'products': products,
+        'categories': categories,
+        'selected_category_id': category_id,
+        'selected_product_title': product_title,
+        'page': page,
+        'limit': limit,
+        'has_previous': page > 1,
+        'has_next': has_next,
+        'previous_page': page - 1,
+        'next_page': page + 1,
+        'total': None,
+    }
+    # El render accede a la sesión y al usuario (base de datos): se ejecuta en un hilo
+    return await sync_to_async(render)(request, 'products/products_list.html', context)
+
+
+@cache_anonymous_page(adetail_page_key, 'DETAIL_TIMEOUT')
+async def products_detail_view(request, pk):
+    """Detalle de un producto sin bloquear el event loop mientras responde la API."""
+    product = None
+    try:
+        product = await get_catalog().aget_product(pk)
+        if product is None:
+            messages.error(request, 'Producto no encontrado')
+    except httpx.HTTPError as e:
+        messages.error(request, f'Error de conexión: {str(e)}')
+
+    context = {
+        'product': product
+    }
+    return await sync_to_async(render)(request, 'products/products_detail.html', context)
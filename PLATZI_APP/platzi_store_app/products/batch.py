@@ -0,0 +1,152 @@
+# products/batch.py
+"""
+Operaciones en lote sobre productos (crear, actualizar y eliminar).
+
+Primero se validan todas las operaciones; si alguna es inválida no se ejecuta
+ninguna. Los datos de ``create`` y ``update`` se validan con las mismas reglas
+que ``ProductForm`` (``importer.validate_row``): una actualización lleva el
+producto completo, como el modal de edición. Después las operaciones sobre el catálogo (``products.catalog``) se lanzan en paralelo con un número
+máximo de hilos (``PRODUCTS_BATCH_MAX_WORKERS``) sobre el cliente compartido,
+que reutiliza las conexiones del pool. Las actualizaciones de caché, réplica e
+índice se aplican al final en el hilo de la petición.
+"""
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+
+from .catalog import get_catalog
+from .importer import category_lookup, validate_row
+from .mutations import product_deleted, product_saved
+
+OPERATIONS = ('create', 'update', 'delete')
+
+# Código de estado que devuelve la API cuando la operación sale bien
+SUCCESS_STATUS = {'create': 201, 'update': 200, 'delete': 200}
+
+
+class BatchValidationError(Exception):
+    """Alguna operación del lote es inválida; ``errors`` tiene un error por índice."""
+
+    def __init__(self, errors):
+        super().__init__('Operaciones inválidas')
+        self.errors = errors
+
+
+def _validate_operation(item, categories, lookup):
+    """Devuelve la operación normalizada o lanza ``ValueError`` con el motivo."""
+    if not isinstance(item, dict):
+        raise ValueError('La operación debe ser un objeto')
+
+    op = item.get('op')
+    if op not in OPERATIONS:
+        raise ValueError(f"Operación desconocida: {op!r}")
+
+    operation = {'op': op, 'id': None, 'payload': None}
+    if op in ('update', 'delete'):
+        try:
+            operation['id'] = int(item.get('id'))
+        except (TypeError, ValueError):
+            raise ValueError('Falta un id válido')
+
+    if op in ('create', 'update'):
+        data = item.get('data')
+        if not isinstance(data, dict):
+            raise ValueError("Faltan los datos del producto ('data')")
+        operation['payload'] = validate_row(data, categories, lookup)
+    return operation
+
+
+def validate_operations(items):
+    """
+    Valida el lote completo de una vez; lanza ``BatchValidationError`` si algo
+    falla. Las categorías se piden (cacheadas) solo si hay creaciones o
+    actualizaciones; si la API falla se propaga ``RequestException``.
+    """
+    max_operations = settings.PRODUCTS_BATCH_MAX_OPERATIONS
+    if not isinstance(items, list) or not items:
+        raise BatchValidationError([{'index': None, 'message': 'Se esperaba una lista de operaciones'}])
+    if len(items) > max_operations:
+        raise BatchValidationError([{
+            'index': None,
+            'message': f'Máximo {max_operations} operaciones por lote',
+        }])
+
+    categories = []
+    if any(isinstance(item, dict) and item.get('op') in ('create', 'update') for item in items):
+        categories = get_catalog().list_categories()
+    lookup = category_lookup(categories)
+
+    operations = []
+    errors = []
+    for index, item in enumerate(items):
+        try:
+            operations.append(_validate_operation(item, categories, lookup))
+        except ValueError as e:
+            errors.append({'index': index, 'message': str(e)})
+    if errors:
+        raise BatchValidationError(errors)
+    return operations
+
+
+def _send(operation):
+    """
+    Aplica una operación en el catálogo y devuelve ``(producto, código_de_estado)``;
+    se ejecuta en un hilo del pool.
+    """
+    catalog = get_catalog()
+    op = operation['op']
+    if op == 'create':
+        return catalog.create_product(operation['payload'])
+    if op == 'update':
+        return catalog.update_product(operation['id'], operation['payload'])
+    return catalog.delete_product(operation['id'])
+
+
+def _run(operation):
+    try:
+        return (*_send(operation), None)
+    except requests.exceptions.RequestException as e:
+        return None, None, e
+    except ValueError as e:
+        # Respuesta correcta de la API pero con un cuerpo que no es JSON
+        return None, None, e
+
+
+def execute_operations(operations):
+    """
+    Ejecuta las operaciones ya validadas y devuelve un resultado por operación,
+    en el mismo orden en que llegaron.
+    """
+    max_workers = min(settings.PRODUCTS_BATCH_MAX_WORKERS, len(operations))
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='products-batch') as executor:
+        # Cada tarea corre en una copia del contexto de la petición: los avisos
+        # de datos guardados y los tiempos de la API se registran en ella
+        futures = [
+            executor.submit(contextvars.copy_context().run, _run, operation)
+            for operation in operations
+        ]
+        outcomes = [future.result() for future in futures]
+
+    results = []
+    for index, (operation, (product, status_code, error)) in enumerate(zip(operations, outcomes)):
+        result = {'index': index, 'op': operation['op'], 'id': operation['id'], 'success': False}
+        if isinstance(error, ValueError):
+            # Incluye requests.JSONDecodeError, que también es RequestException
+            result['message'] = 'Respuesta inválida de la API'
+        elif error is not None:
+            result['message'] = f'Error de conexión: {str(error)}'
+        elif status_code != SUCCESS_STATUS[operation['op']]:
+            result['status_code'] = status_code
+            result['message'] = f'Error de la API. Código de estado: {status_code}'
+        else:
+            result['success'] = True
+            if operation['op'] == 'delete':
+                product_deleted(operation['id'])
+            else:
+                product_saved(product)
+                result['id'] = product.get('id')
+                result['product'] = product
+        results.append(result)
+    return results
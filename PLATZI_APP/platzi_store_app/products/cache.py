@@ -0,0 +1,352 @@
+# products/cache.py
+"""
+Caché en dos niveles para datos de la API de Platzi.
+
+- Nivel local: LRU en memoria del proceso con TTL corto (lecturas en microsegundos).
+- Nivel compartido: framework de caché de Django, compartido entre workers.
+
+Las entradas del nivel compartido guardan su instante de "frescura"; una vez
+vencido se sigue sirviendo el valor viejo durante la ventana de
+stale-while-revalidate mientras se refresca en segundo plano.
+"""
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache as django_cache
+
+from . import api_client
+
+DEFAULT_CACHE_SETTINGS = {
+    'KEY_PREFIX': 'platzi',
+    'LOCAL_MAXSIZE': 256,
+    'LOCAL_TTL': 30,
+    'CATEGORIES_TTL': 60 * 60,
+    'CATEGORIES_STALE_TTL': 60 * 60 * 24,
+    'PRODUCT_TTL': 5 * 60,
+    'PRODUCT_STALE_TTL': 60 * 60,
+}
+
+
+def get_cache_settings():
+    config = dict(DEFAULT_CACHE_SETTINGS)
+    config.update(getattr(settings, 'PLATZI_CATALOG_CACHE', {}))
+    return config
+
+
+class LocalLRUCache:
+    """LRU en memoria con expiración por entrada. Seguro entre hilos."""
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+# Refrescos asíncronos en curso (ver ``TieredCache._arefresh_in_background``)
+_background_tasks = set()
+
+
+class TieredCache:
+    """
+    Caché LRU local + caché de Django con stale-while-revalidate.
+
+    ``get_or_load(key, loader)`` devuelve el valor cacheado o llama a ``loader()``
+    para obtenerlo. Si ``loader`` lanza una excepción y existe un valor viejo,
+    se devuelve el valor viejo; si no existe, la excepción se propaga.
+
+    ``delete`` y ``set`` actúan sobre la caché compartida y la LRU de este
+    proceso; los demás workers pueden seguir sirviendo su copia local hasta
+    ``LOCAL_TTL`` segundos.
+    """
+
+    def __init__(self, namespace, ttl, stale_ttl, local_ttl=None, local_maxsize=None):
+        config = get_cache_settings()
+        self.namespace = namespace
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.local_ttl = min(ttl, local_ttl if local_ttl is not None else config['LOCAL_TTL'])
+        self.local = LocalLRUCache(local_maxsize or config['LOCAL_MAXSIZE'])
+        self.key_prefix = config['KEY_PREFIX']
+        self._refreshing = set()
+        self._refreshing_lock = threading.Lock()
+
+    def make_key(self, key):
+        return f"{self.key_prefix}:{self.namespace}:{key}"
+
+    def get_or_load(self, key, loader):
+        value = self.local.get(key)
+        if value is not None:
+            return value
+
+        entry = django_cache.get(self.make_key(key))
+        if entry is not None:
+            if entry['fresh_until'] < time.time():
+                # Valor vencido: se sirve igual y se revalida en segundo plano
+                self._refresh_in_background(key, loader)
+            else:
+                self.local.set(key, entry['value'], self.local_ttl)
+            return entry['value']
+
+        value = loader()
+        self.set(key, value)
+        return value
+
+    async def aget_or_load(self, key, loader):
+        """Versión asíncrona de ``get_or_load``; ``loader`` es una corrutina."""
+        value = self.local.get(key)
+        if value is not None:
+            return value
+
+        entry = await django_cache.aget(self.make_key(key))
+        if entry is not None:
+            if entry['fresh_until'] < time.time():
+                self._arefresh_in_background(key, loader)
+            else:
+                self.local.set(key, entry['value'], self.local_ttl)
+            return entry['value']
+
+        value = await loader()
+        await sync_to_async(self.set)(key, value)
+        return value
+
+    def get_stale(self, key):
+        """Devuelve el último valor conocido (aunque esté vencido) o None."""
+        value = self.local.get(key)
+        if value is not None:
+            return value
+        entry = django_cache.get(self.make_key(key))
+        return entry['value'] if entry is not None else None
+
+    def set(self, key, value):
+        entry = {'value': value, 'fresh_until': time.time() + self.ttl}
+        django_cache.set(self.make_key(key), entry, self.ttl + self.stale_ttl)
+        self.local.set(key, value, self.local_ttl)
+
+    def set_many(self, mapping):
+        fresh_until = time.time() + self.ttl
+        django_cache.set_many(
+            {self.make_key(key): {'value': value, 'fresh_until': fresh_until} for key, value in mapping.items()},
+            self.ttl + self.stale_ttl,
+        )
+        for key, value in mapping.items():
+            self.local.set(key, value, self.local_ttl)
+
+    def delete(self, key):
+        self.local.delete(key)
+        django_cache.delete(self.make_key(key))
+
+    def _refresh_in_background(self, key, loader):
+        with self._refreshing_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self.set(key, loader())
+            except Exception:
+                # Se mantiene el valor viejo; se reintentará en la próxima lectura
+                pass
+            finally:
+                with self._refreshing_lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def _arefresh_in_background(self, key, loader):
+        with self._refreshing_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        async def refresh():
+            try:
+                await sync_to_async(self.set)(key, await loader())
+            except Exception:
+                pass
+            finally:
+                with self._refreshing_lock:
+                    self._refreshing.discard(key)
+
+        # El loop solo guarda una referencia débil a sus tareas
+        task = asyncio.get_running_loop().create_task(refresh())
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+
+
+# Categorías
+
+_config = get_cache_settings()
+categories_cache = TieredCache(
+    'categories',
+    ttl=_config['CATEGORIES_TTL'],
+    stale_ttl=_config['CATEGORIES_STALE_TTL'],
+)
+
+
+def _load_categories():
+    response = api_client.get(f"{settings.PLATZI_API_BASE_URL}categories/", stale_fallback=True)
+    response.raise_for_status()
+    return response.json()
+
+
+def get_categories():
+    """
+    Devuelve la lista de categorías desde la caché.
+
+    Lanza ``requests.exceptions.RequestException`` solo si no hay ningún valor
+    cacheado y la API no responde correctamente.
+    """
+    return categories_cache.get_or_load('all', _load_categories)
+
+
+async def _aload_categories():
+    response = await api_client.get_async_client().get(f"{settings.PLATZI_API_BASE_URL}categories/", stale_fallback=True)
+    response.raise_for_status()
+    return response.json()
+
+
+async def aget_categories():
+    """Versión asíncrona de ``get_categories``; lanza ``httpx.HTTPError`` si falla la API."""
+    return await categories_cache.aget_or_load('all', _aload_categories)
+
+
+def invalidate_categories():
+    """
+    Invalida las categorías cacheadas (p. ej. tras cambiarlas fuera de la app).
+    Los demás workers las vuelven a leer cuando vence su copia local (``LOCAL_TTL``).
+    """
+    categories_cache.delete('all')
+
+
+# Productos individuales
+#
+# Cada entrada guarda el producto junto con los encabezados ETag/Last-Modified
+# de la respuesta, para revalidar con una petición condicional al vencer.
+
+class ProductNotFound(Exception):
+    pass
+
+
+products_cache = TieredCache(
+    'product',
+    ttl=_config['PRODUCT_TTL'],
+    stale_ttl=_config['PRODUCT_STALE_TTL'],
+)
+
+
+def _conditional_headers(previous):
+    headers = {}
+    if previous:
+        if previous.get('etag'):
+            headers['If-None-Match'] = previous['etag']
+        if previous.get('last_modified'):
+            headers['If-Modified-Since'] = previous['last_modified']
+    return headers
+
+
+def _product_entry(response, previous):
+    """Convierte la respuesta de la API en una entrada de caché (o reutiliza la anterior si es 304)."""
+    if response.status_code == 304 and previous:
+        return previous
+    if response.status_code != 200:
+        # La API responde 400/404 para ids inexistentes; no se cachean los negativos
+        if response.status_code < 500:
+            raise ProductNotFound(response.status_code)
+        response.raise_for_status()
+    return {
+        'product': response.json(),
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+    }
+
+
+def _load_product(pk):
+    previous = products_cache.get_stale(str(pk))
+    response = api_client.get(
+        f"{settings.PLATZI_API_BASE_URL}products/{pk}",
+        headers=_conditional_headers(previous),
+        stale_fallback=True,
+    )
+    return _product_entry(response, previous)
+
+
+async def _aload_product(pk):
+    previous = await sync_to_async(products_cache.get_stale)(str(pk))
+    response = await api_client.get_async_client().get(
+        f"{settings.PLATZI_API_BASE_URL}products/{pk}",
+        headers=_conditional_headers(previous),
+        stale_fallback=True,
+    )
+    return _product_entry(response, previous)
+
+
+def get_product(pk):
+    """
+    Devuelve el producto desde la caché o la API, o None si no existe.
+
+    Lanza ``requests.exceptions.RequestException`` si la API no responde y no
+    hay copia cacheada.
+    """
+    try:
+        return products_cache.get_or_load(str(pk), lambda: _load_product(pk))['product']
+    except ProductNotFound:
+        return None
+
+
+async def aget_product(pk):
+    """Versión asíncrona de ``get_product``; lanza ``httpx.HTTPError`` si falla la API."""
+    try:
+        entry = await products_cache.aget_or_load(str(pk), lambda: _aload_product(pk))
+        return entry['product']
+    except ProductNotFound:
+        return None
+
+
+def set_product(product):
+    """Guarda un producto devuelto por la API (tras crearlo o actualizarlo)."""
+    products_cache.set(str(product['id']), {'product': product, 'etag': None, 'last_modified': None})
+
+
+def prime_products(products):
+    """Llena la caché de detalle con los productos de un listado."""
+    products_cache.set_many({
+        str(product['id']): {'product': product, 'etag': None, 'last_modified': None}
+        for product in products
+        if 'id' in product
+    })
+
+
+def invalidate_product(pk):
+    products_cache.delete(str(pk))
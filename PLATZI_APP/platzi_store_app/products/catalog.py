@@ -0,0 +1,378 @@
+# products/catalog.py
+"""
+Origen de los datos del catálogo.
+
+Las vistas, formularios, búsqueda, exportación, lotes e importación leen y
+escriben productos a través del backend configurado en
+``settings.PLATZI_CATALOG_BACKEND`` (mismo formato que ``CACHES``)::
+
+    PLATZI_CATALOG_BACKEND = {
+        'BACKEND': 'products.catalog.MirrorCatalog',
+        'OPTIONS': {},
+    }
+
+- ``RemoteCatalog``: la API HTTP en ``settings.PLATZI_API_BASE_URL`` (la
+  real, un mirror cercano o un proxy con caché), con las cachés de
+  ``products/cache.py``.
+- ``MirrorCatalog``: la réplica local en la base de datos cuando está
+  sincronizada, y la API mientras no lo está. Las escrituras van a la API.
+- ``InMemoryCatalog``: datos en memoria del proceso, generados o cargados de
+  un archivo JSON; para pruebas y benchmarks sin red.
+
+Los métodos devuelven diccionarios con la forma de la API. Las lecturas
+devuelven ``(productos, código_de_estado)`` donde la API puede responder con
+error, y las escrituras ``(producto_o_None, código_de_estado)``. Si la API no
+responde se lanza ``requests.exceptions.RequestException`` (o
+``httpx.HTTPError`` en los métodos ``a*``), igual que antes en las vistas.
+"""
+import json
+import threading
+import time
+
+import requests
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from . import api_client, mirror
+from .cache import aget_categories, aget_product, get_categories, get_product, prime_products
+
+DEFAULT_CATALOG_BACKEND = {
+    'BACKEND': 'products.catalog.MirrorCatalog',
+    'OPTIONS': {},
+}
+
+
+def get_catalog_settings():
+    config = dict(DEFAULT_CATALOG_BACKEND)
+    config.update(getattr(settings, 'PLATZI_CATALOG_BACKEND', {}))
+    return config
+
+
+class CatalogBackend:
+    """Interfaz común; las versiones asíncronas por defecto corren la síncrona en un hilo."""
+
+    # Nombre del origen para el índice de búsqueda (se reconstruye si cambia)
+    name = None
+
+    def __init__(self, **options):
+        self.options = options
+
+    def list_categories(self):
+        raise NotImplementedError
+
+    def list_products(self, offset, limit, category_id=None):
+        raise NotImplementedError
+
+    def iter_pages(self, page_size, category_id=None):
+        """Recorre todo el catálogo (o una categoría) por páginas de ``page_size`` productos."""
+        offset = 0
+        while True:
+            products, status_code = self.list_products(offset, page_size, category_id)
+            if status_code != 200:
+                raise CatalogError(status_code)
+            if products:
+                yield products
+            if len(products) < page_size:
+                return
+            offset += page_size
+
+    def all_products(self):
+        """Catálogo completo, para construir el índice de búsqueda."""
+        return [product for page in self.iter_pages(100) for product in page]
+
+    def search_version(self):
+        """
+        Devuelve ``(origen, versión)`` de los datos para el índice de búsqueda.
+        Con versión ``None`` el índice se reconstruye cada ``REFRESH_INTERVAL``.
+        """
+        return self.name, None
+
+    def get_product(self, pk):
+        raise NotImplementedError
+
+    def create_product(self, data):
+        raise NotImplementedError
+
+    def update_product(self, pk, data):
+        raise NotImplementedError
+
+    def delete_product(self, pk):
+        raise NotImplementedError
+
+    async def alist_categories(self):
+        return await sync_to_async(self.list_categories)()
+
+    async def alist_products(self, offset, limit, category_id=None):
+        return await sync_to_async(self.list_products)(offset, limit, category_id)
+
+    async def aget_product(self, pk):
+        return await sync_to_async(self.get_product)(pk)
+
+
+class CatalogError(requests.exceptions.HTTPError):
+    """
+    El backend respondió con un error al recorrer el catálogo completo. Hereda
+    de ``HTTPError`` para que lo atrapen los mismos ``except`` que a la API.
+    """
+
+    def __init__(self, status_code):
+        super().__init__(f'Error de la API. Código de estado: {status_code}')
+        self.status_code = status_code
+
+
+class RemoteCatalog(CatalogBackend):
+    name = 'api'
+
+    def _url(self, path):
+        return f"{settings.PLATZI_API_BASE_URL}{path}"
+
+    def _products_url(self, category_id):
+        if category_id is not None:
+            return self._url(f"categories/{category_id}/products")
+        return self._url("products/")
+
+    def list_categories(self):
+        return get_categories()
+
+    def list_products(self, offset, limit, category_id=None):
+        response = api_client.get(
+            self._products_url(category_id), params={'offset': offset, 'limit': limit}, stale_fallback=True
+        )
+        if response.status_code != 200:
+            return [], response.status_code
+        products = response.json()
+        # Los productos del listado quedan en la caché de detalle (modales y página de detalle)
+        prime_products(products)
+        return products, 200
+
+    def iter_pages(self, page_size, category_id=None):
+        # Sin llenar la caché de detalle: una exportación recorre todo el catálogo
+        offset = 0
+        while True:
+            response = api_client.get(self._products_url(category_id), params={'offset': offset, 'limit': page_size})
+            response.raise_for_status()
+            products = response.json()
+            if products:
+                yield products
+            if len(products) < page_size:
+                return
+            offset += page_size
+
+    def all_products(self):
+        response = api_client.get(self._url("products/"))
+        response.raise_for_status()
+        return response.json()
+
+    def get_product(self, pk):
+        return get_product(pk)
+
+    def create_product(self, data):
+        response = api_client.post(self._url("products/"), json=data)
+        return (response.json() if response.status_code == 201 else None), response.status_code
+
+    def update_product(self, pk, data):
+        response = api_client.put(self._url(f"products/{pk}"), json=data)
+        return (response.json() if response.status_code == 200 else None), response.status_code
+
+    def delete_product(self, pk):
+        response = api_client.delete(self._url(f"products/{pk}"))
+        return None, response.status_code
+
+    async def alist_categories(self):
+        return await aget_categories()
+
+    async def alist_products(self, offset, limit, category_id=None):
+        response = await api_client.get_async_client().get(
+            self._products_url(category_id), params={'offset': offset, 'limit': limit}, stale_fallback=True
+        )
+        if response.status_code != 200:
+            return [], response.status_code
+        products = response.json()
+        await sync_to_async(prime_products)(products)
+        return products, 200
+
+    async def aget_product(self, pk):
+        return await aget_product(pk)
+
+
+class MirrorCatalog(RemoteCatalog):
+    """
+    Lee de la réplica local si ya se sincronizó; si no (o si falta un producto),
+    de la API. Si la réplica está lista se comprueba como mucho cada
+    ``READY_CHECK_INTERVAL`` segundos (opción, por defecto 5).
+    """
+
+    def __init__(self, **options):
+        super().__init__(**options)
+        self.ready_check_interval = options.get('READY_CHECK_INTERVAL', 5)
+        self._ready = False
+        self._ready_checked_at = None
+
+    def _mirror_ready(self):
+        now = time.monotonic()
+        if self._ready_checked_at is None or now - self._ready_checked_at >= self.ready_check_interval:
+            self._ready = mirror.is_ready()
+            self._ready_checked_at = now
+        return self._ready
+
+    def search_version(self):
+        if self._mirror_ready():
+            return 'mirror', mirror.data_version()
+        return super().search_version()
+
+    def list_categories(self):
+        return mirror.list_categories() if self._mirror_ready() else super().list_categories()
+
+    def list_products(self, offset, limit, category_id=None):
+        if self._mirror_ready():
+            return mirror.list_products(category_id=category_id, offset=offset, limit=limit), 200
+        return super().list_products(offset, limit, category_id)
+
+    def iter_pages(self, page_size, category_id=None):
+        if not self._mirror_ready():
+            yield from super().iter_pages(page_size, category_id)
+            return
+        # Se recorre con un iterador de la base de datos para no cargar todo en memoria
+        page = []
+        for product in mirror.iter_products(category_id=category_id, chunk_size=page_size):
+            page.append(product)
+            if len(page) >= page_size:
+                yield page
+                page = []
+        if page:
+            yield page
+
+    def all_products(self):
+        return mirror.list_products() if self._mirror_ready() else super().all_products()
+
+    def get_product(self, pk):
+        product = mirror.get_product(pk) if self._mirror_ready() else None
+        # Si no está en la réplica (p. ej. producto recién creado) se consulta la caché / API
+        return product if product is not None else super().get_product(pk)
+
+    async def alist_categories(self):
+        if await sync_to_async(self._mirror_ready)():
+            return await sync_to_async(mirror.list_categories)()
+        return await super().alist_categories()
+
+    async def alist_products(self, offset, limit, category_id=None):
+        if await sync_to_async(self._mirror_ready)():
+            products = await sync_to_async(mirror.list_products)(category_id=category_id, offset=offset, limit=limit)
+            return products, 200
+        return await super().alist_products(offset, limit, category_id)
+
+    async def aget_product(self, pk):
+        product = None
+        if await sync_to_async(self._mirror_ready)():
+            product = await sync_to_async(mirror.get_product)(pk)
+        return product if product is not None else await super().aget_product(pk)
+
+
+class InMemoryCatalog(CatalogBackend):
+    """
+    Catálogo en memoria del proceso. Opciones: ``FIXTURE`` (ruta a un JSON con
+    ``categories`` y ``products`` con la forma de la API) o, si no hay,
+    ``CATALOG_SIZE``, ``CATEGORIES`` y ``SEED`` para generarlo.
+    """
+    name = 'memory'
+
+    def __init__(self, **options):
+        super().__init__(**options)
+        self._lock = threading.Lock()
+        self.version = 0
+        if options.get('FIXTURE'):
+            with open(options['FIXTURE'], encoding='utf-8') as f:
+                data = json.load(f)
+            self.categories = data['categories']
+            products = {product['id']: product for product in data['products']}
+        else:
+            # Mismo catálogo que la API falsa de los benchmarks
+            from .fake_api import build_catalog
+            self.categories, products = build_catalog(
+                options.get('CATALOG_SIZE', 50), options.get('CATEGORIES', 5), options.get('SEED', 0)
+            )
+        self.products = products
+        self._next_id = max(products, default=0) + 1
+
+    def search_version(self):
+        return self.name, self.version
+
+    def list_categories(self):
+        return list(self.categories)
+
+    def list_products(self, offset, limit, category_id=None):
+        with self._lock:
+            products = list(self.products.values())
+        if category_id is not None:
+            products = [p for p in products if (p.get('category') or {}).get('id') == category_id]
+        return products[offset:offset + limit], 200
+
+    def all_products(self):
+        with self._lock:
+            return list(self.products.values())
+
+    def get_product(self, pk):
+        return self.products.get(int(pk))
+
+    def _category(self, category_id):
+        return next((c for c in self.categories if c['id'] == category_id), None)
+
+    def _build(self, pk, data, current=None):
+        product = dict(current or {'id': pk})
+        for field in ('title', 'price', 'description', 'images'):
+            if field in data:
+                product[field] = data[field]
+        if 'categoryId' in data:
+            product['category'] = self._category(int(data['categoryId']))
+        product['updatedAt'] = time.strftime('%Y-%m-%dT%H:%M:%S.000Z', time.gmtime())
+        return product
+
+    def create_product(self, data):
+        if data.get('categoryId') is not None and self._category(int(data['categoryId'])) is None:
+            return None, 400
+        with self._lock:
+            product = self._build(self._next_id, data)
+            self.products[product['id']] = product
+            self._next_id += 1
+            self.version += 1
+        return product, 201
+
+    def update_product(self, pk, data):
+        with self._lock:
+            if pk not in self.products:
+                return None, 400
+            product = self.products[pk] = self._build(pk, data, self.products[pk])
+            self.version += 1
+        return product, 200
+
+    def delete_product(self, pk):
+        with self._lock:
+            if self.products.pop(pk, None) is None:
+                return None, 400
+            self.version += 1
+        return None, 200
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog():
+    """Backend del catálogo del proceso, creado la primera vez que se usa."""
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                config = get_catalog_settings()
+                _catalog = import_string(config['BACKEND'])(**config.get('OPTIONS', {}))
+    return _catalog
+
+
+@receiver(setting_changed)
+def _reset_catalog(setting, **kwargs):
+    global _catalog
+    if setting in ('PLATZI_CATALOG_BACKEND', 'PLATZI_CATALOG_MIRROR'):
+        _catalog = None
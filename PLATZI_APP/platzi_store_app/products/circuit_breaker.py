@@ -0,0 +1,108 @@
+# products/circuit_breaker.py
+"""
+Circuit breaker para la API de Platzi.
+
+- Cerrado: las llamadas pasan normalmente; se cuentan los fallos seguidos.
+- Abierto: tras ``failure_threshold`` fallos seguidos las llamadas fallan al
+  instante con ``CircuitOpenError`` durante ``recovery_timeout`` segundos.
+- Semiabierto: pasado ese tiempo se dejan pasar ``half_open_max_calls``
+  llamadas de prueba; si salen bien se cierra, si fallan se vuelve a abrir.
+
+El estado es por proceso (cada worker decide por su cuenta).
+
+Mientras la API no responde, el cliente sirve la última respuesta buena
+guardada y lo marca en el estado de la petición actual para que las
+plantillas muestren un aviso (ver ``UpstreamStatusMiddleware``).
+"""
+import contextvars
+import threading
+import time
+
+import httpx
+import requests
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """La API se considera caída; se lanza sin intentar la conexión."""
+
+
+class AsyncCircuitOpenError(httpx.ConnectError):
+    """Equivalente de ``CircuitOpenError`` para el cliente asíncrono (httpx)."""
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=5, recovery_timeout=30, half_open_max_calls=1):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.half_open_calls = 0
+        self.rejected = 0
+
+    def allow_request(self):
+        """Indica si se puede llamar a la API ahora (y reserva un turno de prueba si está semiabierto)."""
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self.recovery_timeout:
+                    self.rejected += 1
+                    return False
+                self.state = HALF_OPEN
+                self.half_open_calls = 0
+
+            if self.state == HALF_OPEN:
+                if self.half_open_calls >= self.half_open_max_calls:
+                    self.rejected += 1
+                    return False
+                self.half_open_calls += 1
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self.half_open_calls = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+                self.half_open_calls = 0
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'state': self.state,
+                'failures': self.failures,
+                'rejected': self.rejected,
+            }
+
+
+# Estado por petición: lo inicializa UpstreamStatusMiddleware y lo lee el context processor
+_request_state = contextvars.ContextVar('platzi_upstream_state', default=None)
+
+
+def start_request():
+    state = {'stale': False}
+    _request_state.set(state)
+    return state
+
+
+def mark_stale():
+    """Indica que en esta petición se sirvieron datos guardados en lugar de datos de la API."""
+    state = _request_state.get()
+    if state is not None:
+        state['stale'] = True
+
+
+def served_stale():
+    state = _request_state.get()
+    return bool(state and state['stale'])
@@ -0,0 +1,7 @@
+# products/context_processors.py
+from .circuit_breaker import served_stale
+
+
+def upstream_status(request):
+    """Expone ``upstream_degraded`` a las plantillas (datos servidos desde la copia guardada)."""
+    return {'upstream_degraded': served_stale()}
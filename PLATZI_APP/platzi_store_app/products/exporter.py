@@ -0,0 +1,139 @@
+# products/exporter.py
+"""
+Exportación del catálogo completo en CSV o NDJSON.
+
+Los productos se recorren por páginas (backend de ``products.catalog``) y cada página se
+convierte en texto y se entrega en cuanto está lista; nunca se guarda el
+catálogo entero en memoria. Opcionalmente la salida se comprime con gzip
+sobre la marcha. La misma secuencia de bloques la usan la vista
+``products_export_view`` (``StreamingHttpResponse``) y el comando
+``export_products``.
+"""
+import csv
+import json
+import zlib
+
+from django.conf import settings
+
+from .catalog import get_catalog
+
+DEFAULT_EXPORT_SETTINGS = {
+    'PAGE_SIZE': 100,
+    'DEFAULT_COLUMNS': ['id', 'title', 'price', 'category_id', 'category_name', 'description', 'images'],
+}
+
+FORMATS = ('csv', 'ndjson')
+
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def _category(product):
+    return product.get('category') or {}
+
+
+# Columnas disponibles: nombre -> valor a partir del producto (formato de la API)
+COLUMNS = {
+    'id': lambda product: product.get('id'),
+    'title': lambda product: product.get('title'),
+    'slug': lambda product: product.get('slug'),
+    'price': lambda product: product.get('price'),
+    'description': lambda product: product.get('description'),
+    'category_id': lambda product: _category(product).get('id'),
+    'category_name': lambda product: _category(product).get('name'),
+    'image': lambda product: (product.get('images') or [None])[0],
+    'images': lambda product: product.get('images') or [],
+}
+
+
+def get_export_settings():
+    config = dict(DEFAULT_EXPORT_SETTINGS)
+    config.update(getattr(settings, 'PLATZI_CATALOG_EXPORT', {}))
+    return config
+
+
+def parse_format(value):
+    """Normaliza el formato pedido (``jsonl`` es sinónimo de ``ndjson``); lanza ``ValueError`` si no existe."""
+    fmt = (value or 'csv').lower()
+    if fmt == 'jsonl':
+        fmt = 'ndjson'
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato no soportado: {value!r}. Use csv o ndjson.")
+    return fmt
+
+
+def parse_columns(value):
+    """Convierte ``"id,title"`` en la lista de columnas; lanza ``ValueError`` si alguna no existe."""
+    if not value:
+        return list(get_export_settings()['DEFAULT_COLUMNS'])
+    columns = [column.strip() for column in value.split(',') if column.strip()]
+    unknown = [column for column in columns if column not in COLUMNS]
+    if unknown:
+        raise ValueError(
+            f"Columnas desconocidas: {', '.join(unknown)}. Disponibles: {', '.join(COLUMNS)}"
+        )
+    return columns
+
+
+def iter_product_pages(category_id=None, page_size=None):
+    """Genera el catálogo por páginas desde el backend configurado (réplica, API o memoria)."""
+    page_size = page_size or get_export_settings()['PAGE_SIZE']
+    return get_catalog().iter_pages(page_size, category_id)
+
+
+class _LineBuffer:
+    """Pseudo-archivo para ``csv.writer``: devuelve la línea escrita en lugar de guardarla."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(pages, columns):
+    writer = csv.writer(_LineBuffer())
+    # La cabecera sale antes de pedir la primera página
+    yield writer.writerow(columns)
+    for products in pages:
+        rows = []
+        for product in products:
+            row = []
+            for column in columns:
+                value = COLUMNS[column](product)
+                row.append('|'.join(value) if isinstance(value, list) else value)
+            rows.append(writer.writerow(row))
+        yield ''.join(rows)
+
+
+def iter_ndjson(pages, columns):
+    for products in pages:
+        yield ''.join(
+            json.dumps({column: COLUMNS[column](product) for column in columns}, ensure_ascii=False) + '\n'
+            for product in products
+        )
+
+
+def gzip_chunks(chunks):
+    """Comprime con gzip un flujo de texto; cada bloque se envía en cuanto se comprime."""
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        # SYNC_FLUSH: el cliente recibe los datos de cada página sin esperar al final
+        yield compressor.compress(chunk.encode('utf-8')) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+def export_catalog(fmt='csv', columns=None, compress=False, category_id=None, page_size=None):
+    """
+    Devuelve un generador con el catálogo exportado: ``str`` sin comprimir o
+    ``bytes`` con ``compress=True``. Los errores de la API
+    (``requests.exceptions.RequestException``) se lanzan al recorrerlo.
+    """
+    fmt = parse_format(fmt)
+    columns = columns or parse_columns(None)
+    pages = iter_product_pages(category_id=category_id, page_size=page_size)
+    chunks = iter_csv(pages, columns) if fmt == 'csv' else iter_ndjson(pages, columns)
+    return gzip_chunks(chunks) if compress else chunks
+
+
+def export_filename(fmt, compress=False):
+    return f"products.{'csv' if fmt == 'csv' else 'ndjson'}{'.gz' if compress else ''}"
@@ -0,0 +1,199 @@
+# products/fake_api.py
+"""
+Imitación local de la API de escuelajs (``/api/v1/``) para benchmarks.
+
+Sirve un catálogo generado en memoria con los endpoints que usa el sitio:
+
+- ``GET products/`` (con ``offset``/``limit`` o completo), ``GET products/<id>``
+- ``GET categories/`` y ``GET categories/<id>/products``
+- ``POST products/``, ``PUT products/<id>`` y ``DELETE products/<id>``
+
+Se le puede agregar latencia (con variación aleatoria) y una tasa de errores
+503 para ver cómo responde el sitio cuando la API es lenta o inestable. Las
+escrituras modifican el catálogo en memoria, como la API real.
+
+Se usa desde ``bench_site`` o se levanta sola con ``fake_platzi_api``.
+"""
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+PREFIX = '/api/v1/'
+
+WORDS = (
+    'Classic', 'Modern', 'Sleek', 'Rustic', 'Vintage', 'Ergonomic', 'Handmade',
+    'Shirt', 'Sneakers', 'Chair', 'Headphones', 'Watch', 'Backpack', 'Lamp',
+)
+
+
+def build_catalog(size, categories=5, seed=0):
+    """Catálogo determinista: ``size`` productos repartidos en ``categories`` categorías."""
+    rng = random.Random(seed)
+    category_list = [
+        {'id': i, 'name': f'Categoría {i}', 'slug': f'categoria-{i}', 'image': f'https://placehold.co/600x400?text=C{i}'}
+        for i in range(1, categories + 1)
+    ]
+    products = {}
+    for pk in range(1, size + 1):
+        category = category_list[(pk - 1) % categories]
+        products[pk] = {
+            'id': pk,
+            'title': f'{rng.choice(WORDS)} {rng.choice(WORDS)} {pk}',
+            'slug': f'producto-{pk}',
+            'price': rng.randint(5, 500),
+            'description': f'Producto de prueba número {pk}.',
+            'category': category,
+            'images': [f'https://placehold.co/600x400?text={pk}'],
+            'creationAt': '2025-01-01T00:00:00.000Z',
+            'updatedAt': '2025-01-01T00:00:00.000Z',
+        }
+    return category_list, products
+
+
+class FakePlatziAPI:
+    """Servidor HTTP en un hilo de fondo; ``base_url`` reemplaza a ``PLATZI_API_BASE_URL``."""
+
+    def __init__(self, catalog_size=200, categories=5, latency=0.0, jitter=0.0, error_rate=0.0,
+                 host='127.0.0.1', port=0, seed=0):
+        self.categories, self.products = build_catalog(catalog_size, categories, seed)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.requests = 0
+        self.errors = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._next_id = catalog_size + 1
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}{PREFIX}'
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, name='fake-platzi-api', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    # Comportamiento de la API
+
+    def _delay_and_fail(self):
+        """Aplica la latencia configurada y decide si esta petición falla."""
+        with self._lock:
+            self.requests += 1
+            delay = max(self.latency + self._rng.uniform(-self.jitter, self.jitter), 0.0)
+            failed = self._rng.random() < self.error_rate
+            self.errors += int(failed)
+        if delay:
+            time.sleep(delay)
+        return failed
+
+    def _page(self, items, query):
+        if 'offset' not in query and 'limit' not in query:
+            return items
+        offset = int(query.get('offset', ['0'])[0])
+        limit = int(query.get('limit', ['10'])[0])
+        return items[offset:offset + limit]
+
+    def handle(self, method, path, query, body):
+        """Devuelve ``(código, datos)`` para una petición ya sin el prefijo ``/api/v1/``."""
+        parts = [part for part in path.split('/') if part]
+        with self._lock:
+            if parts == ['categories'] and method == 'GET':
+                return 200, self.categories
+            if len(parts) == 3 and parts[0] == 'categories' and parts[2] == 'products' and method == 'GET':
+                category_id = int(parts[1])
+                items = [p for p in self.products.values() if p['category']['id'] == category_id]
+                return 200, self._page(items, query)
+            if parts == ['products'] and method == 'GET':
+                items = list(self.products.values())
+                if 'title' in query:
+                    title = query['title'][0].lower()
+                    items = [p for p in items if title in p['title'].lower()]
+                return 200, self._page(items, query)
+            if parts == ['products'] and method == 'POST':
+                product = self._product_from(body, self._next_id)
+                self.products[product['id']] = product
+                self._next_id += 1
+                return 201, product
+            if len(parts) == 2 and parts[0] == 'products' and parts[1].isdigit():
+                pk = int(parts[1])
+                if pk not in self.products:
+                    return 400, {'message': 'Could not find any entity of type "Product"'}
+                if method == 'GET':
+                    return 200, self.products[pk]
+                if method == 'PUT':
+                    self.products[pk] = self._product_from(body, pk, self.products[pk])
+                    return 200, self.products[pk]
+                if method == 'DELETE':
+                    del self.products[pk]
+                    return 200, True
+        return 404, {'message': f'Cannot {method} {PREFIX}{path}'}
+
+    def _product_from(self, body, pk, current=None):
+        product = dict(current or {'id': pk, 'slug': f'producto-{pk}', 'creationAt': '2025-01-01T00:00:00.000Z'})
+        for field in ('title', 'price', 'description', 'images'):
+            if field in body:
+                product[field] = body[field]
+        category_id = body.get('categoryId')
+        if category_id is not None:
+            product['category'] = next(
+                (c for c in self.categories if c['id'] == int(category_id)), self.categories[0]
+            )
+        product.setdefault('category', self.categories[0])
+        product['updatedAt'] = time.strftime('%Y-%m-%dT%H:%M:%S.000Z', time.gmtime())
+        return product
+
+    def _handler_class(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _respond(self):
+                parts = urlsplit(self.path)
+                length = int(self.headers.get('Content-Length') or 0)
+                raw = self.rfile.read(length) if length else b''
+                if api._delay_and_fail():
+                    status, data = 503, {'message': 'Service Unavailable'}
+                elif not parts.path.startswith(PREFIX):
+                    status, data = 404, {'message': 'Not Found'}
+                else:
+                    try:
+                        body = json.loads(raw) if raw else {}
+                        status, data = api.handle(
+                            self.command, parts.path[len(PREFIX):], parse_qs(parts.query), body
+                        )
+                    except (ValueError, TypeError) as e:
+                        status, data = 400, {'message': str(e)}
+
+                payload = json.dumps(data).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST = do_PUT = do_DELETE = _respond
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
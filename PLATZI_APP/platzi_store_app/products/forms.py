@@ -2,6 +2,7 @@
 
 from django import forms
 import requests
+from .catalog import get_catalog
 
 class ProductForm(forms.Form):
     title = forms.CharField(
@@ -30,17 +31,34 @@ class ProductForm(forms.Form):
         widget=forms.URLInput(attrs={'class': 'form-control', 'placeholder': 'https://ejemplo.com/imagen.jpg'})
     )
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, categories=None, **kwargs):
         super().__init__(*args, **kwargs)
         try:
-            # Obtener las categorías de la API para llenar el ChoiceField
-            response = requests.get('https://api.escuelajs.co/api/v1/categories')
-            if response.status_code == 200:
-                categories_data = response.json()
-                # Asegura que las opciones sean tuplas de (id, nombre)
-                choices = [(str(cat['id']), cat['name']) for cat in categories_data]
-                self.fields['category'].choices = choices
-            else:
-                self.fields['category'].choices = [('', 'Error al cargar categorías')]
+            # Obtener las categorías (cacheadas) para llenar el ChoiceField;
+            # la importación masiva las pasa ya cargadas para no pedirlas por fila
+            categories_data = categories if categories is not None else get_catalog().list_categories()
+            # Asegura que las opciones sean tuplas de (id, nombre)
+            choices = [(str(cat['id']), cat['name']) for cat in categories_data]
+            self.fields['category'].choices = choices
         except requests.exceptions.RequestException:
-            self.fields['category'].choices = [('', 'Error al cargar categorías')]
\ No newline at end of file
+            self.fields['category'].choices = [('', 'Error al cargar categorías')]
+
+class ProductImportForm(forms.Form):
+    file = forms.FileField(
+        label='Archivo CSV o JSONL',
+        help_text='Columnas: title, description, price, category (id o nombre) e image (opcional).',
+        widget=forms.ClearableFileInput(attrs={'class': 'form-control', 'accept': '.csv,.jsonl,.ndjson'})
+    )
+
+    def clean_file(self):
+        # Import local: importer importa este módulo
+        from .importer import get_import_settings
+
+        upload = self.cleaned_data['file']
+        max_size = get_import_settings()['MAX_UPLOAD_SIZE']
+        if upload.size > max_size:
+            raise forms.ValidationError(
+                f'El archivo supera {max_size // (1024 * 1024)} MB. Los archivos grandes se importan '
+                'desde el servidor con: python manage.py import_products ARCHIVO'
+            )
+        return upload
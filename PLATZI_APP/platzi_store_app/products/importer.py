@@ -0,0 +1,279 @@
+# products/importer.py
+"""
+Importación masiva de productos desde archivos CSV o JSONL.
+
+- El archivo se lee fila por fila (nunca se carga entero en memoria).
+- Cada fila se valida con las mismas reglas que ``ProductForm``; la categoría
+  puede venir como id o como nombre y se resuelve con las categorías cacheadas,
+  que se piden una sola vez por importación.
+- Las filas válidas se crean en el catálogo por bloques de ``CHUNK_SIZE`` con
+  ``MAX_WORKERS`` hilos sobre el cliente compartido.
+- Tras cada bloque se guarda un punto de control en ``ProductImport``. Si la
+  importación se corta (error de conexión, proceso interrumpido), volver a
+  importar el mismo archivo continúa desde ahí sin reenviar filas.
+
+La importación corre en el proceso que la llama. Desde la web el archivo se
+importa dentro de la petición de subida, así que el formulario limita su
+tamaño a ``MAX_UPLOAD_SIZE``; los archivos grandes se importan con
+``python manage.py import_products``.
+"""
+import csv
+import hashlib
+import io
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+
+from .catalog import get_catalog
+from .forms import ProductForm
+from .models import ProductImport
+from .mutations import products_saved
+
+DEFAULT_IMPORT_SETTINGS = {
+    'CHUNK_SIZE': 50,
+    'MAX_WORKERS': 8,
+    'MAX_ERRORS': 100,
+    'MAX_UPLOAD_SIZE': 5 * 1024 * 1024,
+}
+
+FORMATS = ('csv', 'jsonl')
+
+
+def get_import_settings():
+    config = dict(DEFAULT_IMPORT_SETTINGS)
+    config.update(getattr(settings, 'PLATZI_PRODUCT_IMPORT', {}))
+    return config
+
+
+def detect_format(filename):
+    """Devuelve ``'csv'`` o ``'jsonl'`` según la extensión; lanza ``ValueError`` si no es ninguno."""
+    name = (filename or '').lower()
+    if name.endswith('.csv'):
+        return 'csv'
+    if name.endswith(('.jsonl', '.ndjson')):
+        return 'jsonl'
+    raise ValueError('Formato no soportado: use un archivo .csv o .jsonl')
+
+
+def file_digest(fileobj, chunk_size=64 * 1024):
+    """Huella SHA-1 del archivo (binario) leída por bloques; deja el archivo al principio."""
+    digest = hashlib.sha1()
+    fileobj.seek(0)
+    for chunk in iter(lambda: fileobj.read(chunk_size), b''):
+        digest.update(chunk)
+    fileobj.seek(0)
+    return digest.hexdigest()
+
+
+def iter_rows(fileobj, fmt):
+    """
+    Genera ``(número_de_fila, datos, error)`` para cada fila del archivo
+    binario ``fileobj``. Las filas se numeran desde 1 sin contar la cabecera.
+    """
+    text = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    try:
+        if fmt == 'csv':
+            for number, row in enumerate(csv.DictReader(text), start=1):
+                yield number, row, None
+        else:
+            number = 0
+            for line in text:
+                if not line.strip():
+                    continue
+                number += 1
+                try:
+                    data = json.loads(line)
+                except ValueError:
+                    yield number, None, 'JSON inválido'
+                    continue
+                if isinstance(data, dict):
+                    yield number, data, None
+                else:
+                    yield number, None, 'Cada línea debe ser un objeto JSON'
+    finally:
+        # Evita que el wrapper cierre el archivo original
+        text.detach()
+
+
+def category_lookup(categories):
+    """Mapa de id (como texto) y nombre (sin mayúsculas) al id de la categoría."""
+    lookup = {}
+    for category in categories:
+        lookup[str(category['id'])] = str(category['id'])
+        lookup.setdefault(str(category['name']).strip().casefold(), str(category['id']))
+    return lookup
+
+
+def validate_row(data, categories, lookup):
+    """Devuelve los datos para la API o lanza ``ValueError`` con los errores de la fila."""
+    raw_category = str(data.get('category') or data.get('categoryId') or '').strip()
+    category = lookup.get(raw_category) or lookup.get(raw_category.casefold())
+    if category is None:
+        raise ValueError(f"Categoría desconocida: {raw_category!r}")
+
+    form = ProductForm(
+        data={
+            'title': data.get('title'),
+            'description': data.get('description'),
+            'price': data.get('price'),
+            'category': category,
+            'image': data.get('image') or '',
+        },
+        categories=categories,
+    )
+    if not form.is_valid():
+        raise ValueError('; '.join(
+            f"{field}: {' '.join(errors)}" for field, errors in form.errors.items()
+        ))
+
+    # Mismo formato que products_add_view
+    return {
+        'title': form.cleaned_data['title'],
+        'description': form.cleaned_data['description'],
+        'price': float(form.cleaned_data['price']),
+        'categoryId': int(form.cleaned_data['category']),
+        'images': [form.cleaned_data['image']],
+    }
+
+
+def _create(payload):
+    try:
+        return (*get_catalog().create_product(payload), None)
+    except requests.exceptions.RequestException as e:
+        return None, None, e
+
+
+class _Checkpoint:
+    """Filas procesadas de la importación y avance de ``rows_done``."""
+
+    def __init__(self, job, max_errors):
+        self.job = job
+        self.max_errors = max_errors
+        self.done = set(job.done_after)
+
+    def is_done(self, number):
+        return number <= self.job.rows_done or number in self.done
+
+    def mark(self, number, error=None):
+        if error is None:
+            self.job.created += 1
+        else:
+            self.job.failed += 1
+            if len(self.job.errors) < self.max_errors:
+                self.job.errors.append({'row': number, 'message': error})
+        self.done.add(number)
+        while self.job.rows_done + 1 in self.done:
+            self.job.rows_done += 1
+            self.done.discard(self.job.rows_done)
+
+    def save(self):
+        self.job.done_after = sorted(self.done)
+        self.job.save()
+
+
+def run_import(fileobj, filename='', fmt=None, progress=None, chunk_size=None, max_workers=None):
+    """
+    Importa los productos de ``fileobj`` (archivo binario) y devuelve el
+    ``ProductImport`` con el resultado. ``progress(job)`` se llama tras cada bloque.
+
+    Lanza ``requests.exceptions.RequestException`` si no se pueden cargar las
+    categorías. Los errores de conexión durante la creación y los archivos que
+    no se pueden leer (codificación o CSV inválidos) detienen la importación y
+    quedan en ``job.message`` (estado ``failed``); cualquier otro error también
+    deja el estado ``failed`` antes de propagarse.
+    """
+    config = get_import_settings()
+    fmt = fmt or detect_format(filename)
+    chunk_size = chunk_size or config['CHUNK_SIZE']
+    max_workers = max_workers or config['MAX_WORKERS']
+
+    job, _ = ProductImport.objects.get_or_create(
+        source=file_digest(fileobj),
+        defaults={'filename': filename},
+    )
+    if job.status == ProductImport.COMPLETED:
+        return job
+
+    categories = get_catalog().list_categories()
+    lookup = category_lookup(categories)
+    checkpoint = _Checkpoint(job, config['MAX_ERRORS'])
+    job.status = ProductImport.RUNNING
+    job.message = ''
+    checkpoint.save()
+
+    def send(chunk):
+        """Crea las filas del bloque; devuelve el error de conexión si lo hubo."""
+        connection_error = None
+        created_products = []
+        try:
+            numbers = [number for number, _ in chunk]
+            results = executor.map(_create, [payload for _, payload in chunk])
+            for number, (product, status_code, error) in zip(numbers, results):
+                if error is not None:
+                    # La fila queda pendiente para reintentarla al continuar
+                    connection_error = connection_error or error
+                elif status_code == 201:
+                    created_products.append(product)
+                    checkpoint.mark(number)
+                else:
+                    checkpoint.mark(number, f'Error de la API. Código de estado: {status_code}')
+        finally:
+            products_saved(created_products)
+            checkpoint.save()
+        return connection_error
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='products-import') as executor:
+        chunk = []
+        connection_error = file_error = None
+        try:
+            for number, data, error in iter_rows(fileobj, fmt):
+                if checkpoint.is_done(number):
+                    continue
+                if error is None:
+                    try:
+                        chunk.append((number, validate_row(data, categories, lookup)))
+                    except ValueError as e:
+                        error = str(e)
+                if error is not None:
+                    checkpoint.mark(number, error)
+
+                if len(chunk) >= chunk_size:
+                    connection_error = send(chunk)
+                    chunk = []
+                    if progress:
+                        progress(job)
+                    if connection_error is not None:
+                        break
+
+            if chunk and connection_error is None:
+                connection_error = send(chunk)
+        except (UnicodeDecodeError, csv.Error) as e:
+            file_error = e
+            # Las filas válidas leídas antes del error se crean igual
+            if chunk:
+                connection_error = send(chunk)
+        except BaseException:
+            job.status = ProductImport.FAILED
+            job.message = 'La importación se interrumpió por un error inesperado'
+            raise
+        finally:
+            # Si algo se interrumpe a mitad de bloque se conserva lo ya procesado
+            checkpoint.save()
+
+    if connection_error is not None:
+        job.status = ProductImport.FAILED
+        job.message = f'Error de conexión con la API: {str(connection_error)}. Vuelva a importar el archivo para continuar'
+    elif file_error is not None:
+        job.status = ProductImport.FAILED
+        job.message = (
+            f'No se pudo leer el archivo (debe ser CSV o JSONL en UTF-8); '
+            f'filas procesadas: {job.rows_done}. {str(file_error)}'
+        )
+    else:
+        job.status = ProductImport.COMPLETED
+    checkpoint.save()
+    if progress:
+        progress(job)
+    return job
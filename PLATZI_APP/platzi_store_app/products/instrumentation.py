@@ -0,0 +1,332 @@
+# products/instrumentation.py
+"""
+Tiempos por petición y métricas de latencia.
+
+``InstrumentationMiddleware`` abre un registro por petición y, al terminar,
+separa el tiempo total en:
+
+- ``upstream``: llamadas a la API de Platzi (se registran en
+  ``api_client.LatencyStatsMixin._record``, así que cubren todas las vistas,
+  síncronas y asíncronas).
+- ``tpl``: renderizado de plantillas (backend ``InstrumentedDjangoTemplates``).
+- ``db``: consultas SQL de la conexión ``default`` (solo vistas síncronas).
+- ``app``: el resto (middlewares, sesión, código de la vista).
+
+El desglose se envía en el encabezado ``Server-Timing`` y se acumula en
+histogramas por vista y por endpoint de la API, que ``metrics_view`` expone
+en formato de texto de Prometheus (con p50/p95/p99 estimados). Tanto el
+encabezado como ``/metrics`` son solo para usuarios staff y las IPs de
+``METRICS_ALLOWED_IPS`` (vacía por defecto).
+
+Cada medición es un ``perf_counter`` y un incremento bajo lock, así que se
+puede dejar activo en producción. Los histogramas son por proceso: con
+varios workers cada uno expone los suyos.
+
+En respuestas en streaming solo se cuenta lo hecho antes de enviar los
+encabezados.
+"""
+import bisect
+import contextvars
+import re
+import threading
+import time
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db import connection
+from django.template.backends.django import DjangoTemplates, Template
+
+from . import ratelimit
+
+DEFAULT_INSTRUMENTATION_SETTINGS = {
+    'ENABLED': True,
+    'SERVER_TIMING': True,
+    # Límites superiores de los buckets, en segundos
+    'BUCKETS': (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+    'QUANTILES': (0.5, 0.95, 0.99),
+    # Quién puede leer /metrics y recibir Server-Timing además de los usuarios staff
+    'METRICS_ALLOWED_IPS': [],
+}
+
+PHASES = ('upstream', 'tpl', 'db')
+
+
+def get_instrumentation_settings():
+    config = dict(DEFAULT_INSTRUMENTATION_SETTINGS)
+    config.update(getattr(settings, 'PLATZI_INSTRUMENTATION', {}))
+    return config
+
+
+def metrics_ip_allowed(request, config=None):
+    """
+    La IP del cliente está en ``METRICS_ALLOWED_IPS``. Se resuelve como en el
+    límite de peticiones (``NUM_PROXIES``), no con ``REMOTE_ADDR``: detrás de
+    un proxy en el mismo host sería siempre la del proxy.
+    """
+    config = config or get_instrumentation_settings()
+    if not config['METRICS_ALLOWED_IPS']:
+        return False
+    num_proxies = ratelimit.get_rate_limit_settings()['NUM_PROXIES']
+    return ratelimit.client_ip(request, num_proxies) in config['METRICS_ALLOWED_IPS']
+
+
+def can_view_metrics(request, config=None):
+    """Usuarios staff o IPs permitidas: pueden leer /metrics y reciben Server-Timing."""
+    if metrics_ip_allowed(request, config):
+        return True
+    user = getattr(request, 'user', None)
+    return bool(user and user.is_staff)
+
+
+async def acan_view_metrics(request, config=None):
+    if metrics_ip_allowed(request, config):
+        return True
+    if not hasattr(request, 'auser'):
+        return False
+    return (await request.auser()).is_staff
+
+
+class Histogram:
+    """Histograma acumulativo con buckets fijos (como los de Prometheus)."""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Estimación por interpolación lineal dentro del bucket, igual que ``histogram_quantile``."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                if index == len(self.buckets):
+                    # Por encima del último límite no hay con qué interpolar
+                    return self.buckets[-1]
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index]
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.buckets[-1]
+
+    def cumulative(self):
+        total = 0
+        for bound, bucket_count in zip(self.buckets + (float('inf'),), self.counts):
+            total += bucket_count
+            yield bound, total
+
+
+class MetricsRegistry:
+    """Histogramas de latencia por vista y por endpoint de la API del proceso actual."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self.views = {}
+        self.upstream = {}
+        # Segundos acumulados de cada fase por vista (desglose de la latencia)
+        self.phases = {}
+
+    def _histogram(self, table, labels):
+        histogram = table.get(labels)
+        if histogram is None:
+            histogram = table[labels] = Histogram(self.buckets)
+        return histogram
+
+    def observe_view(self, view, method, status, seconds, phases):
+        with self._lock:
+            self._histogram(self.views, (view, method, str(status))).observe(seconds)
+            for phase, phase_seconds in phases.items():
+                key = (view, phase)
+                self.phases[key] = self.phases.get(key, 0.0) + phase_seconds
+
+    def observe_upstream(self, method, endpoint, seconds, failed):
+        with self._lock:
+            self._histogram(self.upstream, (method, endpoint, 'error' if failed else 'ok')).observe(seconds)
+
+    def reset(self):
+        with self._lock:
+            self.views.clear()
+            self.upstream.clear()
+            self.phases.clear()
+
+    def render(self, quantiles):
+        """Texto en formato de exposición de Prometheus (versión 0.0.4)."""
+        lines = []
+        with self._lock:
+            _render_histograms(
+                lines, 'platzi_http_request_duration_seconds',
+                'Duración de las peticiones por vista.',
+                ('view', 'method', 'status'), self.views, quantiles,
+            )
+            _render_histograms(
+                lines, 'platzi_upstream_request_duration_seconds',
+                'Duración de las llamadas a la API de Platzi por endpoint.',
+                ('method', 'endpoint', 'outcome'), self.upstream, quantiles,
+            )
+            lines.append('# HELP platzi_http_request_phase_seconds_total Tiempo acumulado por fase (upstream, tpl, db, app) y vista.')
+            lines.append('# TYPE platzi_http_request_phase_seconds_total counter')
+            for (view, phase), seconds in sorted(self.phases.items()):
+                lines.append(f"platzi_http_request_phase_seconds_total{_labels(('view', 'phase'), (view, phase))} {seconds:.6f}")
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names, values, **extra):
+    pairs = [*zip(names, values), *extra.items()]
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _render_histograms(lines, name, help_text, label_names, table, quantiles):
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} histogram')
+    for values, histogram in sorted(table.items()):
+        for bound, total in histogram.cumulative():
+            le = '+Inf' if bound == float('inf') else repr(float(bound))
+            lines.append(f"{name}_bucket{_labels(label_names, values, le=le)} {total}")
+        lines.append(f"{name}_sum{_labels(label_names, values)} {histogram.sum:.6f}")
+        lines.append(f"{name}_count{_labels(label_names, values)} {histogram.count}")
+
+    # Percentiles ya calculados, para quien no use histogram_quantile()
+    lines.append(f'# HELP {name}_quantile Percentiles estimados a partir de los buckets de {name}.')
+    lines.append(f'# TYPE {name}_quantile gauge')
+    for values, histogram in sorted(table.items()):
+        for q in quantiles:
+            lines.append(f"{name}_quantile{_labels(label_names, values, quantile=q)} {histogram.quantile(q):.6f}")
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = MetricsRegistry(get_instrumentation_settings()['BUCKETS'])
+    return _registry
+
+
+# Tiempos de la petición actual: los inicializa InstrumentationMiddleware
+_request_timings = contextvars.ContextVar('platzi_request_timings', default=None)
+
+
+class RequestTimings:
+    __slots__ = ('started', 'seconds', 'counts')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.seconds = dict.fromkeys(PHASES, 0.0)
+        self.counts = dict.fromkeys(PHASES, 0)
+
+    def add(self, phase, seconds):
+        self.seconds[phase] += seconds
+        self.counts[phase] += 1
+
+    def breakdown(self, total):
+        phases = dict(self.seconds)
+        phases['app'] = max(total - sum(phases.values()), 0.0)
+        return phases
+
+    def server_timing(self, total):
+        entries = []
+        for phase, seconds in self.breakdown(total).items():
+            entry = f'{phase};dur={seconds * 1000:.1f}'
+            if phase in self.counts:
+                entry += f';desc="{self.counts[phase]}"'
+            entries.append(entry)
+        entries.append(f'total;dur={total * 1000:.1f}')
+        return ', '.join(entries)
+
+
+def start_request():
+    timings = RequestTimings()
+    return timings, _request_timings.set(timings)
+
+
+def finish_request(token):
+    _request_timings.reset(token)
+
+
+def add_timing(phase, seconds):
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.add(phase, seconds)
+
+
+_NUMERIC_SEGMENT = re.compile(r'/\d+(?=/|$)')
+
+
+def endpoint_label(url):
+    """``https://host/api/v1/products/42`` -> ``host/api/v1/products/{id}`` (acota las series)."""
+    parts = urlsplit(str(url))
+    return parts.netloc + _NUMERIC_SEGMENT.sub('/{id}', parts.path)
+
+
+def record_upstream(method, url, seconds, failed):
+    """Lo llama el cliente de la API después de cada llamada (sync o async)."""
+    add_timing('upstream', seconds)
+    if get_instrumentation_settings()['ENABLED']:
+        get_registry().observe_upstream(method, endpoint_label(url), seconds, failed)
+
+
+def record_request(request, response, timings):
+    total = time.perf_counter() - timings.started
+    match = getattr(request, 'resolver_match', None)
+    view = match.view_name if match else '<sin ruta>'
+    get_registry().observe_view(view, request.method, response.status_code, total, timings.breakdown(total))
+    return total
+
+
+def _db_wrapper(execute, sql, params, many, context):
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        add_timing('db', time.perf_counter() - start)
+
+
+def db_timing():
+    """Mide las consultas de la conexión ``default`` del hilo actual."""
+    return connection.execute_wrapper(_db_wrapper)
+
+
+# Plantillas renderizándose en el contexto actual: un tag o un filtro puede
+# renderizar otra plantilla (render_to_string) y solo se cuenta la de fuera
+# para no sumar dos veces el mismo tiempo
+_template_depth = contextvars.ContextVar('platzi_template_depth', default=0)
+
+
+class InstrumentedTemplate(Template):
+    def render(self, context=None, request=None):
+        outermost = _template_depth.get() == 0
+        token = _template_depth.set(_template_depth.get() + 1)
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            _template_depth.reset(token)
+            if outermost:
+                add_timing('tpl', time.perf_counter() - start)
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """Backend ``DjangoTemplates`` que suma el tiempo de renderizado a la petición actual."""
+
+    def from_string(self, template_code):
+        return InstrumentedTemplate(super().from_string(template_code).template, self)
+
+    def get_template(self, template_name):
+        return InstrumentedTemplate(super().get_template(template_name).template, self)
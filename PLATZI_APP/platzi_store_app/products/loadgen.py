@@ -0,0 +1,197 @@
+# products/loadgen.py
+"""
+Escenarios y generador de carga de ``bench_site``.
+
+Cada escenario es una petición al sitio (listado, detalle, AJAX, login,
+registro...). ``run_scenario`` la repite desde varios hilos, cada uno con su
+propio ``django.test.Client``, y mide la latencia de cada petición. Se
+ejecuta dentro del proceso: no hay servidor HTTP de por medio, así que los
+números miden Django, la base de datos y la API (``products.fake_api``).
+
+Los resultados son diccionarios serializables a JSON; ``compare`` los
+contrasta con una línea base guardada y devuelve las regresiones.
+"""
+import itertools
+import json
+import math
+import threading
+import time
+from collections import Counter
+
+from django.db import close_old_connections
+from django.test import Client
+
+PASSWORD = 'contraseña-de-bench-123'
+SEARCH_TERMS = ('shirt', 'chair', 'watch', 'lamp', 'modern', 'classic')
+
+
+class Scenario:
+    """
+    ``run(client, i)`` hace la petición número ``i`` y devuelve la respuesta.
+    Con ``login=True`` cada hilo inicia sesión con el usuario del bench antes
+    de empezar. Las respuestas con un código fuera de ``expected`` cuentan
+    como errores.
+    """
+
+    def __init__(self, name, run, expected=(200,), login=False):
+        self.name = name
+        self.run = run
+        self.expected = expected
+        self.login = login
+
+
+def build_scenarios(ctx):
+    """
+    ``ctx`` tiene ``username``, ``user`` (para ``force_login``), ``prefix``
+    (nombres de los usuarios creados), ``catalog_size`` y ``categories``.
+    """
+    size = ctx['catalog_size']
+
+    def product_id(i):
+        return i % size + 1
+
+    def update(client, i):
+        pk = product_id(i)
+        return client.post(
+            f'/products/{pk}/update-ajax/',
+            json.dumps({'title': f'Producto {pk}', 'description': 'Actualizado por el bench',
+                        'price': 10 + i % 90, 'category': i % ctx['categories'] + 1,
+                        'image': 'https://placehold.co/600x400'}),
+            content_type='application/json',
+        )
+
+    def delete(client, i):
+        # Se borra desde el final del catálogo para no chocar con los otros escenarios
+        return client.delete(f'/products/{size - i % size}/delete-ajax/')
+
+    def register(client, i):
+        return client.post('/api/register/', {
+            'username': f"{ctx['prefix']}r{i}", 'email': f"{ctx['prefix']}r{i}@bench.local",
+            'password': PASSWORD, 'password2': PASSWORD,
+        }, content_type='application/json')
+
+    def check_username(client, i):
+        # Mitad nombres existentes, mitad libres
+        username = ctx['username'] if i % 2 else f"{ctx['prefix']}libre{i}"
+        return client.get('/api/check-username/', {'username': username})
+
+    # Las páginas de productos se piden con sesión iniciada para medir la vista;
+    # a los anónimos se les sirve la copia de la caché de páginas (products_list_anon)
+    scenarios = [
+        Scenario('products_list', lambda client, i: client.get('/products/', {'page': i % 5 + 1}), login=True),
+        Scenario('products_list_anon', lambda client, i: client.get('/products/', {'page': i % 5 + 1})),
+        Scenario('products_list_title', lambda client, i: client.get(
+            '/products/', {'product_title': SEARCH_TERMS[i % len(SEARCH_TERMS)]}), login=True),
+        Scenario('products_list_category', lambda client, i: client.get(
+            '/products/', {'category_id': i % ctx['categories'] + 1}), login=True),
+        Scenario('products_detail', lambda client, i: client.get(f'/products/{product_id(i)}/'), login=True),
+        Scenario('products_update_ajax', update, login=True),
+        Scenario('products_delete_ajax', delete, login=True),
+        # Cliente nuevo en cada login: con la sesión ya iniciada la vista solo redirige
+        Scenario('login_view', lambda client, i: Client().post(
+            '/login/', {'username': ctx['username'], 'password': PASSWORD}), expected=(302,)),
+        Scenario('login_api', lambda client, i: client.post(
+            '/api/login/', {'username': ctx['username'], 'password': PASSWORD},
+            content_type='application/json')),
+        Scenario('register_api', register, expected=(201,)),
+        Scenario('check_username_api', check_username),
+    ]
+    return {scenario.name: scenario for scenario in scenarios}
+
+
+def percentile(sorted_values, q):
+    """Percentil por rango más cercano sobre una lista ya ordenada."""
+    if not sorted_values:
+        return 0.0
+    index = min(max(math.ceil(q * len(sorted_values)) - 1, 0), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def run_scenario(scenario, ctx, total, concurrency, warmup=0):
+    """Ejecuta ``total`` peticiones del escenario con ``concurrency`` hilos y devuelve las métricas."""
+    # Calentamiento (cachés, índice de búsqueda, conexiones) sin medir; usa
+    # índices propios para no repetir usuarios ni productos borrados
+    client = Client()
+    if scenario.login:
+        client.force_login(ctx['user'])
+    for i in range(total, total + warmup):
+        scenario.run(client, i)
+
+    counter = itertools.count()
+    lock = threading.Lock()
+    latencies = []
+    statuses = Counter()
+    errors = []
+
+    def worker():
+        client = Client()
+        if scenario.login:
+            client.force_login(ctx['user'])
+        local_latencies = []
+        local_statuses = Counter()
+        try:
+            while (i := next(counter)) < total:
+                start = time.perf_counter()
+                try:
+                    response = scenario.run(client, i)
+                    if response.streaming:
+                        # El listado en streaming genera el HTML mientras se lee
+                        for _ in response.streaming_content:
+                            pass
+                    status = response.status_code
+                except Exception as e:
+                    status = 'exception'
+                    if len(errors) < 5:
+                        errors.append(f'{type(e).__name__}: {e}')
+                local_latencies.append(time.perf_counter() - start)
+                local_statuses[status] += 1
+        finally:
+            close_old_connections()
+            with lock:
+                latencies.extend(local_latencies)
+                statuses.update(local_statuses)
+
+    threads = [threading.Thread(target=worker, name=f'bench-{scenario.name}-{n}') for n in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    failed = sum(count for status, count in statuses.items() if status not in scenario.expected)
+    return {
+        'requests': len(latencies),
+        'errors': failed,
+        'error_rate': failed / len(latencies) if latencies else 0.0,
+        'rps': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p95_ms': percentile(latencies, 0.95) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'max_ms': (latencies[-1] if latencies else 0.0) * 1000,
+        'status_codes': {str(status): count for status, count in sorted(statuses.items(), key=str)},
+        'sample_errors': errors,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """
+    Regresiones respecto a la línea base: p95 más de ``tolerance`` por encima,
+    peticiones por segundo más de ``tolerance`` por debajo o más errores.
+    Devuelve una lista de textos (vacía si no hay regresiones).
+    """
+    regressions = []
+    for name, current in results['scenarios'].items():
+        base = baseline.get('scenarios', {}).get(name)
+        if base is None:
+            continue
+        if current['p95_ms'] > base['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {current['p95_ms']:.1f} ms (línea base {base['p95_ms']:.1f} ms)")
+        if current['rps'] < base['rps'] * (1 - tolerance):
+            regressions.append(f"{name}: {current['rps']:.1f} pet/s (línea base {base['rps']:.1f} pet/s)")
+        if current['error_rate'] > base['error_rate'] + 0.01:
+            regressions.append(
+                f"{name}: {current['error_rate']:.1%} de errores (línea base {base['error_rate']:.1%})"
+            )
+    return regressions
@@ -0,0 +1,194 @@
+import json
+import os
+import platform
+import sys
+import tempfile
+import uuid
+from unittest import mock
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import override_settings
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+from django.utils import timezone
+from rest_framework.throttling import SimpleRateThrottle
+
+from products import api_client, loadgen
+from products.fake_api import FakePlatziAPI
+
+BACKENDS = {
+    'remote': 'products.catalog.RemoteCatalog',
+    'mirror': 'products.catalog.MirrorCatalog',
+    'memory': 'products.catalog.InMemoryCatalog',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark del sitio contra una imitación local de la API de Platzi '
+        '(products/fake_api.py) con latencia y errores configurables. Mide '
+        'peticiones por segundo y percentiles de latencia de cada escenario, '
+        'puede guardar los resultados en JSON y compararlos con una línea base. '
+        'Usa una base de datos de prueba temporal, como los tests.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'scenarios',
+            nargs='*',
+            help='Escenarios a medir (por defecto todos). Usa --list para verlos.',
+        )
+        parser.add_argument('--list', action='store_true', help='Muestra los escenarios disponibles.')
+        parser.add_argument('--requests', type=int, default=200, help='Peticiones por escenario (por defecto 200).')
+        parser.add_argument('--concurrency', type=int, default=4, help='Hilos por escenario (por defecto 4).')
+        parser.add_argument('--warmup', type=int, default=10, help='Peticiones de calentamiento sin medir (por defecto 10).')
+        parser.add_argument('--catalog-size', type=int, default=200, help='Productos de la API falsa (por defecto 200).')
+        parser.add_argument('--categories', type=int, default=5, help='Categorías de la API falsa (por defecto 5).')
+        parser.add_argument('--latency', type=float, default=0.05, help='Latencia de la API falsa en segundos (por defecto 0.05).')
+        parser.add_argument('--jitter', type=float, default=0.0, help='Variación aleatoria de la latencia, ± segundos.')
+        parser.add_argument('--error-rate', type=float, default=0.0, help='Fracción de respuestas 503 de la API falsa (0 a 1).')
+        parser.add_argument('--seed', type=int, default=0, help='Semilla del catálogo, la latencia y los errores.')
+        parser.add_argument(
+            '--backend',
+            choices=sorted(BACKENDS),
+            default='mirror',
+            help='Backend del catálogo: la API falsa (remote), réplica con la API falsa de respaldo '
+                 '(mirror, por defecto) o catálogo en memoria sin red (memory).',
+        )
+        parser.add_argument('--json', metavar='RUTA', help="Guarda los resultados en JSON ('-' para la salida estándar).")
+        parser.add_argument('--baseline', metavar='RUTA', help='Compara con una línea base y falla si hay regresiones.')
+        parser.add_argument('--save-baseline', metavar='RUTA', help='Guarda los resultados como nueva línea base.')
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=0.2,
+            help='Margen antes de considerar regresión (por defecto 0.2 = 20%%).',
+        )
+
+    def handle(self, *args, **options):
+        names = list(loadgen.build_scenarios({'catalog_size': 1, 'categories': 1}))
+        if options['list']:
+            self.stdout.write('\n'.join(names))
+            return
+        selected = options['scenarios'] or names
+        unknown = sorted(set(selected) - set(names))
+        if unknown:
+            raise CommandError(f"Escenarios desconocidos: {', '.join(unknown)}")
+
+        total = max(options['requests'], 1)
+        concurrency = max(options['concurrency'], 1)
+        results = {
+            'meta': {
+                'created_at': timezone.now().isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'requests': total,
+                'concurrency': concurrency,
+                'warmup': options['warmup'],
+                'catalog_size': options['catalog_size'],
+                'categories': options['categories'],
+                'latency': options['latency'],
+                'jitter': options['jitter'],
+                'error_rate': options['error_rate'],
+                'seed': options['seed'],
+                'backend': options['backend'],
+            },
+            'scenarios': {},
+        }
+
+        setup_test_environment()
+        tmpdir = tempfile.TemporaryDirectory(prefix='bench-site-')
+        for alias in connections:
+            if connections[alias].vendor == 'sqlite':
+                # La base en memoria compartida bloquea tablas enteras con escrituras
+                # concurrentes; un archivo temporal se comporta como en producción
+                connections[alias].settings_dict['TEST']['NAME'] = os.path.join(tmpdir.name, f'{alias}.sqlite3')
+        old_config = setup_databases(verbosity=0, interactive=False)
+        api = FakePlatziAPI(
+            catalog_size=options['catalog_size'],
+            categories=options['categories'],
+            latency=options['latency'],
+            jitter=options['jitter'],
+            error_rate=options['error_rate'],
+            seed=options['seed'],
+        )
+        backend = {'BACKEND': BACKENDS[options['backend']], 'OPTIONS': {}}
+        if options['backend'] == 'memory':
+            backend['OPTIONS'] = {
+                'CATALOG_SIZE': options['catalog_size'],
+                'CATEGORIES': options['categories'],
+                'SEED': options['seed'],
+            }
+        try:
+            with (
+                api,
+                override_settings(
+                    PLATZI_API_BASE_URL=api.base_url,
+                    PLATZI_CATALOG_BACKEND=backend,
+                    DEBUG=False,
+                    # Sin límites de peticiones ni cupo de salida: el bench hace en
+                    # segundos lo que un cliente en horas
+                    PLATZI_RATE_LIMIT=dict(settings.PLATZI_RATE_LIMIT, ENABLED=False),
+                    PLATZI_API_CLIENT=dict(settings.PLATZI_API_CLIENT, OUTBOUND_RATE=None),
+                ),
+                mock.patch.dict(SimpleRateThrottle.THROTTLE_RATES, dict.fromkeys(SimpleRateThrottle.THROTTLE_RATES)),
+            ):
+                api_client.reset_client()
+                prefix = f'bench{uuid.uuid4().hex[:8]}'
+                user = User.objects.create_user(f'{prefix}user', f'{prefix}@bench.local', loadgen.PASSWORD)
+                ctx = {
+                    'user': user,
+                    'username': user.username,
+                    'prefix': prefix,
+                    'catalog_size': options['catalog_size'],
+                    'categories': options['categories'],
+                }
+                scenarios = loadgen.build_scenarios(ctx)
+
+                self.stdout.write(
+                    f"{'escenario':<24} {'pet/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errores':>8}"
+                )
+                for name in selected:
+                    result = loadgen.run_scenario(scenarios[name], ctx, total, concurrency, options['warmup'])
+                    results['scenarios'][name] = result
+                    self.stdout.write(
+                        f"{name:<24} {result['rps']:>9.1f} {result['p50_ms']:>9.1f} {result['p95_ms']:>9.1f} "
+                        f"{result['p99_ms']:>9.1f} {result['errors']:>8}"
+                    )
+                    for error in result['sample_errors']:
+                        self.stderr.write(f'  {name}: {error}')
+                results['meta']['upstream_requests'] = api.requests
+                results['meta']['upstream_errors'] = api.errors
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+            tmpdir.cleanup()
+
+        if options['json']:
+            self._write_json(options['json'], results)
+        if options['save_baseline']:
+            self._write_json(options['save_baseline'], results)
+            self.stdout.write(f"Línea base guardada en {options['save_baseline']}")
+        if options['baseline']:
+            try:
+                with open(options['baseline'], encoding='utf-8') as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f'No se pudo leer la línea base: {e}')
+            regressions = loadgen.compare(results, baseline, options['tolerance'])
+            if regressions:
+                for regression in regressions:
+                    self.stderr.write(f'Regresión: {regression}')
+                raise CommandError(f'{len(regressions)} regresiones respecto a {options["baseline"]}')
+            self.stdout.write(self.style.SUCCESS(f"Sin regresiones respecto a {options['baseline']}"))
+
+    def _write_json(self, path, results):
+        data = json.dumps(results, indent=2, ensure_ascii=False)
+        if path == '-':
+            sys.stdout.write(data + '\n')
+            return
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(data + '\n')
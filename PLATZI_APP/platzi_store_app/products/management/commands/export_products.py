@@ -0,0 +1,77 @@
+import sys
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+from products.exporter import COLUMNS, FORMATS, export_catalog, parse_columns
+
+
+class Command(BaseCommand):
+    help = (
+        'Exporta el catálogo completo en CSV o NDJSON, página por página, '
+        'a un archivo o a la salida estándar.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format',
+            choices=[*FORMATS, 'jsonl'],
+            default='csv',
+            help='Formato de salida (por defecto csv).',
+        )
+        parser.add_argument(
+            '--columns',
+            default=None,
+            help=f"Columnas separadas por comas. Disponibles: {', '.join(COLUMNS)}.",
+        )
+        parser.add_argument(
+            '--gzip',
+            action='store_true',
+            help='Comprime la salida con gzip.',
+        )
+        parser.add_argument(
+            '--category-id',
+            type=int,
+            default=None,
+            help='Exporta solo los productos de esta categoría.',
+        )
+        parser.add_argument(
+            '--page-size',
+            type=int,
+            default=None,
+            help='Productos por página pedidos a la API (por defecto PAGE_SIZE).',
+        )
+        parser.add_argument(
+            '-o', '--output',
+            default='-',
+            help='Archivo de salida (por defecto la salida estándar).',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            columns = parse_columns(options['columns'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        chunks = export_catalog(
+            options['format'],
+            columns,
+            compress=options['gzip'],
+            category_id=options['category_id'],
+            page_size=options['page_size'],
+        )
+        if options['output'] == '-':
+            output = sys.stdout.buffer if options['gzip'] else sys.stdout
+        elif options['gzip']:
+            output = open(options['output'], 'wb')
+        else:
+            output = open(options['output'], 'w', encoding='utf-8', newline='')
+
+        try:
+            for chunk in chunks:
+                output.write(chunk)
+        except requests.exceptions.RequestException as e:
+            raise CommandError(f'Error de conexión con la API: {str(e)}')
+        finally:
+            if options['output'] != '-':
+                output.close()
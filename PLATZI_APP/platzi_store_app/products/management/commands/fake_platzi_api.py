@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from products.fake_api import FakePlatziAPI
+
+
+class Command(BaseCommand):
+    help = (
+        'Levanta la imitación local de la API de Platzi (products/fake_api.py) '
+        'para probar el sitio o medirlo con otras herramientas sin depender de '
+        'la API real. Apunta PLATZI_API_BASE_URL a la URL que muestra.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1', help='Interfaz donde escuchar (por defecto 127.0.0.1).')
+        parser.add_argument('--port', type=int, default=8100, help='Puerto (por defecto 8100).')
+        parser.add_argument('--catalog-size', type=int, default=200, help='Productos del catálogo (por defecto 200).')
+        parser.add_argument('--categories', type=int, default=5, help='Categorías (por defecto 5).')
+        parser.add_argument('--latency', type=float, default=0.0, help='Latencia agregada en segundos.')
+        parser.add_argument('--jitter', type=float, default=0.0, help='Variación aleatoria de la latencia, ± segundos.')
+        parser.add_argument('--error-rate', type=float, default=0.0, help='Fracción de respuestas 503 (0 a 1).')
+        parser.add_argument('--seed', type=int, default=0, help='Semilla del catálogo, la latencia y los errores.')
+
+    def handle(self, *args, **options):
+        api = FakePlatziAPI(
+            catalog_size=options['catalog_size'],
+            categories=options['categories'],
+            latency=options['latency'],
+            jitter=options['jitter'],
+            error_rate=options['error_rate'],
+            host=options['host'],
+            port=options['port'],
+            seed=options['seed'],
+        )
+        with api:
+            self.stdout.write(f'API falsa escuchando en {api.base_url} (Ctrl+C para salir)')
+            try:
+                while True:
+                    time.sleep(1)
+            except KeyboardInterrupt:
+                self.stdout.write(f'{api.requests} peticiones atendidas, {api.errors} errores inyectados')
@@ -0,0 +1,77 @@
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+from products.importer import detect_format, file_digest, run_import
+from products.models import ProductImport
+
+
+class Command(BaseCommand):
+    help = (
+        'Importa productos a la API de Platzi desde un archivo CSV o JSONL. '
+        'Si se interrumpe, volver a ejecutarlo con el mismo archivo continúa '
+        'desde el último punto de control.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Ruta del archivo .csv o .jsonl.')
+        parser.add_argument(
+            '--format',
+            choices=['csv', 'jsonl'],
+            default=None,
+            help='Formato del archivo (por defecto según la extensión).',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Peticiones simultáneas a la API (por defecto MAX_WORKERS).',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=None,
+            help='Filas por bloque entre puntos de control (por defecto CHUNK_SIZE).',
+        )
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Descarta el progreso guardado y empieza desde la primera fila.',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        try:
+            fmt = options['format'] or detect_format(path)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        def progress(job):
+            self.stdout.write(
+                f"Filas procesadas: {job.rows_done} "
+                f"(creados: {job.created}, con error: {job.failed})"
+            )
+
+        try:
+            with open(path, 'rb') as fileobj:
+                if options['restart']:
+                    ProductImport.objects.filter(source=file_digest(fileobj)).delete()
+                job = run_import(
+                    fileobj,
+                    filename=path,
+                    fmt=fmt,
+                    progress=progress if options['verbosity'] > 0 else None,
+                    chunk_size=options['chunk_size'],
+                    max_workers=options['workers'],
+                )
+        except OSError as e:
+            raise CommandError(f'No se pudo leer el archivo: {str(e)}')
+        except requests.exceptions.RequestException as e:
+            raise CommandError(f'Error al cargar categorías: {str(e)}')
+
+        for error in job.errors:
+            self.stderr.write(f"Fila {error['row']}: {error['message']}")
+        if job.status == ProductImport.FAILED:
+            raise CommandError(f'{job.message}.')
+        self.stdout.write(self.style.SUCCESS(
+            f"Importación completada: {job.created} productos creados, {job.failed} filas con error."
+        ))
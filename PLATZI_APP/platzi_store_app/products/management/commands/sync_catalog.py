@@ -0,0 +1,64 @@
+import time
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+from products.mirror import get_mirror_settings, sync_catalog
+
+
+class Command(BaseCommand):
+    help = (
+        'Sincroniza la réplica local del catálogo con la API de Platzi. '
+        'Con --every se queda corriendo como tarea de fondo.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--page-size',
+            type=int,
+            default=None,
+            help='Productos por página pedidos a la API (limit).',
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Reescribe todos los productos aunque no hayan cambiado (implica --complete).',
+        )
+        parser.add_argument(
+            '--complete',
+            action='store_true',
+            help='Recorre todo el catálogo (cambios y bajas) aunque no haya pasado FULL_SYNC_INTERVAL.',
+        )
+        parser.add_argument(
+            '--every',
+            type=int,
+            nargs='?',
+            const=get_mirror_settings()['SYNC_INTERVAL'],
+            default=None,
+            help='Repite la sincronización cada N segundos (por defecto SYNC_INTERVAL).',
+        )
+
+    def handle(self, *args, **options):
+        log = self.stdout.write if options['verbosity'] > 1 else None
+
+        while True:
+            try:
+                state = sync_catalog(
+                    page_size=options['page_size'],
+                    full=options['full'],
+                    complete=options['complete'] or None,
+                    log=log,
+                )
+                self.stdout.write(self.style.SUCCESS(
+                    f"Catálogo sincronizado: {state.products_seen} productos, "
+                    f"{state.products_changed} actualizados, {state.products_deleted} eliminados, "
+                    f"{state.categories_deleted} categorías eliminadas."
+                ))
+            except requests.exceptions.RequestException as e:
+                if options['every'] is None:
+                    raise CommandError(f'Error de conexión con la API: {str(e)}')
+                self.stderr.write(f'Error de conexión con la API: {str(e)}')
+
+            if options['every'] is None:
+                break
+            time.sleep(options['every'])
@@ -0,0 +1,155 @@
+# products/middleware.py
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.http import HttpResponse, JsonResponse
+
+from . import instrumentation, ratelimit
+from .circuit_breaker import start_request
+
+
+class UpstreamStatusMiddleware:
+    """
+    Inicializa el estado de la API para cada petición, de modo que las vistas
+    puedan avisar cuando se muestran datos guardados porque la API no responde.
+    Funciona tanto en WSGI como en ASGI.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        start_request()
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        start_request()
+        return await self.get_response(request)
+
+
+class InstrumentationMiddleware:
+    """
+    Mide cada petición (API, plantillas, base de datos y resto), agrega el
+    desglose en ``Server-Timing`` y lo acumula en las métricas de
+    ``products.instrumentation``. Va primero en ``MIDDLEWARE`` para que el
+    total incluya al resto de los middlewares (sesión incluida).
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.config = instrumentation.get_instrumentation_settings()
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.config['ENABLED']:
+            return self.get_response(request)
+        timings, token = instrumentation.start_request()
+        try:
+            with instrumentation.db_timing():
+                response = self.get_response(request)
+            total = instrumentation.record_request(request, response, timings)
+            if self.config['SERVER_TIMING'] and instrumentation.can_view_metrics(request, self.config):
+                self._add_server_timing(response, timings, total)
+            return response
+        finally:
+            instrumentation.finish_request(token)
+
+    async def __acall__(self, request):
+        if not self.config['ENABLED']:
+            return await self.get_response(request)
+        # Las consultas de las vistas asíncronas corren en otros hilos: no se mide "db"
+        timings, token = instrumentation.start_request()
+        try:
+            response = await self.get_response(request)
+            total = instrumentation.record_request(request, response, timings)
+            if self.config['SERVER_TIMING'] and await instrumentation.acan_view_metrics(request, self.config):
+                self._add_server_timing(response, timings, total)
+            return response
+        finally:
+            instrumentation.finish_request(token)
+
+    @staticmethod
+    def _add_server_timing(response, timings, total):
+        # Revela tiempos internos: solo para el mismo público que /metrics
+        response['Server-Timing'] = timings.server_timing(total)
+
+
+class RateLimitMiddleware:
+    """
+    Aplica las reglas de ``settings.PLATZI_RATE_LIMIT`` a todas las vistas
+    (HTML y API) con contadores en la caché compartida, de modo que el límite
+    es el mismo sin importar cuántos workers atiendan al cliente. Va después de
+    ``AuthenticationMiddleware`` para contar por usuario cuando hay sesión; los
+    clientes de la API con token también cuentan por usuario. Responde 429 con
+    ``Retry-After`` al superar un límite.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.config = ratelimit.get_rate_limit_settings()
+        self.rules = ratelimit.build_rules(self.config)
+        self.limiter = ratelimit.SlidingWindowLimiter(self.config['CACHE'], self.config['KEY_PREFIX'])
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def _matching_rules(self, request):
+        if not self.config['ENABLED'] or request.path_info.startswith(tuple(self.config['EXEMPT_PATHS'])):
+            return []
+        return [rule for rule in self.rules if rule.matches(request)]
+
+    @staticmethod
+    def _needs_user(rules):
+        return any(rule.key != 'ip' for rule in rules)
+
+    def _ident(self, rule, user, request):
+        if rule.key != 'ip' and user.is_authenticated:
+            return f"{rule.name}:user:{user.pk}"
+        return f"{rule.name}:ip:{ratelimit.client_ip(request, self.config['NUM_PROXIES'])}"
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        rules = self._matching_rules(request)
+        user = request.user
+        if self._needs_user(rules) and not user.is_authenticated:
+            user = ratelimit.authorization_user(request) or user
+        for rule in rules:
+            allowed, _, retry_after = self.limiter.hit(self._ident(rule, user, request), rule.limit, rule.period)
+            if not allowed:
+                return self._too_many_requests(request, retry_after)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        rules = self._matching_rules(request)
+        if rules:
+            user = await request.auser()
+            if self._needs_user(rules) and not user.is_authenticated and 'HTTP_AUTHORIZATION' in request.META:
+                user = await sync_to_async(ratelimit.authorization_user)(request) or user
+            for rule in rules:
+                allowed, _, retry_after = await self.limiter.ahit(
+                    self._ident(rule, user, request), rule.limit, rule.period
+                )
+                if not allowed:
+                    return self._too_many_requests(request, retry_after)
+        return await self.get_response(request)
+
+    def _too_many_requests(self, request, retry_after):
+        message = f'Demasiadas peticiones. Intenta de nuevo en {retry_after} segundos.'
+        if 'text/html' not in request.headers.get('Accept', ''):
+            # API y fetch() de las plantillas; mismo formato que los throttles de DRF
+            response = JsonResponse({'detail': message}, status=429)
+        else:
+            response = HttpResponse(message, status=429, content_type='text/plain; charset=utf-8')
+        response['Retry-After'] = str(retry_after)
+        return response
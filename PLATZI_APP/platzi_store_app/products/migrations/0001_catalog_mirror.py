@@ -0,0 +1,59 @@
+# Generated by Django 5.2.6 on 2026-10-17 17:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogSyncState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(default='default', max_length=50, unique=True)),
+                ('last_started_at', models.DateTimeField(blank=True, null=True)),
+                ('last_completed_at', models.DateTimeField(blank=True, null=True)),
+                ('products_seen', models.PositiveIntegerField(default=0)),
+                ('products_changed', models.PositiveIntegerField(default=0)),
+                ('products_deleted', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Category',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('name', models.CharField(db_index=True, max_length=255)),
+                ('slug', models.CharField(blank=True, max_length=255)),
+                ('image', models.URLField(blank=True, max_length=500)),
+                ('remote_updated_at', models.DateTimeField(blank=True, null=True)),
+                ('synced_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Product',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(db_index=True, max_length=255)),
+                ('slug', models.CharField(blank=True, max_length=255)),
+                ('description', models.TextField(blank=True)),
+                ('price', models.DecimalField(db_index=True, decimal_places=2, max_digits=10)),
+                ('images', models.JSONField(blank=True, default=list)),
+                ('remote_updated_at', models.DateTimeField(blank=True, null=True)),
+                ('synced_at', models.DateTimeField(auto_now=True)),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='products', to='products.category')),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['category', 'price'], name='product_category_price_idx')],
+            },
+        ),
+    ]
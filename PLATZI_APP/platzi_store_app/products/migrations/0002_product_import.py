@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-17 17:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0001_catalog_mirror'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductImport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=40, unique=True)),
+                ('filename', models.CharField(blank=True, max_length=255)),
+                ('status', models.CharField(choices=[('running', 'En curso'), ('completed', 'Completada'), ('failed', 'Fallida')], default='running', max_length=20)),
+                ('rows_done', models.PositiveIntegerField(default=0)),
+                ('done_after', models.JSONField(blank=True, default=list)),
+                ('created', models.PositiveIntegerField(default=0)),
+                ('failed', models.PositiveIntegerField(default=0)),
+                ('errors', models.JSONField(blank=True, default=list)),
+                ('message', models.TextField(blank=True)),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['-updated_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-17 18:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_product_import'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='catalogsyncstate',
+            name='categories_deleted',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='catalogsyncstate',
+            name='last_full_sync_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
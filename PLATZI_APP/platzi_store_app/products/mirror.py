@@ -0,0 +1,258 @@
+# products/mirror.py
+"""
+Réplica local del catálogo de la API de Platzi.
+
+``sync_catalog()`` recorre la API por páginas (``offset``/``limit``) y guarda
+en la base de datos solo los productos que cambiaron. La API no permite pedir
+solo lo modificado, así que el recorrido completo (que detecta cambios y
+bajas) se hace cada ``FULL_SYNC_INTERVAL``; entre uno y otro solo se piden
+las últimas páginas para traer los productos nuevos. Lo que la app crea,
+modifica o elimina se escribe en la réplica al momento (``products/mutations.py``).
+
+Las vistas consultan la réplica mediante las funciones de este módulo, que
+devuelven diccionarios con la misma forma que las respuestas JSON de la API.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import api_client
+from .models import CatalogSyncState, Category, Product
+
+DEFAULT_MIRROR_SETTINGS = {
+    'ENABLED': True,
+    'PAGE_SIZE': 100,
+    'SYNC_INTERVAL': 300,
+    'FULL_SYNC_INTERVAL': 60 * 60,
+}
+
+
+def get_mirror_settings():
+    config = dict(DEFAULT_MIRROR_SETTINGS)
+    config.update(getattr(settings, 'PLATZI_CATALOG_MIRROR', {}))
+    return config
+
+
+# Consultas
+
+def is_ready():
+    """La réplica se usa solo si está habilitada y se completó al menos una sincronización."""
+    if not get_mirror_settings()['ENABLED']:
+        return False
+    return CatalogSyncState.objects.filter(last_completed_at__isnull=False).exists()
+
+
+def last_completed_at():
+    """Fecha de la última sincronización completa (versión de los datos de la réplica)."""
+    state = CatalogSyncState.objects.filter(last_completed_at__isnull=False).first()
+    return state.last_completed_at if state else None
+
+
+def data_version():
+    """
+    Versión de los datos de la réplica: cambia con cada sincronización y con
+    cada producto que la app crea, modifica o elimina desde cualquier worker.
+    """
+    stats = Product.objects.aggregate(count=Count('id'), updated=Max('synced_at'))
+    return last_completed_at(), stats['count'], stats['updated']
+
+
+def list_categories():
+    return [category.to_api_dict() for category in Category.objects.all()]
+
+
+def list_products(title=None, category_id=None, offset=0, limit=None):
+    """
+    ``title`` filtra por prefijo del título (``istartswith``): a diferencia de
+    ``LIKE '%texto%'``, un ``LIKE 'texto%'`` puede resolverse con un índice si
+    la base de datos lo permite (en PostgreSQL, uno sobre ``UPPER(title)`` con
+    ``varchar_pattern_ops``; el ``db_index`` de ``title`` no alcanza). Para
+    buscar palabras dentro del título o la descripción está ``products/search.py``.
+    """
+    queryset = Product.objects.select_related('category')
+    if title:
+        queryset = queryset.filter(title__istartswith=title)
+    if category_id is not None:
+        queryset = queryset.filter(category_id=category_id)
+    if limit is not None:
+        queryset = queryset[offset:offset + limit]
+    elif offset:
+        queryset = queryset[offset:]
+    return [product.to_api_dict() for product in queryset]
+
+
+def get_product(pk):
+    product = Product.objects.select_related('category').filter(pk=pk).first()
+    return product.to_api_dict() if product else None
+
+
+def iter_products(category_id=None, chunk_size=500):
+    """Recorre todos los productos sin cargarlos a la vez en memoria (exportación)."""
+    queryset = Product.objects.select_related('category')
+    if category_id is not None:
+        queryset = queryset.filter(category_id=category_id)
+    for product in queryset.iterator(chunk_size=chunk_size):
+        yield product.to_api_dict()
+
+
+# Escritura
+
+def _parse_remote_datetime(value):
+    return parse_datetime(value) if value else None
+
+
+def upsert_category(data):
+    category, _ = Category.objects.update_or_create(
+        id=data['id'],
+        defaults={
+            'name': data.get('name', ''),
+            'slug': data.get('slug') or '',
+            'image': data.get('image') or '',
+            'remote_updated_at': _parse_remote_datetime(data.get('updatedAt')),
+        },
+    )
+    return category
+
+
+def _product_fields(data):
+    category = data.get('category') or {}
+    return {
+        'title': data.get('title', ''),
+        'slug': data.get('slug') or '',
+        'description': data.get('description') or '',
+        'price': Decimal(str(data.get('price') or 0)),
+        'category_id': category.get('id') or data.get('categoryId'),
+        'images': data.get('images') or [],
+        'remote_updated_at': _parse_remote_datetime(data.get('updatedAt')),
+    }
+
+
+def upsert_product(data):
+    """Guarda en la réplica un producto devuelto por la API (p. ej. tras crearlo o actualizarlo)."""
+    if data.get('category'):
+        upsert_category(data['category'])
+    fields = _product_fields(data)
+    if fields['category_id'] and not Category.objects.filter(pk=fields['category_id']).exists():
+        fields['category_id'] = None
+    Product.objects.update_or_create(id=data['id'], defaults=fields)
+
+
+def delete_product(pk):
+    Product.objects.filter(pk=pk).delete()
+
+
+# Sincronización
+
+def _fetch_page(offset, limit):
+    response = api_client.get(
+        f"{settings.PLATZI_API_BASE_URL}products/",
+        params={'offset': offset, 'limit': limit},
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+def _needs_complete_walk(state, config):
+    if state.last_full_sync_at is None:
+        return True
+    return timezone.now() - state.last_full_sync_at >= timedelta(seconds=config['FULL_SYNC_INTERVAL'])
+
+
+def sync_catalog(page_size=None, full=False, complete=None, log=None):
+    """
+    Sincroniza la réplica local con la API.
+
+    Solo se escriben los productos nuevos o cuyo ``updatedAt`` cambió, salvo
+    con ``full=True``. ``complete`` indica si se recorre todo el catálogo (por
+    defecto, cuando pasó ``FULL_SYNC_INTERVAL`` desde el último recorrido
+    completo); si no, se empieza una página antes del final conocido y solo se
+    traen los productos agregados al final. Los productos y categorías que ya
+    no existen en la API se eliminan solo al terminar un recorrido completo.
+    Devuelve el ``CatalogSyncState`` actualizado.
+    """
+    config = get_mirror_settings()
+    page_size = page_size or config['PAGE_SIZE']
+    log = log or (lambda message: None)
+
+    state, _ = CatalogSyncState.objects.get_or_create(name='default')
+    state.last_started_at = timezone.now()
+    state.save(update_fields=['last_started_at'])
+    if complete is None:
+        complete = full or _needs_complete_walk(state, config)
+
+    response = api_client.get(f"{settings.PLATZI_API_BASE_URL}categories/")
+    response.raise_for_status()
+    remote_categories = response.json()
+    for category in remote_categories:
+        upsert_category(category)
+    known_categories = set(Category.objects.values_list('id', flat=True))
+
+    known_versions = dict(Product.objects.values_list('id', 'remote_updated_at'))
+    seen_ids = set()
+    changed = 0
+    # La API ordena por id: los productos nuevos aparecen en las últimas páginas
+    offset = 0 if complete else max(len(known_versions) - page_size, 0)
+
+    while True:
+        page = _fetch_page(offset, page_size)
+        to_write = []
+        for data in page:
+            seen_ids.add(data['id'])
+            fields = _product_fields(data)
+            if not full and data['id'] in known_versions and \
+                    known_versions[data['id']] == fields['remote_updated_at'] and \
+                    fields['remote_updated_at'] is not None:
+                continue
+            if fields['category_id'] not in known_categories:
+                category = data.get('category')
+                if category:
+                    upsert_category(category)
+                    known_categories.add(category['id'])
+                else:
+                    fields['category_id'] = None
+            to_write.append(Product(id=data['id'], **fields))
+
+        if to_write:
+            Product.objects.bulk_create(
+                to_write,
+                update_conflicts=True,
+                unique_fields=['id'],
+                update_fields=[
+                    'title', 'slug', 'description', 'price', 'category',
+                    'images', 'remote_updated_at', 'synced_at',
+                ],
+            )
+            changed += len(to_write)
+
+        log(f"offset={offset} recibidos={len(page)} escritos={len(to_write)}")
+        if len(page) < page_size:
+            break
+        offset += page_size
+
+    with transaction.atomic():
+        deleted = categories_deleted = 0
+        # Una respuesta vacía de la API no debe vaciar la réplica
+        if complete and seen_ids:
+            deleted, _ = Product.objects.exclude(id__in=seen_ids).delete()
+        if complete and remote_categories:
+            # Se conservan las que todavía trae embebidas algún producto de la API
+            remote_ids = {category['id'] for category in remote_categories} | {
+                category_id for category_id in Product.objects.values_list('category_id', flat=True).distinct()
+                if category_id is not None
+            }
+            categories_deleted, _ = Category.objects.exclude(id__in=remote_ids).delete()
+        state.last_completed_at = timezone.now()
+        if complete:
+            state.last_full_sync_at = state.last_completed_at
+        state.products_seen = len(seen_ids)
+        state.products_changed = changed
+        state.products_deleted = deleted
+        state.categories_deleted = categories_deleted
+        state.save()
+
+    return state
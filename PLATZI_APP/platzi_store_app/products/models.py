@@ -1,3 +1,118 @@
 from django.db import models
 
-# Create your models here.
+
+class Category(models.Model):
+    """Copia local de una categoría de la API de Platzi (mismo id que en la API)."""
+    id = models.IntegerField(primary_key=True)
+    name = models.CharField(max_length=255, db_index=True)
+    slug = models.CharField(max_length=255, blank=True)
+    image = models.URLField(max_length=500, blank=True)
+    remote_updated_at = models.DateTimeField(null=True, blank=True)
+    synced_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['id']
+
+    def __str__(self):
+        return self.name
+
+    def to_api_dict(self):
+        """Devuelve la categoría con la misma forma que la respuesta JSON de la API."""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'slug': self.slug,
+            'image': self.image,
+        }
+
+
+class Product(models.Model):
+    """Copia local de un producto de la API de Platzi (mismo id que en la API)."""
+    id = models.IntegerField(primary_key=True)
+    title = models.CharField(max_length=255, db_index=True)
+    slug = models.CharField(max_length=255, blank=True)
+    description = models.TextField(blank=True)
+    price = models.DecimalField(max_digits=10, decimal_places=2, db_index=True)
+    category = models.ForeignKey(
+        Category,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name='products',
+    )
+    images = models.JSONField(default=list, blank=True)
+    remote_updated_at = models.DateTimeField(null=True, blank=True)
+    synced_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['category', 'price'], name='product_category_price_idx'),
+        ]
+
+    def __str__(self):
+        return self.title
+
+    def to_api_dict(self):
+        """Devuelve el producto con la misma forma que la respuesta JSON de la API."""
+        return {
+            'id': self.id,
+            'title': self.title,
+            'slug': self.slug,
+            'price': int(self.price) if self.price == int(self.price) else float(self.price),
+            'description': self.description,
+            'category': self.category.to_api_dict() if self.category_id else None,
+            'images': self.images,
+        }
+
+
+class CatalogSyncState(models.Model):
+    """Estado de la sincronización del catálogo local con la API."""
+    name = models.CharField(max_length=50, unique=True, default='default')
+    last_started_at = models.DateTimeField(null=True, blank=True)
+    last_completed_at = models.DateTimeField(null=True, blank=True)
+    last_full_sync_at = models.DateTimeField(null=True, blank=True)
+    categories_deleted = models.PositiveIntegerField(default=0)
+    products_seen = models.PositiveIntegerField(default=0)
+    products_changed = models.PositiveIntegerField(default=0)
+    products_deleted = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"Sync {self.name}: {self.last_completed_at}"
+
+
+class ProductImport(models.Model):
+    """
+    Progreso de una importación masiva de productos (products/importer.py).
+
+    ``source`` es la huella SHA-1 del archivo: si se vuelve a importar el mismo
+    archivo se continúa desde el último punto de control sin reenviar filas.
+    """
+    RUNNING = 'running'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (RUNNING, 'En curso'),
+        (COMPLETED, 'Completada'),
+        (FAILED, 'Fallida'),
+    ]
+
+    source = models.CharField(max_length=40, unique=True)
+    filename = models.CharField(max_length=255, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=RUNNING)
+    # Todas las filas hasta ``rows_done`` están procesadas; ``done_after`` son
+    # filas posteriores ya procesadas cuando se interrumpió la importación
+    rows_done = models.PositiveIntegerField(default=0)
+    done_after = models.JSONField(default=list, blank=True)
+    created = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)
+    message = models.TextField(blank=True)
+    started_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-updated_at']
+
+    def __str__(self):
+        return f"Importación {self.filename or self.source}: {self.status}"
@@ -0,0 +1,39 @@
+# products/mutations.py
+"""
+Efectos locales de las mutaciones hechas desde la app sobre la API.
+
+Cada vez que la API confirma una creación, actualización o eliminación se
+actualizan la réplica local, las cachés y el índice de búsqueda en un solo
+lugar, tanto desde las vistas individuales como desde las operaciones en lote.
+Las categorías no se tocan: la app no las modifica y crear o editar un
+producto no cambia la respuesta de ``categories/``.
+"""
+from . import mirror
+from .cache import invalidate_product, set_product
+from .page_cache import invalidate_product_pages
+from .search import index_product, unindex_product
+
+
+def product_saved(product):
+    """Se llama con el producto devuelto por la API tras crearlo o actualizarlo."""
+    mirror.upsert_product(product)
+    set_product(product)
+    invalidate_product_pages(product['id'])
+    index_product(product)
+
+
+def product_deleted(pk):
+    mirror.delete_product(pk)
+    invalidate_product(pk)
+    invalidate_product_pages(pk)
+    unindex_product(pk)
+
+
+def products_saved(products):
+    """Como ``product_saved`` para muchos productos; las invalidaciones globales se hacen una vez."""
+    for product in products:
+        mirror.upsert_product(product)
+        set_product(product)
+        index_product(product)
+    if products:
+        invalidate_product_pages()
@@ -0,0 +1,203 @@
+# products/page_cache.py
+"""
+Caché de páginas renderizadas y de fragmentos de tarjetas de producto.
+
+- Páginas completas: el listado y el detalle se guardan solo para visitantes
+  anónimos. La clave del listado incluye todos los parámetros de la URL
+  (``product_title``, ``category_id``, ``page``, ...) y una versión global que
+  sube con cada mutación; la del detalle se elimina al modificar el producto.
+  Se guardan el contenido y los encabezados de la respuesta de la vista
+  (``Content-Type``, ``Vary``, ...), que se repiten al servirla desde la caché.
+- Fragmentos: el cuerpo de cada tarjeta (imagen, categoría, título y precio)
+  se guarda por id y por una huella del contenido del producto, de modo que un
+  cambio en el producto genera una clave nueva. Los botones que dependen del
+  usuario se siguen renderizando en cada petición.
+"""
+import hashlib
+import json
+from functools import wraps
+from urllib.parse import urlencode
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib import messages
+from django.core.cache import cache as django_cache
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from .circuit_breaker import served_stale
+
+DEFAULT_PAGE_CACHE_SETTINGS = {
+    'ENABLED': True,
+    'KEY_PREFIX': 'platzi:page',
+    'LIST_TIMEOUT': 60,
+    'DETAIL_TIMEOUT': 5 * 60,
+    'CARD_TIMEOUT': 60 * 60,
+}
+
+LIST_VERSION_KEY = 'list-version'
+
+
+def get_page_cache_settings():
+    config = dict(DEFAULT_PAGE_CACHE_SETTINGS)
+    config.update(getattr(settings, 'PLATZI_PAGE_CACHE', {}))
+    return config
+
+
+def _key(*parts):
+    return ':'.join([get_page_cache_settings()['KEY_PREFIX'], *map(str, parts)])
+
+
+def _list_version():
+    return django_cache.get_or_set(_key(LIST_VERSION_KEY), 1, None)
+
+
+async def _alist_version():
+    return await django_cache.aget_or_set(_key(LIST_VERSION_KEY), 1, None)
+
+
+def _list_key(request, version):
+    query = urlencode(sorted(request.GET.items()))
+    return _key('list', version, hashlib.sha1(query.encode()).hexdigest())
+
+
+def list_page_key(request):
+    return _list_key(request, _list_version())
+
+
+async def alist_page_key(request):
+    """Versión asíncrona de ``list_page_key`` (para ``async_views``)."""
+    return _list_key(request, await _alist_version())
+
+
+def detail_page_key(request, pk):
+    return _key('detail', pk)
+
+
+async def adetail_page_key(request, pk):
+    return detail_page_key(request, pk)
+
+
+def _has_pending_messages(request):
+    """Mensajes de una petición anterior (p. ej. tras un redirect) que se mostrarían en la página."""
+    if 'messages' in request.COOKIES:
+        return True
+    session = getattr(request, 'session', None)
+    return session is not None and session.session_key is not None and '_messages' in session
+
+
+def _is_cacheable_response(request, response):
+    if response.status_code != 200 or response.streaming or served_stale():
+        return False
+    storage = getattr(request, '_messages', None)
+    # Al mostrar los mensajes la plantilla los pasa de _queued_messages a
+    # _loaded_messages; se revisan ambas listas. Las páginas con errores
+    # (producto no encontrado, categoría inválida, la API falló) no se guardan
+    # aunque respondan 200. Los mensajes de peticiones anteriores ya se
+    # descartaron en _has_pending_messages.
+    added = [*getattr(storage, '_loaded_messages', []), *getattr(storage, '_queued_messages', [])]
+    return not any(message.level >= messages.ERROR for message in added)
+
+
+def _cached_response(cached):
+    # Las entradas guardadas antes de incluir los encabezados solo tienen content_type
+    headers = cached.get('headers') or {'Content-Type': cached['content_type']}
+    response = HttpResponse(cached['content'], headers=headers)
+    response['X-Page-Cache'] = 'HIT'
+    return response
+
+
+def _cache_entry(response):
+    # Las cookies van aparte (response.cookies) y no se guardan
+    return {'content': response.content, 'headers': dict(response.items())}
+
+
+def cache_anonymous_page(key_func, timeout_setting):
+    """
+    Decorador para vistas GET: sirve desde la caché las páginas de visitantes
+    anónimos y guarda las respuestas correctas durante ``timeout_setting``.
+    Acepta vistas síncronas y asíncronas (``async_views``); para estas
+    ``key_func`` debería ser una corrutina (``alist_page_key``) y si no lo es
+    se llama en un hilo.
+    """
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            return _async_wrapper(view_func, key_func, timeout_setting)
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            config = get_page_cache_settings()
+            if (
+                not config['ENABLED']
+                or request.method != 'GET'
+                or request.user.is_authenticated
+                or _has_pending_messages(request)
+            ):
+                return view_func(request, *args, **kwargs)
+
+            key = key_func(request, *args, **kwargs)
+            cached = django_cache.get(key)
+            if cached is not None:
+                return _cached_response(cached)
+
+            response = view_func(request, *args, **kwargs)
+            if _is_cacheable_response(request, response):
+                django_cache.set(key, _cache_entry(response), config[timeout_setting])
+                response['X-Page-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
+
+
+def _async_wrapper(view_func, key_func, timeout_setting):
+    @wraps(view_func)
+    async def wrapper(request, *args, **kwargs):
+        config = get_page_cache_settings()
+        if not config['ENABLED'] or request.method != 'GET':
+            return await view_func(request, *args, **kwargs)
+        user = await request.auser()
+        # Leer la sesión consulta la base de datos: se hace en un hilo
+        if user.is_authenticated or await sync_to_async(_has_pending_messages)(request):
+            return await view_func(request, *args, **kwargs)
+
+        if iscoroutinefunction(key_func):
+            key = await key_func(request, *args, **kwargs)
+        else:
+            # Puede consultar la caché de forma síncrona: no se bloquea el event loop
+            key = await sync_to_async(key_func)(request, *args, **kwargs)
+        cached = await django_cache.aget(key)
+        if cached is not None:
+            return _cached_response(cached)
+
+        response = await view_func(request, *args, **kwargs)
+        if _is_cacheable_response(request, response):
+            await django_cache.aset(key, _cache_entry(response), config[timeout_setting])
+            response['X-Page-Cache'] = 'MISS'
+        return response
+    return wrapper
+
+
+def invalidate_product_pages(pk=None):
+    """Invalida todas las páginas de listado y, si se indica, el detalle del producto."""
+    try:
+        django_cache.incr(_key(LIST_VERSION_KEY))
+    except ValueError:
+        django_cache.set(_key(LIST_VERSION_KEY), 2, None)
+    if pk is not None:
+        django_cache.delete(_key('detail', pk))
+
+
+def render_product_card_body(product):
+    """Devuelve el HTML del cuerpo de la tarjeta, cacheado por id y huella del producto."""
+    config = get_page_cache_settings()
+    if not config['ENABLED']:
+        return mark_safe(render_to_string('products/_product_card_body.html', {'product': product}))
+
+    digest = hashlib.sha1(json.dumps(product, sort_keys=True, default=str).encode()).hexdigest()
+    key = _key('card', product.get('id'), digest)
+    html = django_cache.get(key)
+    if html is None:
+        html = render_to_string('products/_product_card_body.html', {'product': product})
+        django_cache.set(key, html, config['CARD_TIMEOUT'])
+    return mark_safe(html)
@@ -0,0 +1,246 @@
+# products/ratelimit.py
+"""
+Límites de peticiones compartidos entre workers.
+
+Se usa una ventana deslizante aproximada sobre la caché de Django: cada clave
+cuenta las peticiones de la ventana fija actual y de la anterior, y la
+estimación es ``anterior * (1 - fracción transcurrida) + actual``. Solo hace
+falta ``add``/``incr``/``get``, que son atómicos en Redis y memcached, así que
+el contador es el mismo para todos los workers si la caché es compartida
+(``CACHES`` con ``REDIS_URL``). Las peticiones rechazadas no consumen cupo.
+
+Dos usos:
+
+- ``RateLimitMiddleware`` (``products/middleware.py``) aplica las reglas de
+  ``settings.PLATZI_RATE_LIMIT`` a las vistas HTML y a la API por usuario o IP.
+  Los clientes de la API con token cuentan por usuario (``authorization_user``).
+- ``OutboundBudget`` limita las llamadas del sitio a la API de productos
+  (``OUTBOUND_RATE`` de ``PLATZI_API_CLIENT``), para que una ráfaga de
+  clientes no agote nuestra cuota con el proveedor.
+"""
+import asyncio
+import hashlib
+import math
+import re
+import time
+
+import httpx
+import requests
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import exceptions
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.settings import api_settings
+
+DEFAULT_RATE_LIMIT_SETTINGS = {
+    'ENABLED': True,
+    'CACHE': 'default',
+    'KEY_PREFIX': 'platzi:rl',
+    # Proxies delante de Django (igual que NUM_PROXIES de DRF); 0 usa REMOTE_ADDR
+    'NUM_PROXIES': 0,
+    'EXEMPT_PATHS': ['/static/', '/metrics'],
+    # Se aplican todas las reglas cuyo PATH (regex) y METHODS coinciden.
+    # KEY: 'user_or_ip' (usuario autenticado o IP) o 'ip'.
+    'RULES': [],
+}
+
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 60 * 60 * 24}
+
+
+def get_rate_limit_settings():
+    config = dict(DEFAULT_RATE_LIMIT_SETTINGS)
+    config.update(getattr(settings, 'PLATZI_RATE_LIMIT', {}))
+    return config
+
+
+def parse_rate(rate):
+    """``'100/minute'`` -> ``(100, 60)``; mismo formato que los throttles de DRF."""
+    if rate is None:
+        return None, None
+    num, period = rate.split('/')
+    return int(num), PERIODS[period[0]]
+
+
+class SlidingWindowLimiter:
+    """Contador de ventana deslizante en la caché ``cache_alias``."""
+
+    def __init__(self, cache_alias='default', key_prefix='platzi:rl'):
+        self.cache_alias = cache_alias
+        self.key_prefix = key_prefix
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def _keys(self, key, period, now):
+        # Hash para que la clave sea válida en cualquier backend (p. ej. memcached)
+        digest = hashlib.sha1(key.encode()).hexdigest()
+        window = int(now // period)
+        return (
+            f"{self.key_prefix}:{digest}:{window}",
+            f"{self.key_prefix}:{digest}:{window - 1}",
+            (now % period) / period,
+        )
+
+    @staticmethod
+    def _decide(count, previous, elapsed, limit, period):
+        """Devuelve ``(permitida, restantes, segundos_para_reintentar)``."""
+        estimated = previous * (1 - elapsed) + count
+        if estimated <= limit:
+            return True, int(limit - estimated), 0
+        if count > limit:
+            # Ni sin la ventana anterior cabe: hasta que empiece la siguiente
+            return False, 0, math.ceil((1 - elapsed) * period)
+        # Momento en que el peso de la ventana anterior deja sitio para esta petición
+        needed = 1 - (limit - count) / previous
+        return False, 0, max(math.ceil((needed - elapsed) * period), 1)
+
+    def hit(self, key, limit, period):
+        """Cuenta una petición de ``key``; devuelve ``(permitida, restantes, reintentar_en)``."""
+        current_key, previous_key, elapsed = self._keys(key, period, time.time())
+        cache = self.cache
+        cache.add(current_key, 0, period * 2)
+        try:
+            count = cache.incr(current_key)
+        except ValueError:
+            # La clave expiró entre add e incr
+            cache.set(current_key, 1, period * 2)
+            count = 1
+        result = self._decide(count, cache.get(previous_key, 0), elapsed, limit, period)
+        if not result[0]:
+            cache.decr(current_key)
+        return result
+
+    async def ahit(self, key, limit, period):
+        current_key, previous_key, elapsed = self._keys(key, period, time.time())
+        cache = self.cache
+        await cache.aadd(current_key, 0, period * 2)
+        try:
+            count = await cache.aincr(current_key)
+        except ValueError:
+            await cache.aset(current_key, 1, period * 2)
+            count = 1
+        result = self._decide(count, await cache.aget(previous_key, 0), elapsed, limit, period)
+        if not result[0]:
+            await cache.adecr(current_key)
+        return result
+
+
+class Rule:
+    def __init__(self, name, path, rate, methods=None, key='user_or_ip'):
+        self.name = name
+        self.path = re.compile(path)
+        self.limit, self.period = parse_rate(rate)
+        self.methods = {method.upper() for method in methods} if methods else None
+        self.key = key
+
+    def matches(self, request):
+        if self.methods is not None and request.method not in self.methods:
+            return False
+        return bool(self.path.match(request.path_info))
+
+
+def build_rules(config):
+    return [
+        Rule(
+            rule['NAME'],
+            rule['PATH'],
+            rule['RATE'],
+            methods=rule.get('METHODS'),
+            key=rule.get('KEY', 'user_or_ip'),
+        )
+        for rule in config['RULES']
+    ]
+
+
+def client_ip(request, num_proxies=0):
+    """IP del cliente; con ``num_proxies`` se toma de ``X-Forwarded-For`` como DRF."""
+    xff = request.META.get('HTTP_X_FORWARDED_FOR')
+    remote_addr = request.META.get('REMOTE_ADDR')
+    if num_proxies and xff:
+        addrs = [addr.strip() for addr in xff.split(',')]
+        return addrs[-min(num_proxies, len(addrs))]
+    return remote_addr or ''
+
+
+def authorization_user(request):
+    """
+    Usuario del encabezado ``Authorization`` según las clases de autenticación
+    de DRF, o None. DRF autentica en la vista, después de los middlewares; sin
+    esto los clientes con token se contarían por IP. La sesión no se revisa
+    aquí porque ya la resolvió ``AuthenticationMiddleware``, y un token inválido
+    cuenta por IP (la vista responderá 401).
+    """
+    if 'HTTP_AUTHORIZATION' not in request.META:
+        return None
+    for authentication_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        if issubclass(authentication_class, SessionAuthentication):
+            continue
+        try:
+            result = authentication_class().authenticate(request)
+        except exceptions.APIException:
+            return None
+        if result is not None:
+            return result[0]
+    return None
+
+
+class OutboundBudgetExceeded(requests.exceptions.ConnectionError):
+    """Se agotó el cupo de llamadas a la API; se lanza sin intentar la conexión."""
+
+
+class AsyncOutboundBudgetExceeded(httpx.ConnectError):
+    """Equivalente de ``OutboundBudgetExceeded`` para el cliente asíncrono (httpx)."""
+
+
+class OutboundBudget:
+    """
+    Cupo de llamadas a la API por host, compartido entre workers. Si no hay
+    cupo se espera como mucho ``max_wait`` segundos a que se libere; si aun así
+    no lo hay, ``acquire`` devuelve False.
+    """
+
+    def __init__(self, rate, max_wait=0, cache_alias='default', key_prefix='platzi:budget'):
+        self.limit, self.period = parse_rate(rate)
+        self.max_wait = max_wait
+        self.limiter = SlidingWindowLimiter(cache_alias, key_prefix)
+        self.rejected = 0
+
+    def acquire(self, host):
+        if self.limit is None:
+            return True
+        deadline = time.monotonic() + self.max_wait
+        while True:
+            allowed, _, retry_after = self.limiter.hit(host, self.limit, self.period)
+            if allowed:
+                return True
+            wait = self._wait(deadline, retry_after)
+            if wait is None:
+                self.rejected += 1
+                return False
+            time.sleep(wait)
+
+    async def aacquire(self, host):
+        if self.limit is None:
+            return True
+        deadline = time.monotonic() + self.max_wait
+        while True:
+            allowed, _, retry_after = await self.limiter.ahit(host, self.limit, self.period)
+            if allowed:
+                return True
+            wait = self._wait(deadline, retry_after)
+            if wait is None:
+                self.rejected += 1
+                return False
+            await asyncio.sleep(wait)
+
+    def _wait(self, deadline, retry_after):
+        """Pausa antes de reintentar, o None si ya no da tiempo antes de ``deadline``."""
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        # retry_after se redondea a segundos; con cupos por segundo se reintenta antes
+        return min(retry_after, self.period / max(self.limit, 1), remaining)
+
+    def get_stats(self):
+        return {'limit': self.limit, 'period': self.period, 'rejected': self.rejected}
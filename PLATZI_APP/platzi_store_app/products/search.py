@@ -0,0 +1,262 @@
+# products/search.py
+"""
+Índice de búsqueda en memoria para los productos del catálogo.
+
+Índice invertido (token -> {id: peso}) sobre título y descripción, con
+búsqueda por prefijo usando un vocabulario ordenado. Cada proceso mantiene
+su propio índice: se construye a partir del backend del catálogo
+(``products/catalog.py``), se reconstruye cuando cambian sus datos y se
+actualiza de forma incremental cuando la app crea, modifica o elimina
+productos en ese mismo proceso.
+
+Los cambios hechos en otro worker se ven al reconstruir: con la réplica local
+su versión cambia con cada sincronización y con cada escritura de la app, y se
+comprueba cada ``STATE_CHECK_INTERVAL`` segundos; leyendo de la API no hay
+versión y el índice se reconstruye cada ``REFRESH_INTERVAL``.
+"""
+import bisect
+import math
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter
+
+from django.conf import settings
+
+from .catalog import get_catalog
+
+DEFAULT_SEARCH_SETTINGS = {
+    'TITLE_WEIGHT': 3.0,
+    'DESCRIPTION_WEIGHT': 1.0,
+    'PREFIX_PENALTY': 0.5,      # Multiplicador para coincidencias por prefijo
+    'MIN_PREFIX_LENGTH': 2,
+    'REFRESH_INTERVAL': 300,    # Segundos antes de reconstruir si la fuente es la API
+    'STATE_CHECK_INTERVAL': 30, # Segundos entre comprobaciones de una sincronización nueva
+    'PER_PAGE': 20,
+}
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+def get_search_settings():
+    config = dict(DEFAULT_SEARCH_SETTINGS)
+    config.update(getattr(settings, 'PLATZI_SEARCH', {}))
+    return config
+
+
+def tokenize(text):
+    """Pasa a minúsculas, quita acentos y separa en palabras."""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return TOKEN_RE.findall(text.lower())
+
+
+class SearchResult:
+    def __init__(self, products, total, page, per_page):
+        self.products = products
+        self.total = total
+        self.page = page
+        self.per_page = per_page
+
+    def __iter__(self):
+        return iter(self.products)
+
+    def __len__(self):
+        return len(self.products)
+
+
+class SearchIndex:
+    def __init__(self, config=None):
+        self.config = config or get_search_settings()
+        self._lock = threading.RLock()
+        self._rebuild_lock = threading.Lock()
+        # Cambios hechos durante una reconstrucción (None si no hay ninguna en curso)
+        self._pending = None
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self.documents = {}
+            self._doc_tokens = {}
+            self.postings = {}
+            self.vocabulary = []
+
+    def __len__(self):
+        return len(self.documents)
+
+    def rebuild(self, products):
+        """
+        Reemplaza el contenido por ``products``. El índice nuevo se construye
+        fuera del lock y se intercambia de una vez: las búsquedas no esperan a
+        la reconstrucción ni ven un índice a medio llenar. Los ``add``/``remove``
+        que llegan mientras tanto se aplican al índice actual y se repiten
+        sobre el nuevo antes del intercambio.
+        """
+        with self._rebuild_lock:
+            with self._lock:
+                self._pending = []
+            try:
+                fresh = SearchIndex(self.config)
+                for product in products:
+                    fresh._add(product, keep_sorted=False)
+                # Un solo ordenamiento al final en lugar de insort por token
+                fresh.vocabulary = sorted(fresh.postings)
+                with self._lock:
+                    for operation, arg in self._pending:
+                        if operation == 'add':
+                            fresh._add(arg)
+                        else:
+                            fresh._remove(arg)
+                    self.documents = fresh.documents
+                    self._doc_tokens = fresh._doc_tokens
+                    self.postings = fresh.postings
+                    self.vocabulary = fresh.vocabulary
+            finally:
+                with self._lock:
+                    self._pending = None
+
+    def add(self, product):
+        """Agrega o reemplaza un producto (diccionario con la forma de la API)."""
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append(('add', product))
+            self._add(product)
+
+    def remove(self, pk):
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append(('remove', pk))
+            self._remove(pk)
+
+    def _add(self, product, keep_sorted=True):
+        with self._lock:
+            pk = product['id']
+            if pk in self.documents:
+                self._remove(pk)
+
+            weights = Counter()
+            for token in tokenize(product.get('title')):
+                weights[token] += self.config['TITLE_WEIGHT']
+            for token in tokenize(product.get('description')):
+                weights[token] += self.config['DESCRIPTION_WEIGHT']
+
+            for token, weight in weights.items():
+                posting = self.postings.get(token)
+                if posting is None:
+                    posting = self.postings[token] = {}
+                    if keep_sorted:
+                        bisect.insort(self.vocabulary, token)
+                # Saturación logarítmica para que textos repetitivos no dominen
+                posting[pk] = 1.0 + math.log(weight)
+
+            self.documents[pk] = product
+            self._doc_tokens[pk] = list(weights)
+
+    def _remove(self, pk):
+        with self._lock:
+            self.documents.pop(pk, None)
+            for token in self._doc_tokens.pop(pk, []):
+                posting = self.postings.get(token)
+                if posting is None:
+                    continue
+                posting.pop(pk, None)
+                if not posting:
+                    del self.postings[token]
+                    index = bisect.bisect_left(self.vocabulary, token)
+                    if index < len(self.vocabulary) and self.vocabulary[index] == token:
+                        del self.vocabulary[index]
+
+    def _expand(self, term):
+        """Devuelve (token, multiplicador) para el término exacto y sus extensiones por prefijo."""
+        matches = []
+        if term in self.postings:
+            matches.append((term, 1.0))
+        if len(term) >= self.config['MIN_PREFIX_LENGTH']:
+            start = bisect.bisect_left(self.vocabulary, term)
+            for token in self.vocabulary[start:]:
+                if not token.startswith(term):
+                    break
+                if token != term:
+                    matches.append((token, self.config['PREFIX_PENALTY']))
+        return matches
+
+    def search(self, query, page=1, per_page=None):
+        """
+        Devuelve los productos que contienen todos los términos de ``query``
+        (exactos o por prefijo), ordenados por relevancia.
+        """
+        per_page = per_page or self.config['PER_PAGE']
+        terms = tokenize(query)
+        with self._lock:
+            if not terms:
+                return SearchResult([], 0, page, per_page)
+
+            total_docs = max(len(self.documents), 1)
+            scores = None
+            for term in terms:
+                term_scores = {}
+                for token, multiplier in self._expand(term):
+                    posting = self.postings[token]
+                    idf = math.log(1 + total_docs / len(posting))
+                    for pk, weight in posting.items():
+                        score = weight * idf * multiplier
+                        if score > term_scores.get(pk, 0):
+                            term_scores[pk] = score
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {pk: scores[pk] + score for pk, score in term_scores.items() if pk in scores}
+                if not scores:
+                    return SearchResult([], 0, page, per_page)
+
+            ranked = sorted(scores, key=lambda pk: (-scores[pk], pk))
+            start = (page - 1) * per_page
+            products = [self.documents[pk] for pk in ranked[start:start + per_page]]
+            return SearchResult(products, len(ranked), page, per_page)
+
+
+_index = SearchIndex()
+_index_state = {'source': None, 'version': None, 'built_at': 0.0, 'checked_at': 0.0}
+_build_lock = threading.Lock()
+
+
+def get_index():
+    """
+    Devuelve el índice del proceso, construyéndolo o reconstruyéndolo si la
+    fuente cambió. Lanza ``RequestException`` si hay que leer la API y falla.
+    """
+    config = _index.config
+    now = time.monotonic()
+    if _index_state['source'] is not None and now - _index_state['checked_at'] < config['STATE_CHECK_INTERVAL']:
+        return _index
+
+    with _build_lock:
+        now = time.monotonic()
+        backend = get_catalog()
+        source, version = backend.search_version()
+        if (
+            _index_state['source'] != source
+            or _index_state['version'] != version
+            # Sin versión (la API) se reconstruye cada REFRESH_INTERVAL
+            or (version is None and now - _index_state['built_at'] > config['REFRESH_INTERVAL'])
+        ):
+            _index.rebuild(backend.all_products())
+            _index_state.update(source=source, version=version, built_at=now)
+        _index_state['checked_at'] = now
+    return _index
+
+
+def search_products(query, page=1, per_page=None):
+    return get_index().search(query, page=page, per_page=per_page)
+
+
+def index_product(product):
+    """Actualiza el índice tras crear o modificar un producto desde la app."""
+    if _index_state['source'] is not None:
+        _index.add(product)
+
+
+def unindex_product(pk):
+    """Quita un producto del índice tras eliminarlo desde la app."""
+    _index.remove(pk)
@@ -0,0 +1,164 @@
+# products/singleflight.py
+"""
+Coalescencia de peticiones idénticas (single-flight).
+
+Cuando varias peticiones piden a la vez la misma URL con los mismos
+parámetros, solo una llega a la API; las demás esperan y reciben el mismo
+resultado (o la misma excepción). Opcionalmente se coordina entre workers con
+un lock en la caché de Django: el líder publica la respuesta unos segundos
+para que los workers que esperaban la reutilicen.
+"""
+import asyncio
+import functools
+import hashlib
+import secrets
+import threading
+import time
+from urllib.parse import urlencode
+
+from django.core.cache import cache as django_cache
+
+
+def make_key(method, url, params=None):
+    """Clave estable para una petición: método, URL y parámetros ordenados."""
+    if params:
+        items = params.items() if hasattr(params, 'items') else params
+        url = f"{url}?{urlencode(sorted(items))}"
+    return f"{method} {url}"
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Agrupa llamadas concurrentes con la misma clave dentro del proceso."""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class DistributedSingleFlight(SingleFlight):
+    """
+    Igual que ``SingleFlight`` y además coordina workers mediante la caché.
+
+    El worker que obtiene el lock hace la llamada y guarda el resultado durante
+    ``result_ttl`` segundos; los demás lo esperan hasta ``lock_timeout`` y, si
+    el líder falla sin publicar nada, hacen la llamada ellos mismos.
+
+    El lock guarda un valor único del líder y solo se borra si todavía es el
+    suyo: si la llamada tardó más que ``lock_timeout`` el lock ya venció y
+    puede ser de otro worker. La caché de Django no tiene un borrado
+    condicional atómico, así que entre la lectura y el borrado queda una
+    ventana mínima; en el peor caso otro worker hace una llamada de más.
+    """
+
+    def __init__(self, lock_timeout=10, result_ttl=2, poll_interval=0.05, key_prefix='platzi:singleflight'):
+        super().__init__()
+        self.lock_timeout = lock_timeout
+        self.result_ttl = result_ttl
+        self.poll_interval = poll_interval
+        self.key_prefix = key_prefix
+
+    def do(self, key, fn):
+        return super().do(key, lambda: self._do_distributed(key, fn))
+
+    def _do_distributed(self, key, fn):
+        # Hash para que la clave sea válida en cualquier backend (p. ej. memcached)
+        digest = hashlib.sha1(key.encode()).hexdigest()
+        lock_key = f"{self.key_prefix}:lock:{digest}"
+        result_key = f"{self.key_prefix}:result:{digest}"
+
+        token = secrets.token_hex(8)
+        if django_cache.add(lock_key, token, self.lock_timeout):
+            try:
+                result = fn()
+                if self._is_shareable(result):
+                    django_cache.set(result_key, result, self.result_ttl)
+                return result
+            finally:
+                if django_cache.get(lock_key) == token:
+                    django_cache.delete(lock_key)
+
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            result = django_cache.get(result_key)
+            if result is not None:
+                with self._lock:
+                    self.coalesced += 1
+                return result
+            if django_cache.get(lock_key) is None:
+                # El líder terminó sin publicar un resultado (error): se llama directamente
+                break
+            time.sleep(self.poll_interval)
+        return fn()
+
+    @staticmethod
+    def _is_shareable(result):
+        # Las respuestas de respaldo no se publican: el atributo ``stale`` no
+        # sobrevive al pickle y los demás workers no avisarían al usuario
+        if getattr(result, 'stale', False):
+            return False
+        status_code = getattr(result, 'status_code', None)
+        return status_code is not None and status_code < 500
+
+
+class AsyncSingleFlight:
+    """
+    Versión para corrutinas; las llamadas se agrupan dentro del event loop.
+
+    La llamada corre en su propia tarea y todos (también quien la inició) la
+    esperan con ``asyncio.shield``: si se cancela cualquiera de ellos, la
+    llamada compartida sigue y los demás reciben el resultado.
+    """
+
+    def __init__(self):
+        self._tasks = {}
+        self.coalesced = 0
+
+    async def do(self, key, coro_fn):
+        task = self._tasks.get(key)
+        if task is None:
+            task = self._tasks[key] = asyncio.ensure_future(coro_fn())
+            task.add_done_callback(functools.partial(self._finished, key))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _finished(self, key, task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        if not task.cancelled():
+            # Evita el aviso "exception was never retrieved" si nadie esperaba
+            task.exception()
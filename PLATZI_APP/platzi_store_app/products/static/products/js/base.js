@@ -0,0 +1,216 @@
+// Comportamiento común de todas las páginas (base.html): menú de usuario, alertas y formularios
+
+// Función para mostrar el modal de perfil
+function showProfileModal() {
+    const profileModal = document.getElementById('profileModal');
+    if (profileModal) {
+        new bootstrap.Modal(profileModal).show();
+    }
+}
+
+// Función para confirmar el logout
+function confirmLogout() {
+    return confirm('¿Estás seguro que deseas cerrar sesión?');
+}
+
+// Auto-cerrar alerts después de 5 segundos
+document.addEventListener('DOMContentLoaded', function() {
+    const alerts = document.querySelectorAll('.alert:not(.alert-danger)');
+    alerts.forEach(function(alert) {
+        setTimeout(function() {
+            if (alert) {
+                const bsAlert = new bootstrap.Alert(alert);
+                bsAlert.close();
+            }
+        }, 5000);
+    });
+});
+
+document.addEventListener('DOMContentLoaded', function() {
+    // Referencias a elementos
+    const userAvatar = document.querySelector('.user-avatar');
+    const logoutLinks = document.querySelectorAll('.logout-item');
+    
+    // Función para mostrar el modal de perfil
+    window.showProfileModal = function() {
+        const profileModal = document.getElementById('profileModal');
+        if (profileModal) {
+            const modal = new bootstrap.Modal(profileModal);
+            modal.show();
+        }
+    };
+
+    // Función para confirmar el logout con animación
+    window.confirmLogout = function() {
+        const confirmDialog = confirm('¿Estás seguro que deseas cerrar sesión?');
+        
+        if (confirmDialog) {
+            // Agregar clase de loading al enlace
+            const logoutLink = event.target.closest('.logout-item');
+            if (logoutLink) {
+                logoutLink.classList.add('logout-loading');
+                logoutLink.innerHTML = '<i class="fas fa-sign-out-alt"></i>Cerrando sesión...';
+            }
+            
+            // Mostrar mensaje de loading
+            showNotification('Cerrando sesión...', 'info');
+            
+            return true;
+        }
+        return false;
+    };
+
+    // Función para mostrar notificaciones
+    function showNotification(message, type = 'info') {
+        // Crear elemento de notificación
+        const notification = document.createElement('div');
+        notification.className = `alert alert-${type} alert-dismissible fade show position-fixed`;
+        notification.style.cssText = 'top: 20px; right: 20px; z-index: 9999; min-width: 300px;';
+        notification.innerHTML = `
+            <i class="fas fa-info-circle me-2"></i>${message}
+            <button type="button" class="btn-close" data-bs-dismiss="alert"></button>
+        `;
+        
+        document.body.appendChild(notification);
+        
+        // Auto-remove después de 3 segundos
+        setTimeout(() => {
+            if (notification && notification.parentNode) {
+                notification.remove();
+            }
+        }, 3000);
+    }
+
+    // Animación del avatar cuando se hace hover
+    if (userAvatar) {
+        userAvatar.addEventListener('mouseenter', function() {
+            this.classList.add('pulse');
+        });
+        
+        userAvatar.addEventListener('mouseleave', function() {
+            this.classList.remove('pulse');
+        });
+    }
+
+    // Cerrar dropdown al hacer clic fuera
+    document.addEventListener('click', function(event) {
+        const userDropdown = document.querySelector('.user-dropdown');
+        const userAvatarElement = document.querySelector('.user-avatar');
+        
+        if (userDropdown && userAvatarElement) {
+            if (!userDropdown.contains(event.target) && !userAvatarElement.contains(event.target)) {
+                const dropdown = bootstrap.Dropdown.getInstance(userAvatarElement);
+                if (dropdown) {
+                    dropdown.hide();
+                }
+            }
+        }
+    });
+
+    // Auto-cerrar alerts después de 5 segundos (excepto errores)
+    const alerts = document.querySelectorAll('.alert:not(.alert-danger)');
+    alerts.forEach(function(alert) {
+        setTimeout(function() {
+            if (alert && alert.parentNode) {
+                const bsAlert = bootstrap.Alert.getInstance(alert);
+                if (bsAlert) {
+                    bsAlert.close();
+                } else {
+                    alert.remove();
+                }
+            }
+        }, 5000);
+    });
+
+    // Mejorar la experiencia de los formularios
+    const forms = document.querySelectorAll('form');
+    forms.forEach(function(form) {
+        form.addEventListener('submit', function(event) {
+            const submitBtn = form.querySelector('button[type="submit"]');
+            if (submitBtn && !submitBtn.disabled) {
+                // Agregar estado de loading al botón
+                const originalText = submitBtn.innerHTML;
+                submitBtn.disabled = true;
+                submitBtn.innerHTML = '<span class="spinner-border spinner-border-sm me-2"></span>Procesando...';
+                
+                // Restaurar el botón después de 5 segundos (por si falla el submit)
+                setTimeout(() => {
+                    submitBtn.disabled = false;
+                    submitBtn.innerHTML = originalText;
+                }, 5000);
+            }
+        });
+    });
+
+    // Función para validar campos en tiempo real
+    const inputs = document.querySelectorAll('input[required]');
+    inputs.forEach(function(input) {
+        input.addEventListener('blur', function() {
+            validateField(this);
+        });
+    });
+
+    function validateField(field) {
+        const value = field.value.trim();
+        const fieldGroup = field.closest('.mb-3');
+        let existingFeedback = fieldGroup.querySelector('.invalid-feedback');
+        
+        // Remover feedback existente
+        if (existingFeedback) {
+            existingFeedback.remove();
+        }
+        
+        field.classList.remove('is-invalid', 'is-valid');
+        
+        if (field.hasAttribute('required') && value === '') {
+            addFieldError(field, 'Este campo es obligatorio');
+        } else if (field.type === 'email' && value && !isValidEmail(value)) {
+            addFieldError(field, 'Ingresa un email válido');
+        } else if (field.name === 'username' && value && value.length < 3) {
+            addFieldError(field, 'El nombre de usuario debe tener al menos 3 caracteres');
+        } else if (field.type === 'password' && value && value.length < 8) {
+            addFieldError(field, 'La contraseña debe tener al menos 8 caracteres');
+        } else if (value) {
+            field.classList.add('is-valid');
+        }
+    }
+
+    function addFieldError(field, message) {
+        field.classList.add('is-invalid');
+        const feedback = document.createElement('div');
+        feedback.className = 'invalid-feedback';
+        feedback.textContent = message;
+        field.parentNode.appendChild(feedback);
+    }
+
+    function isValidEmail(email) {
+        const emailRegex = /^[^\s@]+@[^\s@]+\.[^\s@]+$/;
+        return emailRegex.test(email);
+    }
+
+    // Función para copiar información del perfil
+    window.copyProfileInfo = function(text) {
+        navigator.clipboard.writeText(text).then(function() {
+            showNotification('Información copiada al portapapeles', 'success');
+        }).catch(function() {
+            showNotification('No se pudo copiar la información', 'error');
+        });
+    };
+
+    // Mejorar la accesibilidad del menú
+    if (userAvatar) {
+        userAvatar.setAttribute('role', 'button');
+        userAvatar.setAttribute('aria-haspopup', 'true');
+        userAvatar.setAttribute('aria-expanded', 'false');
+        
+        // Soporte para teclado
+        userAvatar.addEventListener('keydown', function(event) {
+            if (event.key === 'Enter' || event.key === ' ') {
+                event.preventDefault();
+                this.click();
+            }
+        });
+    }
+
+    console.log('🚀 Sistema de usuario cargado correctamente');
+});
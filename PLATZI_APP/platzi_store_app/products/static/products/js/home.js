@@ -0,0 +1,38 @@
+// Página de inicio: contadores animados de las categorías
+
+document.addEventListener('DOMContentLoaded', function() {
+    function animateCounters() {
+        const counters = document.querySelectorAll('.counter-number');
+        
+        counters.forEach(counter => {
+            const target = parseInt(counter.getAttribute('data-count'));
+            const duration = 2000;
+            const increment = target / (duration / 16);
+            let current = 0;
+            
+            const timer = setInterval(() => {
+                current += increment;
+                if (current >= target) {
+                    counter.textContent = target.toLocaleString();
+                    clearInterval(timer);
+                } else {
+                    counter.textContent = Math.floor(current).toLocaleString();
+                }
+            }, 16);
+        });
+    }
+
+    const observer = new IntersectionObserver((entries) => {
+        entries.forEach(entry => {
+            if (entry.isIntersecting) {
+                animateCounters();
+                observer.disconnect();
+            }
+        });
+    });
+
+    const countersSection = document.querySelector('.container.py-5');
+    if (countersSection) {
+        observer.observe(countersSection);
+    }
+});
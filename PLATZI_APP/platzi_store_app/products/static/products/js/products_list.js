@@ -0,0 +1,219 @@
+// Listado de productos: edición y borrado en modales, selección múltiple y borrado en lote
+
+document.addEventListener('DOMContentLoaded', function() {
+    let currentProductId = null;
+    const updateModal = new bootstrap.Modal(document.getElementById('updateModal'));
+    const deleteModal = new bootstrap.Modal(document.getElementById('deleteModal'));
+    const notificationToast = new bootstrap.Toast(document.getElementById('notificationToast'));
+
+    // Función para mostrar notificaciones
+    function showNotification(message, type = 'info') {
+        const toast = document.getElementById('notificationToast');
+        const toastHeader = toast.querySelector('.toast-header');
+        const toastIcon = document.getElementById('toastIcon');
+        const toastTitle = document.getElementById('toastTitle');
+        const toastMessage = document.getElementById('toastMessage');
+
+        // Configurar colores y iconos según el tipo
+        toastHeader.className = 'toast-header';
+        if (type === 'success') {
+            toastHeader.classList.add('bg-success', 'text-white');
+            toastIcon.className = 'fas fa-check-circle me-2';
+            toastTitle.textContent = 'Éxito';
+        } else if (type === 'error') {
+            toastHeader.classList.add('bg-danger', 'text-white');
+            toastIcon.className = 'fas fa-exclamation-circle me-2';
+            toastTitle.textContent = 'Error';
+        } else {
+            toastIcon.className = 'fas fa-info-circle me-2';
+            toastTitle.textContent = 'Información';
+        }
+
+        toastMessage.textContent = message;
+        notificationToast.show();
+    }
+
+    // Manejar clics en botones de actualizar
+    document.querySelectorAll('.btn-update').forEach(button => {
+        button.addEventListener('click', function() {
+            const productId = this.getAttribute('data-product-id');
+            currentProductId = productId;
+
+            // Cargar datos del producto
+            fetch(`/products/${productId}/update-ajax/`)
+                .then(response => response.json())
+                .then(data => {
+                    if (data.success) {
+                        const product = data.product;
+                        document.getElementById('updateTitle').value = product.title || '';
+                        document.getElementById('updateDescription').value = product.description || '';
+                        document.getElementById('updatePrice').value = product.price || 0;
+                        document.getElementById('updateCategory').value = product.category?.id || 1;
+                        document.getElementById('updateImage').value = product.images?.[0] || '';
+
+                        // Vista previa
+                        document.getElementById('currentProductImage').src = product.images?.[0] || '';
+                        document.getElementById('currentProductTitle').textContent = product.title || '';
+                        document.getElementById('currentProductPrice').textContent = `$${product.price || 0}`;
+
+                        updateModal.show();
+                    } else {
+                        showNotification(data.message, 'error');
+                    }
+                })
+                .catch(error => {
+                    showNotification('Error al cargar el producto', 'error');
+                });
+        });
+    });
+
+    // Manejar clics en botones de eliminar
+    document.querySelectorAll('.btn-delete').forEach(button => {
+        button.addEventListener('click', function() {
+            const productId = this.getAttribute('data-product-id');
+            currentProductId = productId;
+
+            // Cargar datos del producto
+            fetch(`/products/${productId}/delete-ajax/`)
+                .then(response => response.json())
+                .then(data => {
+                    if (data.success) {
+                        const product = data.product;
+                        document.getElementById('deleteProductImage').src = product.images?.[0] || '';
+                        document.getElementById('deleteProductTitle').textContent = product.title || '';
+                        
+                        const productInfo = `
+                            <p><strong>Precio:</strong> $${product.price || 0}</p>
+                            <p><strong>Descripción:</strong> ${(product.description || '').substring(0, 100)}...</p>
+                            ${product.category ? `<p><strong>Categoría:</strong> ${product.category.name}</p>` : ''}
+                        `;
+                        document.getElementById('deleteProductInfo').innerHTML = productInfo;
+
+                        deleteModal.show();
+                    } else {
+                        showNotification(data.message, 'error');
+                    }
+                })
+                .catch(error => {
+                    showNotification('Error al cargar el producto', 'error');
+                });
+        });
+    });
+
+    // Confirmar actualización
+    document.getElementById('confirmUpdate').addEventListener('click', function() {
+        const formData = {
+            title: document.getElementById('updateTitle').value,
+            description: document.getElementById('updateDescription').value,
+            price: document.getElementById('updatePrice').value,
+            category: document.getElementById('updateCategory').value,
+            image: document.getElementById('updateImage').value
+        };
+
+        fetch(`/products/${currentProductId}/update-ajax/`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify(formData)
+        })
+        .then(response => response.json())
+        .then(data => {
+            if (data.success) {
+                updateModal.hide();
+                showNotification(data.message, 'success');
+                // Recargar la página para ver los cambios
+                setTimeout(() => {
+                    location.reload();
+                }, 1500);
+            } else {
+                showNotification(data.message, 'error');
+            }
+        })
+        .catch(error => {
+            showNotification('Error al actualizar el producto', 'error');
+        });
+    });
+
+    // Confirmar eliminación
+    document.getElementById('confirmDelete').addEventListener('click', function() {
+        fetch(`/products/${currentProductId}/delete-ajax/`, {
+            method: 'DELETE',
+        })
+        .then(response => response.json())
+        .then(data => {
+            if (data.success) {
+                deleteModal.hide();
+                showNotification(data.message, 'success');
+                // Remover el producto de la vista
+                const productCard = document.querySelector(`[data-product-id="${currentProductId}"]`);
+                if (productCard) {
+                    productCard.remove();
+                }
+            } else {
+                showNotification(data.message, 'error');
+            }
+        })
+        .catch(error => {
+            showNotification('Error al eliminar el producto', 'error');
+        });
+    });
+
+    // Selección múltiple: todas las eliminaciones se envían en una sola petición
+    const deleteSelectedButton = document.getElementById('deleteSelected');
+
+    function selectedProductIds() {
+        return Array.from(document.querySelectorAll('.product-select:checked')).map(input => input.value);
+    }
+
+    function updateSelection() {
+        const count = selectedProductIds().length;
+        document.getElementById('selectedCount').textContent = count;
+        deleteSelectedButton.disabled = count === 0;
+    }
+
+    // Delegación de eventos: también funciona con las tarjetas que llegan por streaming
+    document.getElementById('products-container').addEventListener('change', function(event) {
+        if (event.target.classList.contains('product-select')) {
+            updateSelection();
+        }
+    });
+
+    if (deleteSelectedButton) {
+        deleteSelectedButton.addEventListener('click', function() {
+            const ids = selectedProductIds();
+            if (!ids.length || !confirm(`¿Eliminar ${ids.length} productos?`)) {
+                return;
+            }
+            deleteSelectedButton.disabled = true;
+
+            fetch(deleteSelectedButton.dataset.url, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                    'X-CSRFToken': deleteSelectedButton.dataset.csrfToken,
+                },
+                body: JSON.stringify({
+                    operations: ids.map(id => ({op: 'delete', id: Number(id)}))
+                })
+            })
+            .then(response => response.json())
+            .then(data => {
+                (data.results || []).forEach(result => {
+                    if (result.success) {
+                        const productCard = document.querySelector(`[data-product-id="${result.id}"]`);
+                        if (productCard) {
+                            productCard.remove();
+                        }
+                    }
+                });
+                showNotification(data.message, data.success ? 'success' : 'error');
+                updateSelection();
+            })
+            .catch(error => {
+                showNotification('Error al eliminar los productos seleccionados', 'error');
+                updateSelection();
+            });
+        });
+    }
+});
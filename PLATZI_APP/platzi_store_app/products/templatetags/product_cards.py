@@ -0,0 +1,11 @@
+from django import template
+
+from ..page_cache import render_product_card_body
+
+register = template.Library()
+
+
+@register.simple_tag
+def product_card_body(product):
+    """Cuerpo de la tarjeta de producto (fragmento cacheado por id y contenido)."""
+    return render_product_card_body(product)
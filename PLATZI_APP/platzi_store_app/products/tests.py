@@ -1,3 +1,785 @@
-from django.test import TestCase
+import asyncio
+import hashlib
+import io
+from unittest import mock
 
-# Create your tests here.
+import json
+
+import requests
+from django.contrib import messages
+from django.contrib.auth.models import AnonymousUser, User
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, Client, RequestFactory, SimpleTestCase, TestCase, override_settings
+from rest_framework.authtoken.models import Token
+
+from platzi_store_app.storage import StaticFilesStorage
+
+from . import api_client, batch, cache as tiered_cache, circuit_breaker, importer, mirror, page_cache, views
+from .catalog import get_catalog
+from .forms import ProductImportForm
+from .models import CatalogSyncState, Category, Product, ProductImport
+from .page_cache import alist_page_key, cache_anonymous_page
+from .ratelimit import SlidingWindowLimiter, client_ip
+from .search import SearchIndex, get_search_settings, tokenize
+from .singleflight import AsyncSingleFlight, DistributedSingleFlight
+
+
+def product(pk, title, description=''):
+    return {'id': pk, 'title': title, 'description': description}
+
+
+class SearchIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.index = SearchIndex(get_search_settings())
+        self.index.rebuild([
+            product(1, 'Classic Shirt', 'Cotton shirt for every day'),
+            product(2, 'Modern Chair', 'A shirt-free chair'),
+            product(3, 'Wooden Chair', 'Classic design'),
+            product(4, 'Camiseta Básica', 'Algodón orgánico'),
+        ])
+
+    def ids(self, query, **kwargs):
+        return [item['id'] for item in self.index.search(query, **kwargs)]
+
+    def test_tokenize_lowercases_and_strips_accents(self):
+        self.assertEqual(tokenize('Camiseta BÁSICA, algodón'), ['camiseta', 'basica', 'algodon'])
+
+    def test_title_ranks_above_description(self):
+        self.assertEqual(self.ids('shirt'), [1, 2])
+        self.assertEqual(self.ids('classic'), [1, 3])
+
+    def test_all_terms_must_match(self):
+        self.assertEqual(self.ids('classic chair'), [3])
+        self.assertEqual(self.ids('classic lamp'), [])
+
+    def test_prefix_matching(self):
+        self.assertEqual(self.ids('cha'), [2, 3])
+        # Por debajo de MIN_PREFIX_LENGTH solo cuenta la palabra exacta
+        self.assertEqual(self.ids('c'), [])
+
+    def test_exact_match_ranks_above_prefix(self):
+        self.index.add(product(5, 'Chairs', ''))
+        self.index.add(product(6, 'Chair', ''))
+        ids = self.ids('chair')
+        self.assertLess(ids.index(6), ids.index(5))
+
+    def test_accents_ignored_in_query(self):
+        self.assertEqual(self.ids('basica'), [4])
+        self.assertEqual(self.ids('ALGODÓN'), [4])
+
+    def test_remove(self):
+        self.index.remove(2)
+        self.assertEqual(self.ids('modern'), [])
+        self.assertEqual(self.ids('chair'), [3])
+        self.assertNotIn('modern', self.index.vocabulary)
+        self.assertEqual(len(self.index), 3)
+
+    def test_add_replaces_existing_product(self):
+        self.index.add(product(1, 'Leather Jacket', ''))
+        self.assertEqual(self.ids('shirt'), [2])
+        self.assertEqual(self.ids('jacket'), [1])
+
+    def test_rebuild_replaces_contents(self):
+        self.index.rebuild([product(9, 'Desk Lamp', '')])
+        self.assertEqual(len(self.index), 1)
+        self.assertEqual(self.ids('chair'), [])
+        self.assertEqual(self.ids('lamp'), [9])
+
+    def test_rebuild_sorts_vocabulary(self):
+        self.index.rebuild([product(9, 'Zebra Lamp', ''), product(10, 'Apple Desk', '')])
+        self.assertEqual(self.index.vocabulary, sorted(self.index.postings))
+        self.assertEqual(self.ids('de'), [10])
+
+    def test_changes_during_rebuild_are_kept(self):
+        def products():
+            yield product(9, 'Desk Lamp', '')
+            # Llegan mientras se construye el índice nuevo
+            self.index.add(product(10, 'Floor Lamp', ''))
+            self.index.remove(9)
+            yield product(11, 'Table Lamp', '')
+
+        self.index.rebuild(products())
+        self.assertEqual(self.ids('lamp'), [10, 11])
+        self.assertIsNone(self.index._pending)
+
+    def test_pagination(self):
+        result = self.index.search('chair', page=2, per_page=1)
+        self.assertEqual(result.total, 2)
+        self.assertEqual([item['id'] for item in result], [3])
+
+
+class SlidingWindowDecideTests(SimpleTestCase):
+    decide = staticmethod(SlidingWindowLimiter._decide)
+
+    def test_allowed_within_limit(self):
+        self.assertEqual(self.decide(5, 0, 0.5, 10, 60), (True, 5, 0))
+
+    def test_previous_window_weighted_by_remaining_fraction(self):
+        # 10 * (1 - 0.5) + 5 = 10: justo en el límite
+        self.assertEqual(self.decide(5, 10, 0.5, 10, 60), (True, 0, 0))
+        self.assertEqual(self.decide(6, 10, 0.5, 10, 60)[0], False)
+
+    def test_retry_when_previous_window_frees_room(self):
+        # 16 * 0.5 + 4 = 12; el peso de la anterior debe bajar a 4/16 (fracción 0.75)
+        self.assertEqual(self.decide(4, 16, 0.5, 8, 60), (False, 0, 15))
+
+    def test_retry_at_next_window_when_current_alone_exceeds(self):
+        self.assertEqual(self.decide(11, 0, 0.25, 10, 60), (False, 0, 45))
+
+    def test_retry_is_at_least_one_second(self):
+        self.assertEqual(self.decide(4, 16, 0.749, 8, 60), (False, 0, 1))
+
+
+class SlidingWindowLimiterTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.limiter = SlidingWindowLimiter(key_prefix='test:rl')
+
+    @mock.patch('products.ratelimit.time.time', return_value=6000.0)
+    def test_rejected_requests_do_not_consume_quota(self, _time):
+        results = [self.limiter.hit('cliente', 3, 60)[0] for _ in range(5)]
+        self.assertEqual(results, [True, True, True, False, False])
+        self.assertEqual(self.limiter.hit('otro', 3, 60)[0], True)
+        # A mitad de la ventana siguiente pesan 3 * 0.5 de las aceptadas, no 5 * 0.5
+        _time.return_value = 6060.0 + 30
+        self.assertEqual(self.limiter.hit('cliente', 3, 60)[0], True)
+        self.assertEqual(self.limiter.hit('cliente', 3, 60)[0], False)
+
+    def test_client_ip_uses_forwarded_for_only_with_proxies(self):
+        request = RequestFactory().get('/', REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR='1.1.1.1, 2.2.2.2')
+        self.assertEqual(client_ip(request), '10.0.0.1')
+        self.assertEqual(client_ip(request, num_proxies=1), '2.2.2.2')
+        self.assertEqual(client_ip(request, num_proxies=2), '1.1.1.1')
+
+
+RATE_LIMIT = {
+    'ENABLED': True,
+    'CACHE': 'default',
+    'NUM_PROXIES': 0,
+    'EXEMPT_PATHS': [],
+    'RULES': [{'NAME': 'api', 'PATH': r'^/api/profile/', 'RATE': '3/minute'}],
+}
+
+
+@override_settings(PLATZI_RATE_LIMIT=RATE_LIMIT)
+class RateLimitMiddlewareTests(TestCase):
+    url = '/api/profile/'
+
+    def setUp(self):
+        cache.clear()
+
+    def get(self, **extra):
+        extra.setdefault('REMOTE_ADDR', '10.0.0.1')
+        return self.client.get(self.url, **extra)
+
+    def test_429_with_retry_after_after_limit(self):
+        statuses = [self.get().status_code for _ in range(3)]
+        self.assertNotIn(429, statuses)
+        response = self.get()
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response['Retry-After']), 1)
+        self.assertIn('detail', response.json())
+
+    def test_html_clients_get_plain_text(self):
+        for _ in range(3):
+            self.get()
+        response = self.get(HTTP_ACCEPT='text/html,application/xhtml+xml')
+        self.assertEqual(response.status_code, 429)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        self.assertIn('Retry-After', response)
+
+    def test_limit_is_per_ip(self):
+        for _ in range(4):
+            self.get()
+        self.assertNotEqual(self.get(REMOTE_ADDR='10.0.0.2').status_code, 429)
+
+    def test_token_clients_counted_per_user(self):
+        user = User.objects.create_user('api-client', password='x')
+        token = Token.objects.create(user=user)
+        statuses = [
+            self.get(HTTP_AUTHORIZATION=f'Token {token.key}', REMOTE_ADDR=f'10.0.1.{i}').status_code
+            for i in range(4)
+        ]
+        self.assertEqual(statuses, [200, 200, 200, 429])
+
+    def test_disabled(self):
+        with override_settings(PLATZI_RATE_LIMIT=dict(RATE_LIMIT, ENABLED=False)):
+            statuses = [self.get().status_code for _ in range(5)]
+        self.assertNotIn(429, statuses)
+
+
+def page_key(request):
+    return 'test:page'
+
+
+class PageCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        circuit_breaker.start_request()
+        self.calls = 0
+
+    def request(self, user=None):
+        request = RequestFactory().get('/products/')
+        request.user = user or AnonymousUser()
+        request._messages = CookieStorage(request)
+        return request
+
+    def view(self, message_level=None, status=200, render_messages=False):
+        @cache_anonymous_page(page_key, 'LIST_TIMEOUT')
+        def view(request):
+            self.calls += 1
+            if message_level is not None:
+                messages.add_message(request, message_level, 'Aviso')
+            if render_messages:
+                # La plantilla recorre los mensajes al mostrarlos
+                list(messages.get_messages(request))
+            return HttpResponse('página', status=status)
+        return view
+
+    def test_anonymous_page_cached(self):
+        view = self.view()
+        self.assertEqual(view(self.request())['X-Page-Cache'], 'MISS')
+        self.assertEqual(view(self.request())['X-Page-Cache'], 'HIT')
+        self.assertEqual(self.calls, 1)
+
+    def test_error_message_not_cached(self):
+        view = self.view(messages.ERROR)
+        for _ in range(2):
+            self.assertNotIn('X-Page-Cache', view(self.request()))
+        self.assertEqual(self.calls, 2)
+
+    def test_rendered_error_message_not_cached(self):
+        view = self.view(messages.ERROR, render_messages=True)
+        view(self.request())
+        self.assertIsNone(cache.get(page_key(None)))
+
+    def test_error_status_not_cached(self):
+        view = self.view(status=404)
+        view(self.request())
+        self.assertIsNone(cache.get(page_key(None)))
+
+    def test_stale_page_not_cached(self):
+        view = self.view()
+        circuit_breaker.mark_stale()
+        view(self.request())
+        self.assertIsNone(cache.get(page_key(None)))
+
+    def test_authenticated_user_bypasses_cache(self):
+        view = self.view()
+        user = User(pk=1, username='ana')
+        self.assertNotIn('X-Page-Cache', view(self.request(user)))
+        self.assertIsNone(cache.get(page_key(None)))
+
+
+class AsyncPageCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        circuit_breaker.start_request()
+
+    def request(self):
+        request = AsyncRequestFactory().get('/products/')
+
+        async def auser():
+            return AnonymousUser()
+        request.auser = auser
+        request._messages = CookieStorage(request)
+        return request
+
+    async def test_async_view_cached(self):
+        @cache_anonymous_page(page_key, 'LIST_TIMEOUT')
+        async def view(request):
+            return HttpResponse('página')
+
+        self.assertEqual((await view(self.request()))['X-Page-Cache'], 'MISS')
+        self.assertEqual((await view(self.request()))['X-Page-Cache'], 'HIT')
+
+    async def test_async_cached_response_keeps_headers(self):
+        @cache_anonymous_page(page_key, 'LIST_TIMEOUT')
+        async def view(request):
+            response = HttpResponse('página', content_type='text/plain; charset=utf-8')
+            response['Vary'] = 'Accept-Language'
+            return response
+
+        await view(self.request())
+        response = await view(self.request())
+        self.assertEqual(response['X-Page-Cache'], 'HIT')
+        self.assertEqual(response['Vary'], 'Accept-Language')
+        self.assertEqual(response['Content-Type'], 'text/plain; charset=utf-8')
+
+    async def test_async_list_key_does_not_use_sync_cache(self):
+        @cache_anonymous_page(alist_page_key, 'LIST_TIMEOUT')
+        async def view(request):
+            return HttpResponse('página')
+
+        with mock.patch.object(page_cache.django_cache, 'get_or_set', side_effect=AssertionError):
+            self.assertEqual((await view(self.request()))['X-Page-Cache'], 'MISS')
+            self.assertEqual((await view(self.request()))['X-Page-Cache'], 'HIT')
+
+    async def test_async_error_message_not_cached(self):
+        @cache_anonymous_page(page_key, 'LIST_TIMEOUT')
+        async def view(request):
+            messages.error(request, 'La API falló')
+            return HttpResponse('página')
+
+        self.assertNotIn('X-Page-Cache', await view(self.request()))
+        self.assertIsNone(await cache.aget(page_key(None)))
+
+
+MEMORY_CATALOG = {
+    'BACKEND': 'products.catalog.InMemoryCatalog',
+    'OPTIONS': {'CATALOG_SIZE': 5, 'CATEGORIES': 2},
+}
+
+
+@override_settings(PLATZI_RATE_LIMIT={'ENABLED': False})
+class ProductsBatchTests(TestCase):
+    url = '/products/batch/'
+
+    def setUp(self):
+        cache.clear()
+        # Catálogo nuevo en cada test (get_catalog se reinicia al cambiar el setting)
+        self.enterContext(override_settings(PLATZI_CATALOG_BACKEND=MEMORY_CATALOG))
+        self.user = User.objects.create_user('editor', password='x')
+        self.client.force_login(self.user)
+        self.catalog = get_catalog()
+
+    def post(self, operations, client=None, **extra):
+        return (client or self.client).post(
+            self.url, json.dumps({'operations': operations}), content_type='application/json', **extra
+        )
+
+    def product_data(self, **overrides):
+        data = {
+            'title': 'Lámpara',
+            'description': 'De escritorio',
+            'price': '19.90',
+            'category': str(self.catalog.categories[0]['id']),
+        }
+        data.update(overrides)
+        return data
+
+    def test_requires_login(self):
+        self.client.logout()
+        response = self.post([{'op': 'delete', 'id': 1}])
+        self.assertEqual(response.status_code, 302)
+        self.assertIn(1, self.catalog.products)
+
+    def test_requires_csrf_token(self):
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.user)
+        response = self.post([{'op': 'delete', 'id': 1}], client=client)
+        self.assertEqual(response.status_code, 403)
+        self.assertIn(1, self.catalog.products)
+
+        token = 'a' * 32
+        client.cookies['csrftoken'] = token
+        response = self.post([{'op': 'delete', 'id': 1}], client=client, HTTP_X_CSRFTOKEN=token)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(1, self.catalog.products)
+
+    def test_mixed_operations(self):
+        response = self.post([
+            {'op': 'create', 'data': self.product_data()},
+            {'op': 'update', 'id': 2, 'data': self.product_data(title='Silla')},
+            {'op': 'delete', 'id': 3},
+            {'op': 'delete', 'id': 999},
+        ])
+        data = response.json()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([result['success'] for result in data['results']], [True, True, True, False])
+        self.assertEqual((data['succeeded'], data['failed']), (3, 1))
+        self.assertEqual(self.catalog.products[data['results'][0]['id']]['title'], 'Lámpara')
+        self.assertEqual(self.catalog.products[2]['title'], 'Silla')
+        self.assertEqual(self.catalog.products[2]['price'], 19.9)
+        self.assertNotIn(3, self.catalog.products)
+
+    def test_invalid_operation_rejects_whole_batch(self):
+        response = self.post([
+            {'op': 'delete', 'id': 1},
+            {'op': 'update', 'id': 2, 'data': {'title': 'Solo el título'}},
+            {'op': 'create', 'data': self.product_data(category='999')},
+            {'op': 'explode'},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error['index'] for error in response.json()['errors']], [1, 2, 3])
+        self.assertIn(1, self.catalog.products)
+
+    def test_update_keeps_product_when_fields_missing(self):
+        original = dict(self.catalog.products[2])
+        response = self.post([{'op': 'update', 'id': 2, 'data': {'price': '5'}}])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.catalog.products[2], original)
+
+    def test_non_json_success_response_is_reported(self):
+        with mock.patch.object(batch, '_send', side_effect=ValueError('Expecting value')):
+            response = self.post([{'op': 'delete', 'id': 1}])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['message'], 'Respuesta inválida de la API')
+
+    def test_worker_threads_see_request_context(self):
+        def send(operation):
+            circuit_breaker.mark_stale()
+            return None, 200
+
+        circuit_breaker.start_request()
+        with mock.patch.object(batch, '_send', side_effect=send):
+            batch.execute_operations([{'op': 'delete', 'id': 1, 'payload': None}])
+        self.assertTrue(circuit_breaker.served_stale())
+
+
+@override_settings(DEBUG=False)
+class StaticFilesStorageTests(SimpleTestCase):
+    def test_missing_manifest_falls_back_to_plain_url(self):
+        # Sin collectstatic: ni manifiesto ni STATIC_ROOT
+        storage = StaticFilesStorage(location='/nonexistent-static-root')
+        self.assertEqual(
+            storage.url('vendor/bootstrap/css/bootstrap.min.css'),
+            '/static/vendor/bootstrap/css/bootstrap.min.css',
+        )
+
+
+def api_response(status, content=b'[]'):
+    response = requests.Response()
+    response.status_code = status
+    response._content = content
+    return response
+
+
+@override_settings(PLATZI_API_CLIENT={
+    'MAX_RETRIES': 0,
+    'SINGLE_FLIGHT': False,
+    'CIRCUIT_FAILURE_THRESHOLD': 1,
+    'CIRCUIT_RECOVERY_TIMEOUT': 0,
+})
+class APIClientFallbackTests(SimpleTestCase):
+    url = 'http://api.test/products/'
+
+    def setUp(self):
+        cache.clear()
+        circuit_breaker.start_request()
+        self.reset_client()
+        self.addCleanup(self.reset_client)
+        self.client = api_client.get_client()
+
+    def reset_client(self):
+        # El circuit breaker del proceso también se crea con estos settings
+        api_client._breaker = None
+        api_client.reset_client()
+
+    def respond(self, *responses):
+        return mock.patch.object(self.client.session, 'request', side_effect=responses)
+
+    def test_server_error_serves_last_good_copy(self):
+        with self.respond(api_response(200, b'[1]'), api_response(503)):
+            self.client.get(self.url, stale_fallback=True)
+            response = self.client.get(self.url, stale_fallback=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'[1]')
+        self.assertTrue(response.stale)
+        self.assertTrue(circuit_breaker.served_stale())
+
+    def test_without_fallback_nothing_is_stored(self):
+        with self.respond(api_response(200, b'[1]'), api_response(503)):
+            self.client.get(self.url)
+            response = self.client.get(self.url, stale_fallback=True)
+        self.assertEqual(response.status_code, 503)
+        self.assertFalse(circuit_breaker.served_stale())
+
+    def test_unexpected_error_in_half_open_probe_releases_slot(self):
+        with self.respond(api_response(503)):
+            self.client.get(self.url)
+        self.assertEqual(self.client.breaker.state, circuit_breaker.OPEN)
+        # La prueba del circuito semiabierto falla con un error inesperado
+        with self.respond(RuntimeError('boom')), self.assertRaises(RuntimeError):
+            self.client.get(self.url)
+        with self.respond(api_response(200)):
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+        self.assertEqual(self.client.breaker.state, circuit_breaker.CLOSED)
+
+
+def remote_category(pk):
+    return {'id': pk, 'name': f'Categoría {pk}', 'slug': f'categoria-{pk}', 'image': ''}
+
+
+def remote_product(pk, category_id=1, updated='2026-01-01T00:00:00Z', title=None):
+    return {
+        'id': pk, 'title': title or f'Producto {pk}', 'price': 10, 'description': '', 'images': [],
+        'category': remote_category(category_id), 'updatedAt': updated,
+    }
+
+
+@override_settings(PLATZI_CATALOG_MIRROR={'PAGE_SIZE': 2, 'FULL_SYNC_INTERVAL': 3600})
+class MirrorSyncTests(TestCase):
+    def setUp(self):
+        self.categories = [remote_category(1), remote_category(2)]
+        self.products = [remote_product(pk, category_id=1 + pk % 2) for pk in range(1, 6)]
+        self.offsets = []
+        self.enterContext(mock.patch.object(mirror.api_client, 'get', side_effect=lambda url, **kwargs: api_response(
+            200, json.dumps(self.categories).encode(),
+        )))
+        self.enterContext(mock.patch.object(mirror, '_fetch_page', side_effect=self.fetch_page))
+
+    def fetch_page(self, offset, limit):
+        self.offsets.append(offset)
+        return self.products[offset:offset + limit]
+
+    def test_first_sync_walks_whole_catalog(self):
+        state = mirror.sync_catalog()
+        self.assertEqual(self.offsets, [0, 2, 4])
+        self.assertEqual(Product.objects.count(), 5)
+        self.assertIsNotNone(state.last_full_sync_at)
+
+    def test_incremental_sync_fetches_only_last_pages(self):
+        mirror.sync_catalog()
+        self.offsets.clear()
+        self.products.append(remote_product(6))
+        state = mirror.sync_catalog()
+        self.assertEqual(self.offsets, [3, 5])
+        self.assertTrue(Product.objects.filter(pk=6).exists())
+        self.assertEqual(state.products_deleted, 0)
+
+    def test_incremental_sync_keeps_products_missing_upstream(self):
+        mirror.sync_catalog()
+        del self.products[0]
+        mirror.sync_catalog()
+        self.assertTrue(Product.objects.filter(pk=1).exists())
+
+    def test_complete_sync_after_interval_deletes_removed_products(self):
+        mirror.sync_catalog()
+        CatalogSyncState.objects.update(last_full_sync_at=None)
+        del self.products[0]
+        self.offsets.clear()
+        state = mirror.sync_catalog()
+        self.assertEqual(self.offsets[0], 0)
+        self.assertFalse(Product.objects.filter(pk=1).exists())
+        self.assertEqual(state.products_deleted, 1)
+
+    def test_complete_sync_deletes_removed_categories(self):
+        self.categories.append(remote_category(3))
+        mirror.sync_catalog()
+        self.assertTrue(Category.objects.filter(pk=3).exists())
+        self.categories.pop()
+        state = mirror.sync_catalog(complete=True)
+        self.assertFalse(Category.objects.filter(pk=3).exists())
+        self.assertEqual(state.categories_deleted, 1)
+
+    def test_title_filter_matches_prefix(self):
+        self.products = [remote_product(1, title='Silla moderna'), remote_product(2, title='Mesa con silla')]
+        mirror.sync_catalog()
+        self.assertEqual([item['id'] for item in mirror.list_products(title='silla')], [1])
+
+
+class DistributedSingleFlightTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.flight = DistributedSingleFlight(lock_timeout=10)
+
+    def lock_key(self, key):
+        return f"platzi:singleflight:lock:{hashlib.sha1(key.encode()).hexdigest()}"
+
+    def test_leader_keeps_lock_taken_over_by_another_worker(self):
+        def slow_call():
+            # La llamada tardó más que lock_timeout y otro worker tomó el lock
+            cache.set(self.lock_key('GET /products/'), 'otro-worker', 10)
+            return api_response(200)
+
+        self.flight.do('GET /products/', slow_call)
+        self.assertEqual(cache.get(self.lock_key('GET /products/')), 'otro-worker')
+
+    def test_leader_releases_own_lock(self):
+        self.flight.do('GET /products/', lambda: api_response(200))
+        self.assertIsNone(cache.get(self.lock_key('GET /products/')))
+
+    def test_follower_reuses_published_result(self):
+        cache.set(self.lock_key('GET /products/'), 'otro-worker', 10)
+        digest = hashlib.sha1(b'GET /products/').hexdigest()
+        cache.set(f"platzi:singleflight:result:{digest}", 'publicado', 10)
+        self.assertEqual(self.flight.do('GET /products/', lambda: 'propio'), 'publicado')
+        self.assertEqual(self.flight.coalesced, 1)
+
+
+class AsyncSingleFlightTests(SimpleTestCase):
+    def test_cancelled_leader_does_not_cancel_followers(self):
+        async def scenario():
+            flight = AsyncSingleFlight()
+            release = asyncio.Event()
+
+            async def call():
+                await release.wait()
+                return 'ok'
+
+            leader = asyncio.ensure_future(flight.do('key', call))
+            await asyncio.sleep(0)
+            follower = asyncio.ensure_future(flight.do('key', call))
+            await asyncio.sleep(0)
+            leader.cancel()
+            await asyncio.sleep(0)
+            release.set()
+            result = await follower
+            with self.assertRaises(asyncio.CancelledError):
+                await leader
+            return result, flight.coalesced, flight._tasks
+
+        result, coalesced, pending = asyncio.run(scenario())
+        self.assertEqual(result, 'ok')
+        self.assertEqual(coalesced, 1)
+        self.assertEqual(pending, {})
+
+    def test_exception_shared_with_followers(self):
+        async def scenario():
+            flight = AsyncSingleFlight()
+
+            async def call():
+                await asyncio.sleep(0)
+                raise ValueError('boom')
+
+            return await asyncio.gather(flight.do('key', call), flight.do('key', call), return_exceptions=True)
+
+        results = asyncio.run(scenario())
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+
+
+class AsyncResourcesTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_background_refresh_task_kept_until_done(self):
+        categories = tiered_cache.TieredCache('test', ttl=60, stale_ttl=60)
+        cache.set(categories.make_key('all'), {'value': ['viejo'], 'fresh_until': 0}, 60)
+
+        async def scenario():
+            release = asyncio.Event()
+
+            async def loader():
+                await release.wait()
+                return ['nuevo']
+
+            stale = await categories.aget_or_load('all', loader)
+            pending = len(tiered_cache._background_tasks)
+            release.set()
+            while tiered_cache._background_tasks:
+                await asyncio.sleep(0.01)
+            return stale, pending
+
+        self.assertEqual(asyncio.run(scenario()), (['viejo'], 1))
+        self.assertEqual(cache.get(categories.make_key('all'))['value'], ['nuevo'])
+
+    def test_async_client_closed_with_its_loop(self):
+        async def scenario():
+            return api_client.get_async_client()
+
+        client = asyncio.run(scenario())
+        self.assertTrue(client.client.is_closed)
+        self.assertNotIn(client, list(api_client._async_clients.values()))
+
+    def test_aclose_async_client(self):
+        async def scenario():
+            client = api_client.get_async_client()
+            await api_client.aclose_async_client()
+            return client, api_client.get_async_client()
+
+        closed, replacement = asyncio.run(scenario())
+        self.assertTrue(closed.client.is_closed)
+        self.assertIsNot(closed, replacement)
+
+
+class MirrorVersionTests(TestCase):
+    def test_version_changes_with_app_writes(self):
+        before = mirror.data_version()
+        mirror.upsert_product(remote_product(1))
+        created = mirror.data_version()
+        self.assertNotEqual(before, created)
+        mirror.delete_product(1)
+        self.assertNotEqual(created, mirror.data_version())
+
+
+@override_settings(PLATZI_RATE_LIMIT={'ENABLED': False, 'NUM_PROXIES': 1})
+class MetricsAccessTests(TestCase):
+    url = '/metrics'
+
+    def test_anonymous_from_proxy_host_rejected(self):
+        # Proxy en el mismo host: REMOTE_ADDR es 127.0.0.1 para todos
+        response = self.client.get(self.url, REMOTE_ADDR='127.0.0.1', HTTP_X_FORWARDED_FOR='203.0.113.7')
+        self.assertEqual(response.status_code, 403)
+        self.assertNotIn('Server-Timing', response)
+
+    @override_settings(PLATZI_INSTRUMENTATION={'METRICS_ALLOWED_IPS': ['10.0.0.5']})
+    def test_allowed_ip_resolved_through_proxy(self):
+        response = self.client.get(self.url, REMOTE_ADDR='127.0.0.1', HTTP_X_FORWARDED_FOR='10.0.0.5')
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(self.url, REMOTE_ADDR='10.0.0.5', HTTP_X_FORWARDED_FOR='203.0.113.7')
+        self.assertEqual(response.status_code, 403)
+
+    def test_staff_can_read_metrics(self):
+        self.client.force_login(User.objects.create_user('admin', 'admin@example.com', 'x', is_staff=True))
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+    def test_server_timing_only_for_metrics_audience(self):
+        self.assertNotIn('Server-Timing', self.client.get('/api/check-username/?username=ana'))
+        self.client.force_login(User.objects.create_user('admin', 'admin@example.com', 'x', is_staff=True))
+        self.assertIn('Server-Timing', self.client.get('/api/check-username/?username=ana'))
+
+    async def test_server_timing_hidden_from_anonymous_async_requests(self):
+        response = await self.async_client.get('/api/check-username/?username=ana')
+        self.assertNotIn('Server-Timing', response)
+
+
+class ProductImportTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.enterContext(override_settings(PLATZI_CATALOG_BACKEND=MEMORY_CATALOG))
+        self.category = get_catalog().categories[0]['id']
+
+    def csv_file(self, *rows):
+        lines = ['title,description,price,category'] + [f'{title},Descripción,10,{self.category}' for title in rows]
+        return io.BytesIO('\n'.join(lines).encode())
+
+    def test_import_creates_rows(self):
+        job = importer.run_import(self.csv_file('Lámpara', 'Silla'), filename='productos.csv')
+        self.assertEqual(job.status, ProductImport.COMPLETED)
+        self.assertEqual(job.created, 2)
+
+    def test_decode_error_marks_job_failed(self):
+        fileobj = self.csv_file('Lámpara')
+        fileobj = io.BytesIO(fileobj.getvalue() + '\nMesa,Descripción,10,1'.encode('latin-1'))
+        job = importer.run_import(fileobj, filename='productos.csv')
+        self.assertEqual(job.status, ProductImport.FAILED)
+        self.assertIn('UTF-8', job.message)
+        self.assertEqual(ProductImport.objects.get(pk=job.pk).status, ProductImport.FAILED)
+
+    def test_unexpected_error_marks_job_failed(self):
+        with mock.patch.object(importer, 'validate_row', side_effect=RuntimeError('boom')), \
+                self.assertRaises(RuntimeError):
+            importer.run_import(self.csv_file('Lámpara'), filename='productos.csv')
+        self.assertEqual(ProductImport.objects.get().status, ProductImport.FAILED)
+
+    @override_settings(PLATZI_PRODUCT_IMPORT={'MAX_UPLOAD_SIZE': 10})
+    def test_form_rejects_large_uploads(self):
+        upload = SimpleUploadedFile('productos.csv', self.csv_file('Lámpara').getvalue())
+        form = ProductImportForm(files={'file': upload})
+        self.assertFalse(form.is_valid())
+        self.assertIn('import_products', form.errors['file'][0])
+
+
+class StreamingChunksTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.enterContext(override_settings(PLATZI_CATALOG_BACKEND=MEMORY_CATALOG))
+        self.catalog = get_catalog()
+
+    def chunks(self, page, limit, **kwargs):
+        pagination = {'has_next': False}
+        chunks = list(views._iter_product_chunks(self.catalog, None, None, page, limit, pagination, chunk_size=2))
+        return [[product['id'] for product in chunk] for chunk in chunks], pagination['has_next']
+
+    def test_streams_only_requested_page(self):
+        ids = [product['id'] for product in self.catalog.all_products()]
+        self.assertEqual(self.chunks(1, 3), ([ids[0:2], ids[2:3]], True))
+        self.assertEqual(self.chunks(2, 3), ([ids[3:5]], False))
+
+    def test_last_page_without_extra_products(self):
+        self.assertEqual(self.chunks(3, 2)[1], False)
+        self.assertEqual(self.chunks(4, 2), ([], False))
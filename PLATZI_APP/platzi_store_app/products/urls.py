@@ -1,12 +1,20 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, views
 
 app_name = 'products'
 
+# Con PRODUCTS_ASYNC_VIEWS (despliegue ASGI) el listado y el detalle usan las vistas asíncronas
+list_view = async_views.products_list_view if settings.PRODUCTS_ASYNC_VIEWS else views.products_list_view
+detail_view = async_views.products_detail_view if settings.PRODUCTS_ASYNC_VIEWS else views.products_detail_view
+
 urlpatterns = [
-    path('', views.products_list_view, name='products_list'),
+    path('', list_view, name='products_list'),
     path('add/', views.products_add_view, name='products_add'),
-    path('<int:pk>/', views.products_detail_view, name='products_detail'),
+    path('export/', views.products_export_view, name='products_export'),
+    path('import/', views.products_import_view, name='products_import'),
+    path('batch/', views.products_batch_ajax, name='products_batch_ajax'),
+    path('<int:pk>/', detail_view, name='products_detail'),
     path('<int:pk>/update-ajax/', views.products_update_ajax, name='products_update_ajax'),
     path('<int:pk>/delete-ajax/', views.products_delete_ajax, name='products_delete_ajax'),
 ]
\ No newline at end of file
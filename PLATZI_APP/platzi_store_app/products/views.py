@@ -1,109 +1,240 @@
 from django.shortcuts import render, get_object_or_404, redirect
-from django.http import JsonResponse
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.template import RequestContext
+from django.template.loader import get_template, render_to_string
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib import messages
 import requests
 import json
-from .forms import ProductForm
+from .forms import ProductForm, ProductImportForm
+from . import batch
+from . import exporter
+from . import importer
+from . import instrumentation
+from .catalog import get_catalog
+from .models import ProductImport
+from .mutations import product_deleted, product_saved
+from .page_cache import cache_anonymous_page, detail_page_key, list_page_key
+from .search import search_products
 from django.contrib.auth.decorators import login_required
 from django.db.models import Q
 
 # Create your views here.
-base_url = "https://api.escuelajs.co/api/v1/"
+# Marcadores donde se insertan las tarjetas y la paginación en el modo streaming del listado
+STREAM_PLACEHOLDER = '<!-- products-stream -->'
+STREAM_PAGINATION_PLACEHOLDER = '<!-- products-pagination -->'
+# Productos por bloque enviado en el modo streaming
+STREAM_CHUNK_SIZE = 20
 
 def home_view(request):
     """Vista para la página de inicio"""
     return render(request, 'home.html')
 
+def _get_page(request):
+    """Devuelve el número de página pedido en la URL (mínimo 1)."""
+    try:
+        return max(int(request.GET.get('page', 1)), 1)
+    except ValueError:
+        return 1
+
+
+def _get_limit(request):
+    """Devuelve la cantidad de productos por página (entre 1 y PRODUCTS_MAX_PER_PAGE)."""
+    try:
+        limit = int(request.GET.get('limit', settings.PRODUCTS_PER_PAGE))
+    except ValueError:
+        limit = settings.PRODUCTS_PER_PAGE
+    return min(max(limit, 1), settings.PRODUCTS_MAX_PER_PAGE)
+
+
+def _iter_product_chunks(catalog, product_title, category_id, page, limit, pagination, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Genera los productos de la página ``page`` (de ``limit`` productos) por
+    bloques de ``chunk_size`` y deja en ``pagination['has_next']`` si hay más.
+    """
+    if product_title:
+        # El índice está en memoria: se busca la página de una vez y se envía por bloques
+        result = search_products(product_title, page=page, per_page=limit)
+        pagination['has_next'] = (page - 1) * limit + len(result.products) < result.total
+        for start in range(0, len(result.products), chunk_size):
+            yield result.products[start:start + chunk_size]
+        return
+
+    offset = (page - 1) * limit
+    end = offset + limit
+    while offset < end:
+        size = min(chunk_size, end - offset)
+        last = offset + size >= end
+        # En el último bloque se pide un producto extra para saber si hay página siguiente
+        products, status_code = catalog.list_products(offset, size + 1 if last else size, category_id)
+        if last and len(products) > size:
+            pagination['has_next'] = True
+            products = products[:size]
+        if products:
+            yield products
+        if status_code != 200 or len(products) < size:
+            return
+        offset += size
+
+
+def _stream_products_list(request, context, chunks, pagination):
+    """
+    Respuesta en streaming: envía la cabecera de la página, luego las tarjetas
+    de productos a medida que llegan los bloques y por último la paginación y
+    el resto del HTML.
+
+    Las tarjetas y la paginación se renderizan con una sola plantilla cargada
+    y un solo ``RequestContext``: los context processors corren una vez y no
+    por tarjeta.
+    """
+    html = render_to_string('products/products_list.html', context, request=request)
+    head, tail = html.split(STREAM_PLACEHOLDER, 1)
+    middle, tail = tail.split(STREAM_PAGINATION_PLACEHOLDER, 1)
+    card = get_template('products/_product_card.html').template
+    pagination_template = get_template('products/_pagination.html').template
+    card_context = RequestContext(request)
+
+    def generate():
+        yield head
+        with card_context.bind_template(card):
+            try:
+                for products in chunks:
+                    parts = []
+                    for product in products:
+                        with card_context.push(product=product):
+                            parts.append(card.render(card_context))
+                    yield ''.join(parts)
+            except requests.exceptions.RequestException as e:
+                # Los encabezados ya se enviaron: el error se muestra dentro del listado
+                yield render_to_string('products/_stream_error.html', {'error': str(e)}, request=request)
+            yield middle
+            with card_context.push(pagination):
+                yield pagination_template.render(card_context)
+        yield tail
+
+    return StreamingHttpResponse(generate(), content_type='text/html; charset=utf-8')
+
+
+@cache_anonymous_page(list_page_key, 'LIST_TIMEOUT')
 def products_list_view(request):
     """
     Vista para mostrar la lista de productos desde la API, con funcionalidad de búsqueda
     por nombre de categoría o nombre de producto.
+
+    Los resultados se paginan con ``page`` y ``limit``. Con ``stream=1`` la
+    página se envía en streaming, bloque por bloque.
     """
     products = []
     categories = []
+    has_next = False
+    total = None
+    # Réplica local, API o catálogo en memoria según PLATZI_CATALOG_BACKEND
+    catalog = get_catalog()
     
     # Obtener las categorías para el dropdown
     try:
-        categories_response = requests.get(f"{base_url}categories/")
-        if categories_response.status_code == 200:
-            categories = categories_response.json()
+        categories = catalog.list_categories()
     except requests.exceptions.RequestException as e:
         messages.error(request, f'Error al cargar categorías: {str(e)}')
     
     # Obtener los parámetros de la URL
     product_title = request.GET.get('product_title')
     category_id = request.GET.get('category_id')  # Cambio: ahora usamos category_id
+    page = _get_page(request)
+    limit = _get_limit(request)
+    offset = (page - 1) * limit
+    streaming = request.GET.get('stream') == '1'
+
+    category_id_int = None
+    if category_id and not product_title:
+        try:
+            category_id_int = int(category_id)
+        except ValueError:
+            messages.error(request, "ID de categoría inválido")
+            category_id = None
+
+    context = {
+        'categories': categories,
+        'selected_category_id': category_id,
+        'selected_product_title': product_title,
+    }
+
+    if streaming:
+        context.update({'products': [], 'streaming': True})
+        pagination = {
+            'page': page,
+            'has_previous': page > 1,
+            'has_next': False,
+            'previous_page': page - 1,
+            'next_page': page + 1,
+        }
+        chunks = _iter_product_chunks(catalog, product_title, category_id_int, page, limit, pagination)
+        return _stream_products_list(request, context, chunks, pagination)
 
     try:
         # Búsqueda por nombre de producto
         if product_title:
-            # Obtener todos los productos y filtrar por título
-            response = requests.get(f"{base_url}products/")
-            if response.status_code == 200:
-                all_products = response.json()
-                # Filtrar productos que contengan el título buscado (case insensitive)
-                products = [p for p in all_products if product_title.lower() in p.get('title', '').lower()]
-                if not products:
-                    messages.warning(request, f"No se encontraron productos con el nombre: '{product_title}'")
-                else:
-                    messages.success(request, f"Se encontraron {len(products)} productos con '{product_title}'")
+            # Búsqueda por relevancia en el índice (título y descripción, con prefijos)
+            result = search_products(product_title, page=page, per_page=limit)
+            products = result.products
+            total = result.total
+            has_next = offset + len(products) < total
+            if not result.total:
+                messages.warning(request, f"No se encontraron productos con el nombre: '{product_title}'")
             else:
-                messages.error(request, f"Error al buscar productos. Código de estado: {response.status_code}")
+                messages.success(request, f"Se encontraron {result.total} productos con '{product_title}'")
                 
         # Búsqueda por ID de categoría
-        elif category_id:
-            try:
-                category_id_int = int(category_id)
-                # Buscar productos por ID de categoría
-                products_response = requests.get(f"{base_url}categories/{category_id_int}/products")
-                if products_response.status_code == 200:
-                    products = products_response.json()
-                    # Encontrar el nombre de la categoría seleccionada
-                    selected_category = next((cat for cat in categories if cat['id'] == category_id_int), None)
-                    category_name = selected_category['name'] if selected_category else 'Desconocida'
-                    messages.success(request, f"Mostrando {len(products)} productos de la categoría: '{category_name}'")
-                else:
-                    messages.error(request, f"Error al buscar productos por categoría. Código de estado: {products_response.status_code}")
-            except ValueError:
-                messages.error(request, "ID de categoría inválido")
+        elif category_id_int is not None:
+            # Se pide un producto extra para saber si hay página siguiente
+            products, status_code = catalog.list_products(offset, limit + 1, category_id_int)
+            has_next = len(products) > limit
+            products = products[:limit]
+            if status_code == 200:
+                # Encontrar el nombre de la categoría seleccionada
+                selected_category = next((cat for cat in categories if cat['id'] == category_id_int), None)
+                category_name = selected_category['name'] if selected_category else 'Desconocida'
+                messages.success(request, f"Mostrando {len(products)} productos de la categoría: '{category_name}'")
+            else:
+                messages.error(request, f"Error al buscar productos por categoría. Código de estado: {status_code}")
 
         # Si no hay parámetros de búsqueda, mostrar todos los productos
-        else:
-            response = requests.get(f"{base_url}products/")
-            if response.status_code == 200:
-                products = response.json()
-            else:
-                messages.error(request, f"Error al cargar la lista de productos. Código de estado: {response.status_code}")
+        elif not category_id:
+            products, status_code = catalog.list_products(offset, limit + 1)
+            has_next = len(products) > limit
+            products = products[:limit]
+            if status_code != 200:
+                messages.error(request, f"Error al cargar la lista de productos. Código de estado: {status_code}")
     
     except requests.exceptions.RequestException as e:
         messages.error(request, f'Error de conexión con la API: {str(e)}')
     
-    # Pasar las categorías y los valores seleccionados al template
-    context = {
+    # Pasar las categorías, los valores seleccionados y la paginación al template
+    context.update({
         'products': products,
-        'categories': categories,
-        'selected_category_id': category_id,
-        'selected_product_title': product_title,
-    }
+        'page': page,
+        'limit': limit,
+        'has_previous': page > 1,
+        'has_next': has_next,
+        'previous_page': page - 1,
+        'next_page': page + 1,
+        'total': total,
+    })
     
     return render(request, 'products/products_list.html', context)
 
 
+@cache_anonymous_page(detail_page_key, 'DETAIL_TIMEOUT')
 def products_detail_view(request, pk):
     """Vista para mostrar el detalle de un producto específico"""
+    product = None
     try:
-        # Hacer la petición a la API para un producto específico
-        response = requests.get(f"{base_url}products/{pk}")
-        
-        if response.status_code == 200:
-            product = response.json()
-        else:
-            product = None
+        product = get_catalog().get_product(pk)
+        if product is None:
             messages.error(request, 'Producto no encontrado')
     
     except requests.exceptions.RequestException as e:
-        product = None
         messages.error(request, f'Error de conexión: {str(e)}')
     
     context = {
@@ -139,14 +270,15 @@ def products_add_view(request):
             }
 
             try:
-                # Enviar la petición POST a la API para crear el producto
-                response = requests.post(f"{base_url}products/", json=new_product_data)
+                # Crear el producto en el catálogo (la API o el backend configurado)
+                product, status_code = get_catalog().create_product(new_product_data)
                 
-                if response.status_code == 201:
+                if status_code == 201:
+                    product_saved(product)
                     messages.success(request, 'Producto agregado exitosamente a la API.')
                     return redirect('products:products_list')
                 else:
-                    messages.error(request, f'Error al agregar el producto a la API. Código de estado: {response.status_code}')
+                    messages.error(request, f'Error al agregar el producto a la API. Código de estado: {status_code}')
 
             except requests.exceptions.RequestException as e:
                 messages.error(request, f'Error de conexión con la API: {str(e)}')
@@ -156,16 +288,79 @@ def products_add_view(request):
     return render(request, 'products/products_add.html', {'form': form})
 
 
+@login_required(login_url='accounts:login')
+def products_export_view(request):
+    """
+    Descarga del catálogo completo en CSV o NDJSON, generado en streaming.
+
+    Parámetros: ``format`` (csv | ndjson), ``columns`` (p. ej. ``id,title,price``),
+    ``gzip=1`` y ``category_id``.
+    """
+    try:
+        fmt = exporter.parse_format(request.GET.get('format'))
+        columns = exporter.parse_columns(request.GET.get('columns'))
+        category_id = int(request.GET['category_id']) if request.GET.get('category_id') else None
+    except ValueError as e:
+        return JsonResponse({
+            'success': False,
+            'message': f'Parámetros inválidos: {str(e)}'
+        }, status=400)
+
+    compress = request.GET.get('gzip') == '1'
+    # Si la API falla a mitad de la descarga la respuesta queda truncada
+    # (los encabezados ya se enviaron) y el error queda en el log del servidor
+    chunks = exporter.export_catalog(fmt, columns, compress=compress, category_id=category_id)
+    response = StreamingHttpResponse(
+        chunks,
+        content_type='application/gzip' if compress else exporter.CONTENT_TYPES[fmt],
+    )
+    response['Content-Disposition'] = f'attachment; filename="{exporter.export_filename(fmt, compress)}"'
+    return response
+
+
+@login_required(login_url='accounts:login')
+def products_import_view(request):
+    """
+    Vista para importar productos en masa desde un archivo CSV o JSONL. La
+    importación corre dentro de la petición: el formulario rechaza archivos
+    de más de MAX_UPLOAD_SIZE, que se importan con ``manage.py import_products``.
+    """
+    job = None
+    if request.method == 'POST':
+        form = ProductImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            upload = form.cleaned_data['file']
+            try:
+                # El archivo subido se procesa fila por fila; si ya se importó antes se continúa
+                job = importer.run_import(upload, filename=upload.name)
+                if job.status == ProductImport.COMPLETED:
+                    messages.success(request, f'Importación completada: {job.created} productos creados, {job.failed} filas con error.')
+                else:
+                    messages.error(request, f'{job.message}.')
+            except ValueError as e:
+                messages.error(request, str(e))
+            except requests.exceptions.RequestException as e:
+                messages.error(request, f'Error al cargar categorías: {str(e)}')
+    else:
+        form = ProductImportForm()
+
+    context = {
+        'form': form,
+        'job': job,
+        'recent_imports': ProductImport.objects.all()[:5],
+    }
+    return render(request, 'products/products_import.html', context)
+
+
 @csrf_exempt
 @login_required(login_url='accounts:login')
 def products_update_ajax(request, pk):
     """Vista AJAX para actualizar un producto"""
     if request.method == 'GET':
         try:
-            # Obtener datos del producto para el modal
-            response = requests.get(f"{base_url}products/{pk}")
-            if response.status_code == 200:
-                product = response.json()
+            # Obtener datos del producto para el modal (normalmente desde la caché)
+            product = get_catalog().get_product(pk)
+            if product is not None:
                 return JsonResponse({
                     'success': True,
                     'product': product
@@ -194,15 +389,11 @@ def products_update_ajax(request, pk):
                 'images': [data.get('image', '')]
             }
 
-            # Enviar petición PUT a la API
-            response = requests.put(
-                f"{base_url}products/{pk}",
-                json=product_data,
-                headers={'Content-Type': 'application/json'}
-            )
+            # Enviar la actualización al catálogo (PUT a la API)
+            updated_product, status_code = get_catalog().update_product(pk, product_data)
             
-            if response.status_code == 200:
-                updated_product = response.json()
+            if status_code == 200:
+                product_saved(updated_product)
                 return JsonResponse({
                     'success': True,
                     'message': 'Producto actualizado exitosamente',
@@ -231,10 +422,9 @@ def products_delete_ajax(request, pk):
     """Vista AJAX para eliminar un producto"""
     if request.method == 'GET':
         try:
-            # Obtener datos del producto para mostrar en el modal de confirmación
-            response = requests.get(f"{base_url}products/{pk}")
-            if response.status_code == 200:
-                product = response.json()
+            # Obtener datos del producto para mostrar en el modal de confirmación (normalmente desde la caché)
+            product = get_catalog().get_product(pk)
+            if product is not None:
                 return JsonResponse({
                     'success': True,
                     'product': product
@@ -252,10 +442,11 @@ def products_delete_ajax(request, pk):
     
     elif request.method == 'DELETE':
         try:
-            # Enviar petición DELETE a la API
-            response = requests.delete(f"{base_url}products/{pk}")
+            # Eliminar del catálogo (DELETE a la API)
+            _, status_code = get_catalog().delete_product(pk)
             
-            if response.status_code == 200:
+            if status_code == 200:
+                product_deleted(pk)
                 return JsonResponse({
                     'success': True,
                     'message': 'Producto eliminado exitosamente'
@@ -269,4 +460,60 @@ def products_delete_ajax(request, pk):
             return JsonResponse({
                 'success': False,
                 'message': f'Error de conexión: {str(e)}'
-            })
\ No newline at end of file
+            })
+
+
+@login_required(login_url='accounts:login')
+def products_batch_ajax(request):
+    """Vista AJAX para crear, actualizar y eliminar varios productos en una sola petición"""
+    if request.method != 'POST':
+        return JsonResponse({
+            'success': False,
+            'message': 'Método no permitido'
+        }, status=405)
+
+    try:
+        data = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({
+            'success': False,
+            'message': 'JSON inválido'
+        }, status=400)
+
+    # Se acepta una lista de operaciones o {"operations": [...]}
+    items = data.get('operations') if isinstance(data, dict) else data
+    try:
+        operations = batch.validate_operations(items)
+    except batch.BatchValidationError as e:
+        return JsonResponse({
+            'success': False,
+            'message': 'Operaciones inválidas; no se ejecutó ninguna',
+            'errors': e.errors
+        }, status=400)
+    except requests.exceptions.RequestException as e:
+        # Sin categorías no se pueden validar los productos
+        return JsonResponse({
+            'success': False,
+            'message': f'Error de conexión: {str(e)}'
+        }, status=503)
+
+    results = batch.execute_operations(operations)
+    succeeded = sum(1 for result in results if result['success'])
+    return JsonResponse({
+        'success': succeeded == len(results),
+        'message': f'{succeeded} de {len(results)} operaciones completadas',
+        'succeeded': succeeded,
+        'failed': len(results) - succeeded,
+        'results': results
+    })
+
+
+def metrics_view(request):
+    """Métricas de latencia en formato de texto de Prometheus (ver products/instrumentation.py)."""
+    config = instrumentation.get_instrumentation_settings()
+    if not instrumentation.can_view_metrics(request, config):
+        return HttpResponse('No autorizado', status=403, content_type='text/plain; charset=utf-8')
+    return HttpResponse(
+        instrumentation.get_registry().render(config['QUANTILES']),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )